@@ -0,0 +1,71 @@
+"""
+    Benchmark import time of django_personals.enums and per render cost
+    of choice labels.
+
+    $ python -m benchmarks.choices --output choices.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import timeit
+
+# django is set up without django_personals installed, so enums is
+# imported for the first time inside the timed block
+IMPORT_SCRIPT = (
+    'import django; from django.conf import settings; settings.configure(); '
+    'django.setup(); import time; start = time.perf_counter(); '
+    'import django_personals.enums; print(time.perf_counter() - start)'
+)
+
+
+def import_time(repeat):
+    times = []
+    for i in range(repeat):
+        output = subprocess.check_output(
+            [sys.executable, '-c', IMPORT_SCRIPT], cwd=os.path.dirname(os.path.dirname(__file__)))
+        times.append(float(output))
+    return min(times)
+
+
+def render_cost(number):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+    import django
+    django.setup()
+    from django import forms
+    from django_personals.choices import get_display
+    from django_personals.enums import PrivacyStatus
+    from example.models import Skill
+
+    class SkillForm(forms.ModelForm):
+        class Meta:
+            model = Skill
+            fields = ['privacy']
+
+    skill = Skill(privacy=PrivacyStatus.ME.value)
+    return {
+        'form_render_us': timeit.timeit(lambda: str(SkillForm()['privacy']), number=number) / number * 1e6,
+        'get_display_us': timeit.timeit(lambda: skill.get_privacy_display(), number=number) / number * 1e6,
+        'table_label_us': timeit.timeit(lambda: get_display(skill, 'privacy'), number=number) / number * 1e6,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='choices benchmarks')
+    parser.add_argument('--number', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output')
+    args = parser.parse_args(argv)
+    report = {'enums_import_seconds': import_time(args.repeat)}
+    report.update(render_cost(args.number))
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+    Benchmark CV rendering: cold renders, renders served from the section
+    cache, renders after one section changed, and zip export in this
+    process against a process pool. Process workers need a database file
+    (BENCH_DB_NAME) and only share fragments through a shared cache.
+
+    $ BENCH_DB_NAME=/tmp/cv.sqlite3 python -m benchmarks.cv --people 2000 --output cv.json
+"""
+import argparse
+import json
+import sys
+import time
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='CV rendering benchmarks')
+    parser.add_argument('--people', type=int, default=2000)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output')
+    args = parser.parse_args(argv)
+
+    from benchmarks.run import setup
+    setup()
+    from django.core.cache import cache
+    from django.db import connection
+    from django_personals.cv import export_cvs, render_cvs
+    from django_personals.generator import ProfileGenerator
+    from example.models import Person, Skill
+
+    if not Person.objects.exists():
+        ProfileGenerator(Person, seed=args.seed).load(args.people, batch_size=1000)
+    people = Person.objects.all()
+    count = people.count()
+
+    def render():
+        return sum(1 for person, html in render_cvs(people))
+
+    cache.clear()
+    cold, rendered = timed(render)
+    warm, rendered = timed(render)
+    Skill.objects.filter(pk__in=Skill.objects.values('pk')[:count // 10]).update(level=5)
+    Skill.objects.filter(level=5).trash()
+    changed, rendered = timed(render)
+    inline, data = timed(lambda: b''.join(export_cvs(people, processes=0)))
+    report = {
+        'people': count,
+        'cold_cvs_per_second': round(count / cold, 1),
+        'cached_cvs_per_second': round(count / warm, 1),
+        'after_skill_change_cvs_per_second': round(count / changed, 1),
+        'export_inline_seconds': round(inline, 3),
+        'zip_bytes': len(data),
+    }
+    if connection.vendor != 'sqlite' or connection.settings_dict['NAME'] != ':memory:':
+        cache.clear()
+        pooled, data = timed(lambda: b''.join(export_cvs(people, processes=args.processes)))
+        report['export_pool_seconds'] = round(pooled, 3)
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
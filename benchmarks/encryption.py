@@ -0,0 +1,85 @@
+"""
+    Benchmark encrypted fields: blind index lookups against a decrypting
+    scan, and decode throughput of eager, lazy and batched decryption.
+    Requires the cryptography package.
+
+    $ python -m benchmarks.encryption --rows 10000 --output encryption.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+
+def setup(rows):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+    from cryptography.fernet import Fernet
+    from django.conf import settings
+    settings.PERSONALS_ENCRYPTION_KEYS = [Fernet.generate_key()]
+    import django
+    django.setup()
+    from django.db import connection, models
+    from django_personals.encryption import BlindIndexField, EncryptedCharField
+
+    class Contact(models.Model):
+        class Meta:
+            app_label = 'benchmarks'
+
+        email = EncryptedCharField(max_length=128, null=True)
+        email_index = BlindIndexField('email')
+
+    with connection.schema_editor() as editor:
+        editor.create_model(Contact)
+    Contact.objects.bulk_create(
+        [Contact(email='person%d@example.com' % i) for i in range(rows)], batch_size=500)
+    return Contact
+
+
+def timed(func, number=1):
+    start = time.perf_counter()
+    for i in range(number):
+        result = func()
+    return (time.perf_counter() - start) / number, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='encrypted field benchmarks')
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--lookups', type=int, default=200)
+    parser.add_argument('--output')
+    args = parser.parse_args(argv)
+    try:
+        Contact = setup(args.rows)
+    except ImportError:
+        sys.exit('benchmarks.encryption requires the cryptography package.')
+    from django_personals.encryption import blind_lookup, decrypt_many
+
+    target = 'person%d@example.com' % (args.rows - 1)
+    lookup, found = timed(
+        lambda: Contact.objects.filter(blind_lookup(Contact, email=target)).first(), args.lookups)
+    assert found.email == target
+    scan, found = timed(
+        lambda: next(contact for contact in Contact.objects.all() if contact.email == target))
+    lazy, ids = timed(lambda: [contact.pk for contact in Contact.objects.all()])
+    eager, emails = timed(lambda: [contact.email for contact in Contact.objects.all()])
+    tokens = list(Contact.objects.values_list('email', flat=True))
+    batched, emails = timed(lambda: decrypt_many(tokens))
+    report = {
+        'rows': args.rows,
+        'blind_index_lookup_ms': round(lookup * 1000, 3),
+        'decrypting_scan_ms': round(scan * 1000, 3),
+        'load_without_access_rows_per_second': round(args.rows / lazy, 1),
+        'load_and_decrypt_rows_per_second': round(args.rows / eager, 1),
+        'decrypt_many_values_per_second': round(args.rows / batched, 1),
+    }
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
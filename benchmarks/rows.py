@@ -0,0 +1,59 @@
+"""
+    Benchmark listing reads through model instances against rows(): time
+    and peak memory of reading str() and percent of every skill.
+
+    $ python -m benchmarks.rows --people 5000 --output rows.json
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+
+def measure(func, number=3):
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for i in range(number):
+        result = func()
+    return (time.perf_counter() - start) / number, peak, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='row object benchmarks')
+    parser.add_argument('--people', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output')
+    args = parser.parse_args(argv)
+
+    from benchmarks.run import setup
+    setup()
+    from django_personals.generator import ProfileGenerator
+    from example.models import Person, Skill
+
+    if not Person.objects.exists():
+        ProfileGenerator(Person, seed=args.seed).load(args.people, batch_size=1000)
+    instances, instances_peak, count = measure(
+        lambda: sum(1 for skill in Skill.objects.all() if str(skill) and skill.percent >= 0))
+    rows, rows_peak, count = measure(
+        lambda: sum(1 for skill in Skill.objects.rows('name', 'level') if str(skill) and skill.percent >= 0))
+    report = {
+        'rows': count,
+        'instances_rows_per_second': round(count / instances, 1),
+        'row_objects_rows_per_second': round(count / rows, 1),
+        'instances_peak_kib': round(instances_peak / 1024, 1),
+        'row_objects_peak_kib': round(rows_peak / 1024, 1),
+    }
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
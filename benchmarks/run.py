@@ -0,0 +1,191 @@
+"""
+    Benchmark django_personals abstract models through the example schema.
+
+    $ python -m benchmarks.run --scale 10000 --output results.json
+    $ python -m benchmarks.run --scale 10000 --compare results.json
+
+    Set BENCH_DB_ENGINE/BENCH_DB_NAME/... to run against another database.
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+SCALES = (10000, 100000, 1000000)
+BATCH_SIZE = 2000
+
+
+def setup():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+    import django
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+class Timer:
+
+    def __init__(self):
+        self.results = {}
+
+    def time(self, name, func, rows=None):
+        start = time.perf_counter()
+        result = func()
+        seconds = time.perf_counter() - start
+        if rows is None:
+            rows = result if isinstance(result, int) else 0
+        self.results[name] = {
+            'seconds': round(seconds, 6),
+            'rows': rows,
+            'rows_per_second': round(rows / seconds, 1) if seconds and rows else None,
+        }
+        print('%-24s %10.3fs %10s rows' % (name, seconds, rows), file=sys.stderr)
+        return result
+
+
+def bulk_import(count, seed):
+    from django_personals.generator import ProfileGenerator
+    from example.models import Person
+    return ProfileGenerator(Person, seed=seed).load(count, batch_size=BATCH_SIZE)
+
+
+def sample_people(size, seed):
+    from example.models import Person
+    pks = list(Person.objects.values_list('pk', flat=True).order_by('pk')[:size * 10])
+    return random.Random(seed).sample(pks, min(size, len(pks)))
+
+
+def soft_delete(pks):
+    from example.models import Person
+    for person in Person.objects.filter(pk__in=pks):
+        person.delete(paranoid=True)
+    return len(pks)
+
+
+def restore(pks):
+    from example.models import Person
+    for person in Person._base_manager.filter(pk__in=pks):
+        person.restore()
+    return len(pks)
+
+
+def manager_filter():
+    from example.models import Person, Skill
+    return (
+        Person.objects.filter(gender='P').count() +
+        Skill.objects.filter(level__gte=8).count() +
+        len(list(Person.objects.filter(date_of_birth__year__gte=1990)[:1000])))
+
+
+def profile_load(pks):
+    from django_personals.profiles import load_profiles
+    from django_personals.testing import touch_profile
+    from example.models import Person
+    people = list(load_profiles(Person.objects.filter(pk__in=pks)))
+    for person in people:
+        touch_profile(person)
+    return len(people)
+
+
+def export():
+    from example.models import Person
+    writer = csv.writer(io.StringIO())
+    rows = 0
+    queryset = Person.objects.values_list(
+        'id', 'pid', 'gender', 'date_of_birth', 'nickname', 'privacy')
+    for row in queryset.iterator(chunk_size=BATCH_SIZE):
+        writer.writerow(row)
+        rows += 1
+    return rows
+
+
+def deep_page(per_page=50):
+    """
+        Return (offset page, keyset page) loaders for the deepest page
+    """
+    from django_personals.pagination import KeysetPaginator
+    from example.models import Person
+    queryset = Person.objects.all()
+    ordering = ['nickname']
+    offset = max(queryset.count() - per_page, 0)
+    paginator = KeysetPaginator(queryset, per_page, ordering=ordering)
+    anchor = paginator.get_queryset()[max(offset - 1, 0)]
+    cursor = paginator.get_cursor(anchor)
+    return (
+        lambda: len(list(queryset.order_by(*ordering, 'pk')[offset:offset + per_page])),
+        lambda: len(paginator.page(cursor)),
+    )
+
+
+def run(scale, seed):
+    timer = Timer()
+    timer.time('bulk_import', lambda: bulk_import(scale, seed))
+    pks = sample_people(1000, seed)
+    timer.time('soft_delete', lambda: soft_delete(pks))
+    timer.time('restore', lambda: restore(pks))
+    timer.time('manager_filter', manager_filter)
+    timer.time('profile_load_100', lambda: profile_load(pks[:100]))
+    timer.time('export', export)
+    offset_page, keyset_page = deep_page()
+    timer.time('offset_last_page', offset_page)
+    timer.time('keyset_last_page', keyset_page)
+    return timer.results
+
+
+def get_environment():
+    import django
+    from django.db import connection
+    import django_personals
+    return {
+        'django_personals': django_personals.__version__,
+        'django': django.get_version(),
+        'python': platform.python_version(),
+        'database': connection.vendor,
+    }
+
+
+def compare(current, previous):
+    print('%-24s %12s %12s %8s' % ('operation', 'previous', 'current', 'change'))
+    for name, result in current['results'].items():
+        before = previous['results'].get(name)
+        if not before:
+            continue
+        change = (result['seconds'] - before['seconds']) / before['seconds'] * 100
+        print('%-24s %11.3fs %11.3fs %+7.1f%%' % (
+            name, before['seconds'], result['seconds'], change))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='django_personals benchmarks')
+    parser.add_argument('--scale', type=int, default=SCALES[0],
+                        help='number of people, e.g. %s' % ', '.join(map(str, SCALES)))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write JSON results to this file')
+    parser.add_argument('--compare', help='previous JSON results to compare with')
+    args = parser.parse_args(argv)
+
+    setup()
+    report = {
+        'environment': get_environment(),
+        'scale': args.scale,
+        'seed': args.seed,
+        'results': run(args.scale, args.seed),
+    }
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        with open(args.compare) as previous:
+            compare(report, json.load(previous))
+
+
+if __name__ == '__main__':
+    main()
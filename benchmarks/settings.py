@@ -0,0 +1,37 @@
+import os
+
+SECRET_KEY = "benchmarks"
+
+INSTALLED_APPS = [
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "django_personals",
+    "example",
+]
+
+DATABASES = {
+    "default": {
+        "ENGINE": os.environ.get("BENCH_DB_ENGINE", "django.db.backends.sqlite3"),
+        "NAME": os.environ.get("BENCH_DB_NAME", ":memory:"),
+        "USER": os.environ.get("BENCH_DB_USER", ""),
+        "PASSWORD": os.environ.get("BENCH_DB_PASSWORD", ""),
+        "HOST": os.environ.get("BENCH_DB_HOST", ""),
+        "PORT": os.environ.get("BENCH_DB_PORT", ""),
+    }
+}
+
+USE_TZ = True
+
+TEMPLATES = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "APP_DIRS": True,
+    }
+]
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "OPTIONS": {"MAX_ENTRIES": 1000000},
+    }
+}
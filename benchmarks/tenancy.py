@@ -0,0 +1,96 @@
+"""
+    Benchmark per-tenant query latency while the total table grows, tenant
+    scoped queries should stay flat thanks to indexes leading with tenant_id.
+
+    $ python -m benchmarks.tenancy --sizes 10000 100000 --tenant-rows 1000
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import uuid
+
+
+def setup():
+    from benchmarks.run import setup as setup_database
+    setup_database()
+    from django_personals.models import PersonMinimalAbstract
+    from django_personals.tenancy import TenantIndex, TenantMixin
+
+    class Member(TenantMixin, PersonMinimalAbstract):
+        class Meta:
+            app_label = 'benchmarks'
+            indexes = [TenantIndex(fields=['place_of_birth'], name='bench_member_tenant_idx')]
+
+    return Member
+
+
+def fill(Member, size, tenant_rows, seed):
+    from django.db import connection
+    with connection.schema_editor() as editor:
+        editor.create_model(Member)
+    rng = random.Random(seed)
+    tenants = max(size // tenant_rows, 1)
+    batch = []
+    for index in range(size):
+        batch.append(Member(
+            id=uuid.UUID(int=rng.getrandbits(128)), tenant_id='tenant%d' % (index % tenants),
+            place_of_birth='city%d' % rng.randrange(50)))
+        if len(batch) == 1000:
+            Member.objects.bulk_create(batch)
+            batch = []
+    Member.objects.bulk_create(batch)
+    return tenants
+
+
+def drop(Member):
+    from django.db import connection
+    with connection.schema_editor() as editor:
+        editor.delete_model(Member)
+
+
+def latency(func, number):
+    start = time.perf_counter()
+    for i in range(number):
+        func()
+    return (time.perf_counter() - start) / number * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='tenant scoping benchmarks')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--tenant-rows', type=int, default=1000)
+    parser.add_argument('--number', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output')
+    args = parser.parse_args(argv)
+    Member = setup()
+    from django_personals.tenancy import tenant_scope
+
+    report = []
+    for size in args.sizes:
+        tenants = fill(Member, size, args.tenant_rows, args.seed)
+        with tenant_scope('tenant%d' % (tenants - 1)):
+            result = {
+                'total_rows': size,
+                'tenants': tenants,
+                'count_ms': latency(lambda: Member.objects.count(), args.number),
+                'filter_page_ms': latency(
+                    lambda: list(Member.objects.filter(place_of_birth='city7')[:50]), args.number),
+            }
+        report.append({key: round(value, 4) if isinstance(value, float) else value
+                       for key, value in result.items()})
+        print('%(total_rows)10d rows %(tenants)6d tenants count %(count_ms).3fms '
+              'page %(filter_page_ms).3fms' % result, file=sys.stderr)
+        drop(Member)
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
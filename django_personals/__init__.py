@@ -1,3 +1,6 @@
+import importlib
+import importlib.util
+
 from django_personals.utils.version import get_version
 
 default_app_config = 'django_personals.apps.AppConfig'
@@ -6,4 +9,25 @@ default_app_config = 'django_personals.apps.AppConfig'
 # release must be one of alpha, beta, rc, or final
 VERSION = (0, 0, 1, 'final', 1)
 
-__version__ = get_version(VERSION)
\ No newline at end of file
+__version__ = get_version(VERSION)
+
+
+# Submodules are resolved on first attribute access (PEP 562), importing
+# the package itself stays free of django and optional dependencies.
+def _is_submodule(name):
+    return not name.startswith('_') and importlib.util.find_spec('%s.%s' % (__name__, name)) is not None
+
+
+def __getattr__(name):
+    if _is_submodule(name):
+        value = importlib.import_module('%s.%s' % (__name__, name))
+    else:
+        raise AttributeError('module %r has no attribute %r' % (__name__, name))
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    import pkgutil
+    submodules = {module.name for module in pkgutil.iter_modules(__path__)}
+    return sorted(set(globals()) | submodules)
@@ -0,0 +1,305 @@
+from django.contrib import admin, messages
+from django.contrib.admin.options import IS_POPUP_VAR
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.forms.models import BaseInlineFormSet
+from django.http import QueryDict
+from django.urls import path, reverse
+from django.utils import translation
+
+from .pagination import InvalidCursor, KeysetPaginator
+from .profiles import get_profile_relations
+from .tasks import get_runner, run_in_background, run_now
+
+_ = translation.gettext_lazy
+
+CURSOR_VAR = 'cursor'
+
+
+def get_forward_relations(model, names=None, exclude=()):
+    """
+        Return names of forward single valued relations of model,
+        optionally limited to names
+    """
+    return [
+        field.name for field in model._meta.fields
+        if field.is_relation and (field.many_to_one or field.one_to_one)
+        and (names is None or field.name in names)
+        and field.name not in exclude
+    ]
+
+
+class PaginatedInlineFormSet(BaseInlineFormSet):
+    """
+        Inline formset editing one page of related rows
+    """
+    per_page = 20
+    page_number = 1
+    query_params = None
+
+    def get_queryset(self):
+        if not hasattr(self, '_page'):
+            queryset = super().get_queryset()
+            if not queryset.ordered:
+                queryset = queryset.order_by('pk')
+            self.paginator = Paginator(queryset, self.per_page)
+            self._page = self.paginator.get_page(self.page_number)
+            self._page.object_list = list(self._page.object_list)
+        return self._page.object_list
+
+    @property
+    def page(self):
+        self.get_queryset()
+        return self._page
+
+    @classmethod
+    def get_page_var(cls):
+        return '%s-page' % cls.get_default_prefix()
+
+    def get_page_url(self, number):
+        if self.query_params is None:
+            params = QueryDict(mutable=True)
+        else:
+            params = self.query_params.copy()
+        params[self.get_page_var()] = number
+        return '?%s' % params.urlencode()
+
+    def page_links(self):
+        page = self.page
+        links = []
+        if page.has_previous():
+            links.append(('previous', self.get_page_url(page.previous_page_number())))
+        if page.has_next():
+            links.append(('next', self.get_page_url(page.next_page_number())))
+        return links
+
+
+class PaginatedInlineMixin:
+    """
+        Render only one page of related rows per inline, the page is
+        selected with ?<prefix>-page=N
+    """
+    per_page = 20
+    formset = PaginatedInlineFormSet
+    select_related = None
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        try:
+            page_number = int(request.GET.get(formset.get_page_var(), 1))
+        except ValueError:
+            page_number = 1
+        return type(formset.__name__, (formset,), {
+            'per_page': self.per_page,
+            'page_number': page_number,
+            'query_params': request.GET.copy(),
+        })
+
+    def get_select_related(self, request):
+        if self.select_related is not None:
+            return self.select_related
+        exclude = [field.name for field in self.model._meta.fields if not field.editable]
+        if self.fk_name:
+            exclude.append(self.fk_name)
+        else:
+            exclude += [
+                field.name for field in self.model._meta.fields
+                if field.is_relation and field.related_model is self.parent_model]
+        return get_forward_relations(self.model, exclude=exclude)
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        select_related = self.get_select_related(request)
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        return queryset
+
+
+class PaginatedTabularInline(PaginatedInlineMixin, admin.TabularInline):
+    template = 'django_personals/admin/edit_inline/paginated_tabular.html'
+
+
+class PaginatedStackedInline(PaginatedInlineMixin, admin.StackedInline):
+    template = 'django_personals/admin/edit_inline/paginated_stacked.html'
+
+
+class RelatedDefaultsMixin:
+    """
+        Derive list_select_related from the relation graph: forward relations
+        shown in list_display and single valued profile relations
+        (contact, social media) of the model
+    """
+    select_profile_relations = True
+
+    def get_list_select_related(self, request):
+        if self.list_select_related is not False:
+            return self.list_select_related
+        related = get_forward_relations(self.model, names=self.get_list_display(request))
+        if self.select_profile_relations:
+            single, multiple = get_profile_relations(self.model)
+            related += [relation.get_accessor_name() for relation in single]
+        return related
+
+
+class KeysetChangeList(ChangeList):
+    """
+        Change list paginated by keyset instead of OFFSET, without COUNT.
+        Pages are linked with an opaque ?cursor= token.
+    """
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_results(self, request):
+        try:
+            paginator = KeysetPaginator(
+                self.queryset, self.list_per_page,
+                ordering=self.get_ordering(request, self.queryset))
+        except ValueError:
+            # expressions or random ordering, fall back to OFFSET pagination
+            self.keyset = False
+            return super().get_results(request)
+        self.keyset = True
+        try:
+            page = paginator.page(request.GET.get(CURSOR_VAR))
+        except InvalidCursor:
+            page = paginator.page()
+        self.is_first_page = page.is_first()
+        self.next_cursor = page.next_cursor
+
+        self.result_count = len(page)
+        self.full_result_count = None
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.result_list = page.object_list
+        self.can_show_all = False
+        self.multi_page = page.has_next() or not page.is_first()
+        self.paginator = None
+
+    def get_first_page_url(self):
+        return self.get_query_string(remove=[CURSOR_VAR])
+
+    def get_next_page_url(self):
+        if self.next_cursor is None:
+            return None
+        return self.get_query_string({CURSOR_VAR: self.next_cursor})
+
+
+class KeysetPaginationMixin:
+    change_list_template = 'django_personals/admin/change_list.html'
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+
+class TrashAdminMixin:
+    """
+        Paranoid delete for BaseModel admins: "move to trash" and "restore"
+        bulk actions with set based updates, and a trash view listing
+        trashed rows. Selections above background_threshold rows are
+        processed by a background job.
+    """
+    change_list_template = 'django_personals/admin/change_list.html'
+    background_threshold = 1000
+    allow_hard_delete = False
+
+    def get_urls(self):
+        info = self.model._meta.app_label, self.model._meta.model_name
+        return [
+            path('trash/', self.admin_site.admin_view(self.trash_view),
+                 name='%s_%s_trash' % info),
+        ] + super().get_urls()
+
+    def is_trash_view(self, request):
+        return getattr(request, 'personals_trash_view', False)
+
+    def trash_view(self, request, extra_context=None):
+        request.personals_trash_view = True
+        context = {
+            'title': _('Trashed %s') % self.model._meta.verbose_name_plural,
+            'is_trash_view': True,
+            'live_url': reverse(
+                'admin:%s_%s_changelist' % (self.model._meta.app_label, self.model._meta.model_name),
+                current_app=self.admin_site.name),
+        }
+        context.update(extra_context or {})
+        return self.changelist_view(request, extra_context=context)
+
+    def changelist_view(self, request, extra_context=None):
+        context = {
+            'trash_url': reverse(
+                'admin:%s_%s_trash' % (self.model._meta.app_label, self.model._meta.model_name),
+                current_app=self.admin_site.name),
+        }
+        context.update(extra_context or {})
+        return super().changelist_view(request, extra_context=context)
+
+    def get_queryset(self, request):
+        if not self.is_trash_view(request):
+            return super().get_queryset(request)
+        queryset = self.model.all_objects.filter(is_trash=True)
+        ordering = self.get_ordering(request)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return queryset
+
+    def get_list_display_links(self, request, list_display):
+        if self.is_trash_view(request):
+            return None
+        return super().get_list_display_links(request, list_display)
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        if not self.allow_hard_delete:
+            actions.pop('delete_selected', None)
+        if self.actions is None or IS_POPUP_VAR in request.GET:
+            return actions
+        if self.is_trash_view(request):
+            if self.has_change_permission(request):
+                actions['restore_selected'] = self.get_action('restore_selected')
+        elif self.has_delete_permission(request):
+            actions['trash_selected'] = self.get_action('trash_selected')
+        return actions
+
+    def run_bulk_action(self, queryset, job, *args):
+        """
+            Run job(model_label, pks, *args) now, or in background when the
+            selection is above background_threshold rows and
+            PERSONALS_TASK_RUNNER is set. Return (rows, in_background)
+        """
+        pks = [str(pk) for pk in queryset.order_by().values_list('pk', flat=True)]
+        if len(pks) > self.background_threshold and get_runner() is not None:
+            run_in_background(job, self.model._meta.label, pks, *args)
+            return len(pks), True
+        return run_now(job, self.model._meta.label, pks, *args), False
+
+    def trash_selected(self, request, queryset):
+        rows, background = self.run_bulk_action(
+            queryset, 'django_personals.trash.trash_pks',
+            request.user.pk if request.user.is_authenticated else None)
+        if background:
+            message = _('Moving %(count)d %(items)s to trash in background.')
+        else:
+            message = _('Moved %(count)d %(items)s to trash.')
+        self.message_user(request, message % {
+            'count': rows, 'items': self.model._meta.verbose_name_plural}, messages.SUCCESS)
+
+    trash_selected.short_description = _('Move selected %(verbose_name_plural)s to trash')
+
+    def restore_selected(self, request, queryset):
+        rows, background = self.run_bulk_action(queryset, 'django_personals.trash.restore_pks')
+        if background:
+            message = _('Restoring %(count)d %(items)s in background.')
+        else:
+            message = _('Restored %(count)d %(items)s.')
+        self.message_user(request, message % {
+            'count': rows, 'items': self.model._meta.verbose_name_plural}, messages.SUCCESS)
+
+    restore_selected.short_description = _('Restore selected %(verbose_name_plural)s')
+
+
+class PersonalModelAdmin(RelatedDefaultsMixin, KeysetPaginationMixin, TrashAdminMixin, admin.ModelAdmin):
+    pass
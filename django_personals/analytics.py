@@ -0,0 +1,314 @@
+"""
+    Skill level analytics.
+
+    histogram(Skill, 'python')          # [people at level 0, ..., level 10]
+    percentiles(Skill, 'python')        # {25: 4, 50: 6, 75: 7, 90: 9}
+    top_people(Skill, 'python', 10)     # best skill rows, person selected
+    cooccurrence(Skill, 'python')       # [('sql', 120), ('django', 87), ...]
+
+    Levels are integers from 0 to 10, so a distribution is 11 counts: one
+    grouped query (or a read of the summary table) answers histograms,
+    means and percentiles without loading skill rows. Trashed rows are not
+    counted.
+
+    Skill models listed in PERSONALS_SKILL_SUMMARY_MODELS keep SkillSummary
+    rows (distinct people per name and level), histograms of those models
+    read the summary table. Saves, deletes, trash and restore of one row add
+    or remove its person with F() updates on the database of the write,
+    unless the person keeps another live row of the same name and level.
+    Set based trash, restore and bulk upserts regroup the touched names and
+    purges rebuild the table. Rebuild it after raw SQL changes with
+    python manage.py rebuild_personals_skill_summary.
+
+    skill_matrix() loads a people x skills level matrix into NumPy (optional
+    dependency) for in-memory correlation and co-occurrence work.
+"""
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, router, transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from .conf import get_setting
+from .models import SkillAbstract, SkillSummary
+from .signals import (
+    post_bulk_restore, post_bulk_trash, post_bulk_upsert, post_purge, post_restore, post_trash)
+
+LEVELS = range(0, 11)
+PERCENTILES = (25, 50, 75, 90)
+
+
+def is_summarized(model):
+    labels = get_setting('SKILL_SUMMARY_MODELS')
+    return labels == '__all__' or model._meta.label_lower in [label.lower() for label in labels]
+
+
+def get_person_attname(model):
+    return model._meta.get_field('person').attname
+
+
+def to_histogram(counts):
+    """
+        Return [count of level 0, ..., count of level 10] of {level: count}
+    """
+    return [counts.get(level, 0) for level in LEVELS]
+
+
+def histograms(model, names=None, queryset=None):
+    """
+        Return {name: histogram} of names (default every skill), from the
+        summary table when model is summarized and no queryset is given.
+        A person with several rows of one name and level counts once.
+    """
+    if queryset is None and is_summarized(model):
+        rows = SkillSummary.objects.filter(model=model._meta.label_lower)
+    else:
+        rows = (model._default_manager.all() if queryset is None else queryset).order_by().values(
+            'name', 'level').annotate(people=Count(get_person_attname(model), distinct=True))
+    if names is not None:
+        rows = rows.filter(name__in=list(names))
+    counts = {}
+    for row in rows.values('name', 'level', 'people'):
+        counts.setdefault(row['name'], {})[row['level']] = row['people']
+    return {name: to_histogram(levels) for name, levels in counts.items()}
+
+
+def histogram(model, name, queryset=None):
+    return histograms(model, [name], queryset).get(name, to_histogram({}))
+
+
+def mean(histogram):
+    total = sum(histogram)
+    return sum(level * count for level, count in zip(LEVELS, histogram)) / total if total else None
+
+
+def percentile(histogram, q):
+    """
+        Nearest rank q-th percentile level of histogram, None when empty
+    """
+    total = sum(histogram)
+    if not total:
+        return None
+    rank = max(1, -(-q * total // 100))
+    seen = 0
+    for level, count in zip(LEVELS, histogram):
+        seen += count
+        if seen >= rank:
+            return level
+
+
+def percentiles(model, name, qs=PERCENTILES, queryset=None):
+    values = histogram(model, name, queryset)
+    return {q: percentile(values, q) for q in qs}
+
+
+def top_people(model, name, n=10, queryset=None):
+    """
+        Return the n live skill rows of name with the highest level
+    """
+    queryset = model._default_manager.all() if queryset is None else queryset
+    return queryset.filter(name=name).select_related('person').order_by('-level', 'pk')[:n]
+
+
+def cooccurrence(model, name, n=10):
+    """
+        Return [(other skill, people having both)] most common first
+    """
+    attname = get_person_attname(model)
+    people = model._default_manager.filter(name=name).values(attname)
+    rows = model._default_manager.filter(
+        **{'%s__in' % attname: people}
+    ).exclude(name=name).order_by().values('name').annotate(
+        people=Count(attname, distinct=True)).order_by('-people', 'name')[:n]
+    return [(row['name'], row['people']) for row in rows]
+
+
+def skill_matrix(model, names, queryset=None):
+    """
+        Return (person pks, numpy array of levels) with one column per
+        name, 0 where a person lacks the skill. Co-occurrence counts are
+        has.T @ has with has = (matrix > 0).astype(int).
+    """
+    try:
+        import numpy
+    except ImportError:
+        raise ImproperlyConfigured('skill_matrix() requires the numpy package.')
+    names = list(names)
+    attname = get_person_attname(model)
+    queryset = model._default_manager.all() if queryset is None else queryset
+    rows = list(queryset.filter(name__in=names).values_list(attname, 'name', 'level'))
+    people = sorted({row[0] for row in rows}, key=str)
+    row_index = {pk: index for index, pk in enumerate(people)}
+    column_index = {name: index for index, name in enumerate(names)}
+    matrix = numpy.zeros((len(people), len(names)), dtype=numpy.int8)
+    if rows:
+        pks, skills, levels = zip(*rows)
+        matrix[[row_index[pk] for pk in pks], [column_index[skill] for skill in skills]] = levels
+    return people, matrix
+
+
+def add_people(model, deltas, using=None):
+    """
+        Add {(name, level): people} deltas to SkillSummary rows of model
+        with F() updates, creating missing rows and deleting emptied ones
+    """
+    label = model._meta.label_lower
+    manager = SkillSummary._base_manager.db_manager(using)
+    for (name, level), amount in sorted(deltas.items(), key=str):
+        if name is None or level is None or not amount:
+            continue
+        rows = manager.filter(model=label, name=name, level=level)
+        with transaction.atomic(using=manager.db):
+            if amount < 0:
+                # a summary out of sync with the skill rows must not fail the write
+                rows.update(people=Greatest(F('people') + amount, 0))
+                rows.filter(people=0).delete()
+                continue
+            if rows.update(people=F('people') + amount):
+                continue
+            try:
+                with transaction.atomic(using=manager.db):
+                    manager.create(model=label, name=name, level=level, people=amount)
+            except IntegrityError:
+                # created by a concurrent writer since the update
+                rows.update(people=F('people') + amount)
+
+
+def refresh_summary(model, names, using=None):
+    """
+        Recompute SkillSummary rows of the given skill names
+    """
+    names = {name for name in names if name is not None}
+    if not names:
+        return
+    label = model._meta.label_lower
+    counts = histograms(model, names, queryset=model._default_manager.db_manager(using).all())
+    manager = SkillSummary._base_manager.db_manager(using)
+    with transaction.atomic(using=manager.db):
+        manager.filter(model=label, name__in=names).delete()
+        manager.bulk_create([
+            SkillSummary(model=label, name=name, level=level, people=people)
+            for name, values in counts.items()
+            for level, people in zip(LEVELS, values) if people])
+
+
+def refresh_rows(model, pks, using=None):
+    """
+        Recompute SkillSummary rows of the names of skill rows pks
+    """
+    manager = model._base_manager.db_manager(using)
+    for start in range(0, len(pks), 500):
+        refresh_summary(model, manager.filter(
+            pk__in=pks[start:start + 500]).values_list('name', flat=True).distinct(), using)
+
+
+def rebuild_summary(model, batch_size=500, using=None):
+    """
+        Recompute every SkillSummary row of model with one grouped query,
+        return the number of skill names
+    """
+    label = model._meta.label_lower
+    counts = histograms(model, queryset=model._default_manager.db_manager(using).all())
+    manager = SkillSummary._base_manager.db_manager(using)
+    with transaction.atomic(using=manager.db):
+        manager.filter(model=label).delete()
+        manager.bulk_create([
+            SkillSummary(model=label, name=name, level=level, people=people)
+            for name, values in counts.items()
+            for level, people in zip(LEVELS, values) if people], batch_size=batch_size)
+    return len(counts)
+
+
+def get_summarized_models():
+    return [
+        model for model in apps.get_models()
+        if issubclass(model, SkillAbstract) and is_summarized(model)]
+
+
+def has_twin(model, instance, name, level, using=None):
+    """
+        Whether the person of instance has another live row of name and level
+    """
+    return model._base_manager.db_manager(using).filter(
+        **{get_person_attname(model): getattr(instance, get_person_attname(model))}
+    ).filter(name=name, level=level, is_trash=False).exclude(pk=instance.pk).exists()
+
+
+def add_person(model, instance, deltas, using=None):
+    """
+        Apply {(name, level): 1 or -1} deltas of one skill row, skipping the
+        levels its person keeps through another row
+    """
+    add_people(model, {
+        (name, level): amount for (name, level), amount in deltas.items()
+        if amount and not has_twin(model, instance, name, level, using)}, using)
+
+
+def skill_saving(sender, instance, raw=False, update_fields=None, using=None, **kwargs):
+    if raw or instance._state.adding or not is_summarized(sender):
+        return
+    if update_fields is not None and not {'name', 'level'} & set(update_fields):
+        return
+    # the stored name and level lose one person
+    instance._summary_row = sender._base_manager.db_manager(using).filter(
+        pk=instance.pk).values_list('name', 'level', 'is_trash').first()
+
+
+def skill_saved(sender, instance, created, raw=False, using=None, **kwargs):
+    if raw or not is_summarized(sender) or not (created or '_summary_row' in instance.__dict__):
+        return
+    stored = instance.__dict__.pop('_summary_row', None)
+    deltas = {}
+    if stored is not None and not stored[2]:
+        deltas[stored[:2]] = -1
+    if not instance.is_trash:
+        key = (instance.name, instance.level)
+        deltas[key] = deltas.get(key, 0) + 1
+    add_person(sender, instance, deltas, using)
+
+
+def skill_deleted(sender, instance, using=None, **kwargs):
+    if is_summarized(sender) and not instance.is_trash:
+        add_person(sender, instance, {(instance.name, instance.level): -1}, using)
+
+
+def skill_trashed(sender, instance, **kwargs):
+    if is_summarized(sender):
+        add_person(sender, instance, {(instance.name, instance.level): -1}, instance._state.db)
+
+
+def skill_restored(sender, instance, **kwargs):
+    if is_summarized(sender):
+        add_person(sender, instance, {(instance.name, instance.level): 1}, instance._state.db)
+
+
+def skills_changed(sender, pks, **kwargs):
+    # set based trash, restore and upserts regroup the touched names,
+    # previous names and levels of upserted rows are gone
+    if is_summarized(sender):
+        refresh_rows(sender, pks, router.db_for_write(sender))
+
+
+def skills_purged(sender, **kwargs):
+    if is_summarized(sender):
+        rebuild_summary(sender, using=router.db_for_write(sender))
+
+
+def connect():
+    """
+        Keep summaries of skill models fresh, called from AppConfig.ready
+    """
+    uid = 'django_personals.analytics'
+    for model in apps.get_models():
+        if not issubclass(model, SkillAbstract):
+            continue
+        pre_save.connect(skill_saving, sender=model, dispatch_uid=uid)
+        post_save.connect(skill_saved, sender=model, dispatch_uid=uid)
+        post_delete.connect(skill_deleted, sender=model, dispatch_uid=uid)
+        post_trash.connect(skill_trashed, sender=model, dispatch_uid=uid)
+        post_restore.connect(skill_restored, sender=model, dispatch_uid=uid)
+        post_bulk_trash.connect(skills_changed, sender=model, dispatch_uid=uid)
+        post_bulk_restore.connect(skills_changed, sender=model, dispatch_uid=uid)
+        post_bulk_upsert.connect(skills_changed, sender=model, dispatch_uid=uid)
+        post_purge.connect(skills_purged, sender=model, dispatch_uid=uid)
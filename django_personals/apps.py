@@ -1,6 +1,15 @@
 from django.apps import AppConfig as AppConfigBase
 
+
 class AppConfig(AppConfigBase):
     name = 'django_personals'
     label = 'django_personals'
-    verbose_name = 'Django Personals'
\ No newline at end of file
+    verbose_name = 'Django Personals'
+
+    def ready(self):
+        from . import analytics, completeness, counters, directory, trash
+        counters.connect()
+        completeness.connect()
+        analytics.connect()
+        directory.connect()
+        trash.connect()
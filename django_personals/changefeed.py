@@ -0,0 +1,77 @@
+"""
+    Incremental change feed over BaseModel.modified_at.
+
+    Every save, trash and restore (single or set based), BaseQuerySet
+    update() and library bookkeeping update (counters, completeness,
+    trashed_by) bumps modified_at, trashed rows stay in the feed with
+    is_trash=True. Rows are read in
+    (modified_at, id) order with keyset cursors, and rows changed in the
+    last PERSONALS_CHANGE_FEED_LAG_SECONDS are held back so transactions
+    still in flight when a batch is read are not skipped.
+
+    cursor = load_cursor()
+    for batch in iter_changes(Person, cursor=cursor):
+        push(batch.objects)
+        save_cursor(batch.cursor)
+
+    Hard deleted rows leave no trace here, use paranoid delete for synced
+    models.
+"""
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .conf import get_setting
+from .pagination import KeysetPaginator
+
+ORDERING = ['modified_at', 'pk']
+
+
+class ChangeBatch:
+
+    def __init__(self, objects, cursor):
+        self.objects = objects
+        self.cursor = cursor
+
+    def __iter__(self):
+        return iter(self.objects)
+
+    def __len__(self):
+        return len(self.objects)
+
+
+def get_changes_queryset(model_or_queryset, lag=None):
+    if hasattr(model_or_queryset, '_meta'):
+        queryset = model_or_queryset.all_objects.all()
+    else:
+        queryset = model_or_queryset
+    if lag is None:
+        lag = get_setting('CHANGE_FEED_LAG_SECONDS')
+    if lag:
+        queryset = queryset.filter(modified_at__lt=timezone.now() - timedelta(seconds=lag))
+    return queryset
+
+
+def iter_changes(model_or_queryset, cursor=None, batch_size=1000, lag=None):
+    """
+        Yield ChangeBatch of rows changed after cursor (all rows when cursor
+        is None). Resume later from the cursor of the last batch.
+        Pass a model to include trashed rows, or any queryset.
+    """
+    queryset = get_changes_queryset(model_or_queryset, lag)
+    paginator = KeysetPaginator(queryset, batch_size, ordering=ORDERING)
+    for page in paginator.iterate(cursor):
+        if not page.object_list:
+            return
+        yield ChangeBatch(page.object_list, paginator.get_cursor(page.object_list[-1]))
+
+
+def get_latest_cursor(model_or_queryset, lag=None):
+    """
+        Cursor positioned after the last change, to start a feed
+        from now on after a full export
+    """
+    queryset = get_changes_queryset(model_or_queryset, lag)
+    paginator = KeysetPaginator(queryset, 1, ordering=ORDERING)
+    last = queryset.order_by('-modified_at', '-pk').first()
+    return paginator.get_cursor(last) if last is not None else None
@@ -0,0 +1,93 @@
+"""
+    Choice tables with labels translated lazily and memoized per language.
+
+    ChoiceTable is iterable like a regular choices tuple, so it can be given
+    to model and form fields. Labels are translated and title cased once
+    per language, on first use, then served from a dict.
+"""
+import weakref
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils import translation
+from django.utils.functional import lazy
+
+_tables = weakref.WeakSet()
+
+
+def title(label):
+    return str(label).title()
+
+
+class ChoiceTable:
+
+    def __init__(self, *choices, transform=title):
+        self.choices = choices
+        self.transform = transform
+        self._labels = {}
+        self._lazy_choices = None
+        _tables.add(self)
+
+    def get_labels(self, language=None):
+        """
+            Return {value: label} for language (default: active language)
+        """
+        if language is None:
+            language = translation.get_language() or settings.LANGUAGE_CODE
+        labels = self._labels.get(language)
+        if labels is None:
+            with translation.override(language):
+                labels = {value: self.transform(label) for value, label in self.choices}
+            self._labels[language] = labels
+        return labels
+
+    labels = property(get_labels)
+
+    def label(self, value, default=None, language=None):
+        return self.get_labels(language).get(value, default)
+
+    def values(self):
+        return [value for value, label in self.choices]
+
+    def clear_cache(self):
+        self._labels = {}
+
+    def __iter__(self):
+        # Lazy labels keep choices captured at import time (model fields,
+        # form classes) following the active language.
+        if self._lazy_choices is None:
+            self._lazy_choices = [
+                (value, lazy_label(self, value)) for value, label in self.choices]
+        return iter(self._lazy_choices)
+
+    def __len__(self):
+        return len(self.choices)
+
+    def __contains__(self, value):
+        return value in self.get_labels()
+
+    def __repr__(self):
+        return '<ChoiceTable %r>' % (self.values(),)
+
+
+lazy_label = lazy(lambda table, value: table.label(value), str)
+
+
+def get_display(instance, field_name, language=None):
+    """
+        Return the choice label of instance.field_name, like
+        get_FOO_display() but O(1) for ChoiceTable choices
+    """
+    field = instance._meta.get_field(field_name)
+    value = getattr(instance, field.attname)
+    if isinstance(field.choices, ChoiceTable):
+        return field.choices.label(value, default=value, language=language)
+    return dict(field.flatchoices).get(value, value)
+
+
+@receiver(setting_changed)
+def clear_choice_tables(setting, **kwargs):
+    if setting in ('LANGUAGE_CODE', 'LANGUAGES', 'LOCALE_PATHS'):
+        for table in list(_tables):
+            table.clear_cache()
@@ -0,0 +1,238 @@
+"""
+    Profile completeness score stored on person models.
+
+    class Person(PersonAbstract):
+        completeness = CompletenessField()
+
+    Weights are declared on the abstract models: COMPLETENESS_WEIGHTS maps
+    fields to weights for the person and its one-to-one profiles (contact,
+    social media), COMPLETENESS_PRESENCE weights having at least one live
+    row of a collection (skills, educations, work histories, addresses).
+    CompletenessField(weights={...}) replaces them with 'field',
+    'relation__field' and 'relation' criteria.
+
+    The score (0-100) is one SQL expression, a person save or a change of
+    one of its profiles recomputes that person only, rebuild_completeness()
+    and the rebuild_personals_completeness command recompute whole tables
+    in batched UPDATEs.
+"""
+from django.apps import apps
+from django.db import models, transaction
+from django.db.models import Case, Exists, OuterRef, Q, Value, When
+from django.db.models.functions import Cast
+from django.db.models.signals import post_delete, post_save, pre_delete
+
+from .models import BaseModel, is_deleting, parent_deleted, parent_deleting, update_rows
+from .profiles import get_profile_relations
+from .signals import post_bulk_restore, post_bulk_trash, post_bulk_upsert, post_restore, post_trash
+
+BATCH_SIZE = 10000
+
+
+class CompletenessField(models.PositiveSmallIntegerField):
+    """
+        Weighted share (0-100) of filled profile criteria
+    """
+
+    def __init__(self, weights=None, *args, **kwargs):
+        self.weights = weights
+        kwargs.setdefault('default', 0)
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('db_index', True)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.weights is not None:
+            kwargs['weights'] = self.weights
+        if kwargs.get('default') == 0:
+            del kwargs['default']
+        if kwargs.pop('editable', True):
+            kwargs['editable'] = True
+        if not kwargs.pop('db_index', False):
+            kwargs['db_index'] = False
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        if add and self in _scorers_by_field:
+            # a new person has no profiles yet, only its own fields count
+            value = _scorers_by_field[self].get_own_score(model_instance)
+            setattr(model_instance, self.attname, value)
+            return value
+        return super().pre_save(model_instance, add)
+
+
+def is_filled(field_name, field):
+    condition = Q(**{'%s__isnull' % field_name: False})
+    if isinstance(field, (models.CharField, models.TextField)):
+        condition &= ~Q(**{field_name: ''})
+    return condition
+
+
+def live(queryset):
+    if issubclass(queryset.model, BaseModel):
+        queryset = queryset.filter(is_trash=False)
+    return queryset
+
+
+class Scorer:
+    """
+        Completeness expression of one CompletenessField
+    """
+
+    def __init__(self, field):
+        self.field = field
+        self.model = field.model
+        single, multiple = get_profile_relations(self.model)
+        self.relations = {relation.get_accessor_name(): relation for relation in single + multiple}
+        self.weights = field.weights or self.get_declared_weights(single, multiple)
+        self.child_models = {}
+        for name in self.weights:
+            relation = self.relations.get(name.split('__')[0])
+            if relation is not None:
+                self.child_models[relation.related_model] = relation
+
+    def get_declared_weights(self, single, multiple):
+        weights = dict(getattr(self.model, 'COMPLETENESS_WEIGHTS', {}))
+        for relation in single:
+            for name, weight in getattr(relation.related_model, 'COMPLETENESS_WEIGHTS', {}).items():
+                weights['%s__%s' % (relation.get_accessor_name(), name)] = weight
+        for relation in multiple:
+            weight = getattr(relation.related_model, 'COMPLETENESS_PRESENCE', 0)
+            if weight:
+                weights[relation.get_accessor_name()] = weight
+        return weights
+
+    def get_term(self, name, weight):
+        relation_name, _, field_name = name.partition('__')
+        if relation_name not in self.relations:
+            field = self.model._meta.get_field(name)
+            return Case(When(is_filled(name, field), then=Value(weight)), default=Value(0),
+                        output_field=models.IntegerField())
+        relation = self.relations[relation_name]
+        children = live(relation.related_model._base_manager.filter(
+            **{relation.field.name: OuterRef('pk')}))
+        if field_name:
+            children = children.filter(is_filled(field_name, relation.related_model._meta.get_field(field_name)))
+        return Cast(Exists(children.order_by()), models.IntegerField()) * Value(weight)
+
+    def get_own_score(self, instance):
+        total = sum(self.weights.values())
+        if not total:
+            return 0
+        score = sum(
+            weight for name, weight in self.weights.items()
+            if name.split('__')[0] not in self.relations
+            and getattr(instance, self.model._meta.get_field(name).attname) not in (None, ''))
+        return score * 100 // total
+
+    def get_expression(self):
+        total = sum(self.weights.values())
+        if not total:
+            return Value(0, output_field=models.IntegerField())
+        score = None
+        for name, weight in sorted(self.weights.items()):
+            term = self.get_term(name, weight)
+            score = term if score is None else score + term
+        return Cast(score * Value(100) / Value(total), models.IntegerField())
+
+    def rebuild(self, queryset=None, batch_size=BATCH_SIZE):
+        """
+            Recompute scores of queryset (every row by default) with one
+            UPDATE per batch of batch_size rows, return updated rows
+        """
+        if queryset is None:
+            queryset = self.model._base_manager.all()
+        expression = self.get_expression()
+        pks = list(queryset.order_by('pk').values_list('pk', flat=True))
+        updated = 0
+        manager = self.model._base_manager.db_manager(queryset.db)
+        for start in range(0, len(pks), batch_size):
+            with transaction.atomic(using=queryset.db):
+                updated += update_rows(
+                    manager.filter(pk__in=pks[start:start + batch_size]), **{self.field.attname: expression})
+        return updated
+
+    def refresh(self, pks):
+        """
+            Recompute scores of the given people
+        """
+        pks = [pk for pk in pks if pk is not None]
+        if pks:
+            update_rows(
+                self.model._base_manager.filter(pk__in=pks), **{self.field.attname: self.get_expression()})
+
+    def get_parent_ids(self, sender, instance=None, pks=None):
+        attname = self.child_models[sender].field.attname
+        if instance is not None:
+            return [getattr(instance, attname)]
+        return list(sender._base_manager.filter(pk__in=pks).values_list(attname, flat=True).distinct())
+
+
+_scorers = []
+_scorers_by_field = {}
+
+
+def get_scorers(model=None):
+    return [scorer for scorer in _scorers if model is None or scorer.model is model]
+
+
+def rebuild_completeness(model, queryset=None, batch_size=BATCH_SIZE):
+    """
+        Recompute completeness fields of model in batched UPDATEs
+    """
+    return sum(scorer.rebuild(queryset, batch_size) for scorer in get_scorers(model))
+
+
+def person_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw or created:
+        return
+    for scorer in get_scorers(sender):
+        if update_fields is not None and not set(update_fields) & set(scorer.weights):
+            continue
+        scorer.refresh([instance.pk])
+        instance.refresh_from_db(fields=[scorer.field.attname])
+
+
+def child_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    for scorer in _scorers:
+        if sender in scorer.child_models:
+            scorer.refresh([
+                pk for pk in scorer.get_parent_ids(sender, instance=instance)
+                if not is_deleting(scorer.model, pk)])
+
+
+def children_changed(sender, pks, **kwargs):
+    for scorer in _scorers:
+        if sender in scorer.child_models:
+            for start in range(0, len(pks), 500):
+                scorer.refresh(scorer.get_parent_ids(sender, pks=pks[start:start + 500]))
+
+
+def connect():
+    """
+        Register completeness fields of installed models, called from
+        AppConfig.ready
+    """
+    del _scorers[:]
+    _scorers_by_field.clear()
+    for model in apps.get_models():
+        for field in model._meta.concrete_fields:
+            if isinstance(field, CompletenessField):
+                _scorers.append(Scorer(field))
+                _scorers_by_field[field] = _scorers[-1]
+    uid = 'django_personals.completeness'
+    for scorer in _scorers:
+        post_save.connect(person_saved, sender=scorer.model, dispatch_uid=uid)
+        pre_delete.connect(parent_deleting, sender=scorer.model, dispatch_uid='django_personals.deleting')
+        post_delete.connect(parent_deleted, sender=scorer.model, dispatch_uid='django_personals.deleting')
+        for child_model in scorer.child_models:
+            post_save.connect(child_changed, sender=child_model, dispatch_uid=uid)
+            post_delete.connect(child_changed, sender=child_model, dispatch_uid=uid)
+            post_trash.connect(child_changed, sender=child_model, dispatch_uid=uid)
+            post_restore.connect(child_changed, sender=child_model, dispatch_uid=uid)
+            post_bulk_trash.connect(children_changed, sender=child_model, dispatch_uid=uid)
+            post_bulk_restore.connect(children_changed, sender=child_model, dispatch_uid=uid)
+            post_bulk_upsert.connect(children_changed, sender=child_model, dispatch_uid=uid)
@@ -0,0 +1,56 @@
+from django.conf import settings
+
+DEFAULTS = {
+    # Read replica routing
+    'PRIMARY_DATABASE': 'default',
+    'REPLICA_DATABASES': [],
+    'REPLICA_PIN_SECONDS': 5,
+    # Instrumentation sinks, dotted paths or Sink instances
+    'INSTRUMENTATION_SINKS': [],
+    # Callable running background jobs: runner(func_path, *args), None runs them synchronously
+    'TASK_RUNNER': None,
+    # Change feed holds back rows changed in the last seconds
+    'CHANGE_FEED_LAG_SECONDS': 5,
+    # Model labels writing outbox events ('__all__' for every BaseModel)
+    'OUTBOX_MODELS': [],
+    # Outbox sink, dotted path or Sink instance
+    'OUTBOX_SINK': 'django_personals.outbox.LoggingSink',
+    # Failed deliveries before an event is left out as a dead letter
+    'OUTBOX_MAX_ATTEMPTS': 10,
+    # Seconds before the first retry of a failed event, doubled per attempt
+    'OUTBOX_RETRY_SECONDS': 30,
+    # Fernet keys of encrypted fields, the first one encrypts
+    'ENCRYPTION_KEYS': [],
+    # HMAC key of blind indexes, derived from SECRET_KEY when None
+    'BLIND_INDEX_KEY': None,
+    # Region of phone numbers written without country code
+    'PHONE_REGION': 'ID',
+    # Extra {region: (calling code, trunk prefix)} phone rules
+    'PHONE_RULES': {},
+    # Callable returning the tenant of a request, for TenantMiddleware
+    'TENANT_RESOLVER': 'django_personals.tenancy.get_request_tenant',
+    # Raise TenantRequired on tenant models queried outside a tenant scope
+    'TENANT_STRICT': False,
+    # Cache alias and timeout of CV section fragments
+    'CV_CACHE': 'default',
+    'CV_CACHE_TIMEOUT': 7 * 24 * 3600,
+    # Skill model labels keeping SkillSummary rows ('__all__' for every one)
+    'SKILL_SUMMARY_MODELS': [],
+    # Days trashed rows are kept before purge_expired erases them, None keeps them
+    'PURGE_AFTER_DAYS': None,
+    # Seconds purge sleeps between batches
+    'PURGE_PAUSE_SECONDS': 0,
+    # What deleting a user does to BaseModel.trashed_by: 'SET_NULL' or 'REASSIGN'
+    'TRASHED_BY_ON_DELETE': 'SET_NULL',
+    # User id receiving trashed_by references under 'REASSIGN'
+    'TRASHED_BY_REASSIGN_TO': None,
+    # Apply the policy in a background job when a user is deactivated
+    'TRASHED_BY_RELEASE_ON_DEACTIVATE': False,
+}
+
+
+def get_setting(name):
+    """
+        Return PERSONALS_<name> from django settings or the library default
+    """
+    return getattr(settings, 'PERSONALS_%s' % name, DEFAULTS[name])
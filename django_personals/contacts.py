@@ -0,0 +1,279 @@
+"""
+    Normalized contact lookup.
+
+    ContactAbstract keeps indexed phone_lookup, whatsapp_lookup and
+    email_lookup columns filled on write (E.164 phones, lowercased emails),
+    SocialAbstract stores canonical handles, so finding a person by contact
+    is one index lookup per contact column:
+
+    find_by_contact(Person, '0812-3456-7890')
+    find_by_contact(Person, 'Me@Mail.com')
+    find_by_contact(Person, 'https://twitter.com/@someone')
+
+    Lookup columns of an encrypted source (EncryptedCharField) stay empty,
+    find_by_contact() searches the BlindIndexField of the source instead,
+    give it the normalizer of the lookup (normalize_phone, normalize_email).
+
+    Phones without country code use PERSONALS_PHONE_REGION. Rows written
+    by queryset.update() or raw SQL are refreshed with the
+    backfill_personals_contacts command.
+"""
+import re
+
+from django.core import checks
+from django.db import models, transaction
+
+from .conf import get_setting
+from .encryption import EncryptedMixin, blind_index, get_blind_index_fields
+
+# region: (country calling code, trunk prefix), offline subset of the
+# ITU-T E.164 assignments, extend through PERSONALS_PHONE_RULES
+PHONE_RULES = {
+    'AU': ('61', '0'),
+    'BN': ('673', ''),
+    'CN': ('86', '0'),
+    'DE': ('49', '0'),
+    'FR': ('33', '0'),
+    'GB': ('44', '0'),
+    'ID': ('62', '0'),
+    'IN': ('91', '0'),
+    'JP': ('81', '0'),
+    'KH': ('855', '0'),
+    'KR': ('82', '0'),
+    'LA': ('856', '0'),
+    'MM': ('95', '0'),
+    'MY': ('60', '0'),
+    'NL': ('31', '0'),
+    'PH': ('63', '0'),
+    'SA': ('966', '0'),
+    'SG': ('65', ''),
+    'TH': ('66', '0'),
+    'TL': ('670', ''),
+    'US': ('1', '1'),
+    'VN': ('84', '0'),
+}
+
+E164_MIN_DIGITS = 7
+E164_MAX_DIGITS = 15
+
+EMAIL = re.compile(r'^(mailto:)?[^@\s]+@[^@\s]+$', re.I)
+PHONE = re.compile(r'^\+?[\d\s().-]+$')
+HANDLE_URL = re.compile(r'^(?:https?://)?(?:www\.|m\.)?[a-z0-9.-]+\.[a-z]+/(?:(?:c|user|channel)/)?', re.I)
+
+
+def get_phone_rule(region=None):
+    rules = dict(PHONE_RULES, **get_setting('PHONE_RULES'))
+    return rules[(region or get_setting('PHONE_REGION')).upper()]
+
+
+def normalize_phone(value, region=None):
+    """
+        Return value in E.164 (+628123456789) or None when it can not be
+        a phone number
+    """
+    if not value:
+        return None
+    value = str(value).strip()
+    digits = re.sub(r'\D', '', value)
+    if value.startswith('+'):
+        pass
+    elif digits.startswith('00'):
+        digits = digits[2:]
+    else:
+        code, trunk = get_phone_rule(region)
+        if trunk and digits.startswith(trunk) and not digits.startswith(code):
+            digits = code + digits[len(trunk):]
+        elif not digits.startswith(code):
+            digits = code + digits
+    if not E164_MIN_DIGITS <= len(digits) <= E164_MAX_DIGITS:
+        return None
+    return '+' + digits
+
+
+def normalize_email(value):
+    if not value:
+        return None
+    value = str(value).strip().lower()
+    if value.startswith('mailto:'):
+        value = value[7:]
+    return value if '@' in value else None
+
+
+def normalize_handle(value):
+    """
+        Return the lowercased handle of a social profile url, @handle
+        or handle
+    """
+    if not value:
+        return None
+    value = HANDLE_URL.sub('', str(value).strip())
+    value = value.split('?')[0].strip('/').lstrip('@').lower()
+    return value or None
+
+
+class LookupField(models.CharField):
+    """
+        Indexed normalized copy of the field named source
+    """
+
+    def __init__(self, source=None, normalizer=normalize_email, *args, **kwargs):
+        self.source = source
+        self.normalizer = normalizer
+        kwargs.setdefault('max_length', 128)
+        kwargs.setdefault('null', True)
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('db_index', True)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['source'] = self.source
+        kwargs['normalizer'] = self.normalizer
+        if kwargs.get('max_length') == 128:
+            del kwargs['max_length']
+        if not kwargs.pop('null', False):
+            kwargs['null'] = False
+        if kwargs.pop('editable', True):
+            kwargs['editable'] = True
+        if not kwargs.pop('db_index', False):
+            kwargs['db_index'] = False
+        return name, path, args, kwargs
+
+    def check(self, **kwargs):
+        return super().check(**kwargs) + self._check_encrypted_source()
+
+    def _check_encrypted_source(self):
+        if self.model._meta.abstract or not self.is_encrypted() or self.get_blind_index() is not None:
+            return []
+        return [checks.Error(
+            "'%s' is encrypted and has no BlindIndexField." % self.source,
+            hint='Add a BlindIndexField for it, find_by_contact() searches it instead of %s.' % self.name,
+            obj=self,
+            id='django_personals.E001',
+        )]
+
+    def get_source_field(self):
+        return self.model._meta.get_field(self.source)
+
+    def is_encrypted(self):
+        """
+            Whether the source is encrypted, the lookup then stays empty
+        """
+        return isinstance(self.get_source_field(), EncryptedMixin)
+
+    def get_blind_index(self):
+        for field in get_blind_index_fields(self.model):
+            if field.source == self.source:
+                return field
+        return None
+
+    def compute(self, values):
+        if self.is_encrypted():
+            return None
+        return self.normalizer(values.get(self.source))
+
+    def pre_save(self, model_instance, add):
+        if self.is_encrypted():
+            value = None
+        else:
+            value = self.normalizer(getattr(model_instance, self.source))
+        setattr(model_instance, self.attname, value)
+        return value
+
+
+def get_lookup_fields(model):
+    return [field for field in model._meta.concrete_fields if isinstance(field, LookupField)]
+
+
+def get_contact_relations(person_model):
+    """
+        Return reverse relations of person_model to contact and social models
+    """
+    from .models import ContactAbstract, SocialAbstract
+    return [
+        relation for relation in person_model._meta.related_objects
+        if issubclass(relation.related_model, (ContactAbstract, SocialAbstract))]
+
+
+def get_contact_kind(value):
+    """
+        Return ('email', 'phone' or 'handle', normalized value)
+    """
+    value = str(value).strip()
+    if EMAIL.match(value):
+        return 'email', normalize_email(value)
+    if PHONE.match(value):
+        return 'phone', normalize_phone(value)
+    return 'handle', normalize_handle(value)
+
+
+def get_contact_querysets(relation, kind, value):
+    """
+        Return one queryset of person ids per indexed column of relation
+        rows equal to the normalized value of kind
+    """
+    from .models import ContactAbstract, SocialAbstract
+    model = relation.related_model
+    if issubclass(model, ContactAbstract):
+        names = {'email': ['email_lookup'], 'phone': ['phone_lookup', 'whatsapp_lookup']}.get(kind, [])
+    elif issubclass(model, SocialAbstract) and kind == 'handle':
+        names = model.HANDLE_FIELDS
+    else:
+        names = []
+    querysets = []
+    for name in names:
+        field = model._meta.get_field(name)
+        if isinstance(field, LookupField) and field.is_encrypted():
+            index = field.get_blind_index()
+            if index is None:
+                continue
+            lookup = {index.name: blind_index(value, index.normalizer)}
+        else:
+            lookup = {name: value}
+        querysets.append(model._base_manager.filter(**lookup).order_by().values(relation.field.attname))
+    return querysets
+
+
+def find_by_contact(person_model, value):
+    """
+        Return people of person_model having value as phone, whatsapp,
+        email or social handle
+    """
+    kind, value = get_contact_kind(value)
+    querysets = []
+    for relation in get_contact_relations(person_model) if value else []:
+        querysets += get_contact_querysets(relation, kind, value)
+    if not querysets:
+        return person_model._default_manager.none()
+    return person_model._default_manager.filter(pk__in=querysets[0].union(*querysets[1:]))
+
+
+def backfill_contacts(model, batch_size=1000, using=None):
+    """
+        Recompute lookup columns and canonical handles of every row of
+        model, one transaction per batch. Return the number of updated rows.
+    """
+    manager = model._base_manager.db_manager(using)
+    fields = get_lookup_fields(model)
+    handles = list(getattr(model, 'HANDLE_FIELDS', ()))
+    names = [field.name for field in fields] + handles
+    if not names:
+        return 0
+    updated = 0
+    pks = list(manager.order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(pks), batch_size):
+        with transaction.atomic(using=manager.db):
+            objs = list(manager.filter(pk__in=pks[start:start + batch_size]))
+            changed = []
+            for obj in objs:
+                before = [getattr(obj, name) for name in names]
+                for name in handles:
+                    setattr(obj, name, normalize_handle(getattr(obj, name)))
+                for field in fields:
+                    field.pre_save(obj, False)
+                if before != [getattr(obj, name) for name in names]:
+                    changed.append(obj)
+            if changed:
+                manager.bulk_update(changed, names)
+            updated += len(changed)
+    return updated
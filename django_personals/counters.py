@@ -0,0 +1,163 @@
+"""
+    Denormalized counters of live child rows on person models.
+
+    class Person(PersonAbstract):
+        skills_count = CounterField('skills')
+
+    Counters follow creation, hard delete, trash and restore of children
+    with atomic F() updates, set based trash and restore recompute the
+    counters of affected people. Children deleted along with their person
+    leave its counters alone. Saving a person never writes its
+    counters. Bulk loads (bulk_create, queryset.update)
+    bypass them, run rebuild_counters() or the rebuild_personals_counters
+    command afterwards.
+"""
+from django.apps import apps
+from django.db import models
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save, pre_delete
+
+from .models import BaseModel, is_deleting, parent_deleted, parent_deleting, update_rows
+from .signals import post_bulk_restore, post_bulk_trash, post_bulk_upsert, post_restore, post_trash
+
+
+class CounterField(models.PositiveIntegerField):
+    """
+        Number of live rows in the reverse relation named relation
+    """
+    # BaseModel.save() leaves the column out of UPDATEs, so an instance
+    # loaded before a child change does not write its stale count back
+    saved_on_update = False
+
+    def __init__(self, relation=None, *args, **kwargs):
+        self.relation = relation
+        kwargs.setdefault('default', 0)
+        kwargs.setdefault('editable', False)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['relation'] = self.relation
+        if kwargs.get('default') == 0:
+            del kwargs['default']
+        if kwargs.pop('editable', True):
+            kwargs['editable'] = True
+        return name, path, args, kwargs
+
+    def get_relation(self):
+        for relation in self.model._meta.related_objects:
+            if relation.get_accessor_name() == self.relation:
+                return relation
+        raise LookupError('%s has no relation named %s.' % (self.model._meta.label, self.relation))
+
+
+class Counter:
+
+    def __init__(self, field):
+        self.field = field
+        self.relation = field.get_relation()
+        self.model = field.model
+        self.child_model = self.relation.related_model
+        self.attname = self.relation.field.attname
+
+    def is_live(self, instance):
+        return not getattr(instance, 'is_trash', False)
+
+    def add(self, instance, amount):
+        parent_id = getattr(instance, self.attname)
+        if parent_id is None:
+            return
+        name = self.field.attname
+        update_rows(self.model._base_manager.filter(pk=parent_id), **{name: F(name) + amount})
+
+    def get_count_subquery(self):
+        children = self.child_model._base_manager.filter(
+            **{self.relation.field.name: OuterRef('pk')})
+        if issubclass(self.child_model, BaseModel):
+            children = children.filter(is_trash=False)
+        return Coalesce(Subquery(
+            children.order_by().values(self.relation.field.name).annotate(
+                count=Count('*')).values('count'),
+            output_field=models.IntegerField()), 0)
+
+    def rebuild(self, queryset=None):
+        if queryset is None:
+            queryset = self.model._base_manager.all()
+        return update_rows(queryset, **{self.field.attname: self.get_count_subquery()})
+
+
+_counters = {}
+
+
+def get_counters(model=None):
+    """
+        Return every Counter, or the counters of the given person model
+    """
+    counters = [counter for counters in _counters.values() for counter in counters]
+    if model is not None:
+        counters = [counter for counter in counters if counter.model is model]
+    return counters
+
+
+def rebuild_counters(model, queryset=None):
+    """
+        Recompute counters of model with one UPDATE per counter
+    """
+    for counter in get_counters(model):
+        counter.rebuild(queryset)
+
+
+def child_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        for counter in _counters.get(sender, []):
+            if counter.is_live(instance):
+                counter.add(instance, 1)
+
+
+def child_deleted(sender, instance, **kwargs):
+    for counter in _counters.get(sender, []):
+        if counter.is_live(instance) and not is_deleting(counter.model, getattr(instance, counter.attname)):
+            counter.add(instance, -1)
+
+
+def child_trashed(sender, instance, **kwargs):
+    for counter in _counters.get(sender, []):
+        counter.add(instance, -1)
+
+
+def child_restored(sender, instance, **kwargs):
+    for counter in _counters.get(sender, []):
+        counter.add(instance, 1)
+
+
+def children_changed(sender, pks, **kwargs):
+    for counter in _counters.get(sender, []):
+        for start in range(0, len(pks), 500):
+            parents = sender._base_manager.filter(
+                pk__in=pks[start:start + 500]).values(counter.attname)
+            counter.rebuild(counter.model._base_manager.filter(pk__in=parents))
+
+
+def connect():
+    """
+        Register counters of installed models, called from AppConfig.ready
+    """
+    _counters.clear()
+    for model in apps.get_models():
+        for field in model._meta.concrete_fields:
+            if isinstance(field, CounterField):
+                counter = Counter(field)
+                _counters.setdefault(counter.child_model, []).append(counter)
+    for child_model in _counters:
+        uid = 'django_personals.counters'
+        post_save.connect(child_created, sender=child_model, dispatch_uid=uid)
+        post_delete.connect(child_deleted, sender=child_model, dispatch_uid=uid)
+        post_trash.connect(child_trashed, sender=child_model, dispatch_uid=uid)
+        post_restore.connect(child_restored, sender=child_model, dispatch_uid=uid)
+        post_bulk_trash.connect(children_changed, sender=child_model, dispatch_uid=uid)
+        post_bulk_restore.connect(children_changed, sender=child_model, dispatch_uid=uid)
+        post_bulk_upsert.connect(children_changed, sender=child_model, dispatch_uid=uid)
+    for counter in get_counters():
+        pre_delete.connect(parent_deleting, sender=counter.model, dispatch_uid='django_personals.deleting')
+        post_delete.connect(parent_deleted, sender=counter.model, dispatch_uid='django_personals.deleting')
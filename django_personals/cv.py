@@ -0,0 +1,249 @@
+"""
+    Resume / CV rendering of person models.
+
+    render_cv(person)                           # HTML of one person
+    for person, html in render_cvs(Person.objects.filter(...)):
+        ...
+    for chunk in export_cvs(queryset, processes=8):   # commands and tasks only
+        output.write(chunk)
+
+    A CV is the person header (person, contact and social media rows) plus
+    one section per history collection: work, education, courses,
+    volunteering, awards, publications and skills. Sections are rendered
+    with django_personals/cv/<accessor>.html, falling back to
+    django_personals/cv/section.html, and cached in PERSONALS_CV_CACHE under
+    the section version: latest modified_at and count of its live rows.
+    A change, trash, restore or delete of a row bumps the version of its
+    section only, other sections of the person are served from the cache.
+    Rows changed by raw SQL or a plain QuerySet.update() are not seen.
+
+    export_cvs() renders batches of people in a process pool and streams a
+    zip archive while batches complete, workers share fragments through the
+    cache when it is not process local (memcached, redis, database). It
+    closes the database connections of the calling process and forks it,
+    so call it from management commands or task workers, never from a view.
+"""
+import hashlib
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from django.apps import apps
+from django.core.cache import caches
+from django.db import connections
+from django.db.models import Count, Max
+from django.template.loader import render_to_string, select_template
+from django.utils import translation
+from django.utils.safestring import mark_safe
+
+from .conf import get_setting
+from .models import (
+    AwardAbstract, FormalEduAbstract, NonFormalEduAbstract, PublicationAbstract,
+    SkillAbstract, VolunteerAbstract, WorkingAbstract
+)
+from .profiles import get_profile_relations
+
+_ = translation.gettext_lazy
+
+TEMPLATE_NAME = 'django_personals/cv/cv.html'
+BATCH_SIZE = 100
+
+# abstract model, section title, row ordering
+SECTIONS = (
+    (WorkingAbstract, _('Work experience'), ('-date_start',)),
+    (FormalEduAbstract, _('Education'), ('-date_start',)),
+    (NonFormalEduAbstract, _('Courses and training'), ('-date_start',)),
+    (VolunteerAbstract, _('Volunteering'), ('-date_start',)),
+    (AwardAbstract, _('Awards'), ('-date',)),
+    (PublicationAbstract, _('Publications'), ('-date_published',)),
+    (SkillAbstract, _('Skills'), ('-level', 'name')),
+)
+
+
+class Section:
+
+    def __init__(self, relation, title, ordering):
+        self.relation = relation
+        self.title = title
+        self.name = relation.get_accessor_name()
+        self.model = relation.related_model
+        self.ordering = tuple(ordering) + ('pk',)
+        self.person_attname = relation.field.attname
+        self.template = select_template([
+            'django_personals/cv/%s.html' % self.name, 'django_personals/cv/section.html'])
+
+    def get_versions(self, pks):
+        """
+            Return {person pk: (latest modified_at, rows)} of live rows
+        """
+        rows = self.model._default_manager.filter(
+            **{'%s__in' % self.person_attname: pks}
+        ).order_by().values(self.person_attname).annotate(latest=Max('modified_at'), rows=Count('pk'))
+        return {row[self.person_attname]: (row['latest'], row['rows']) for row in rows}
+
+    def get_rows(self, pks):
+        grouped = {pk: [] for pk in pks}
+        queryset = self.model._default_manager.filter(
+            **{'%s__in' % self.person_attname: pks}).order_by(*self.ordering)
+        for row in queryset:
+            grouped[getattr(row, self.person_attname)].append(row)
+        return grouped
+
+    def render(self, rows):
+        return self.template.render({'title': self.title, 'name': self.name, 'rows': rows})
+
+
+def get_sections(person_model):
+    """
+        Return CV sections of person_model in SECTIONS order
+    """
+    single, multiple = get_profile_relations(person_model)
+    sections = []
+    for abstract, title, ordering in SECTIONS:
+        for relation in multiple:
+            if issubclass(relation.related_model, abstract):
+                sections.append(Section(relation, title, ordering))
+    return sections
+
+
+class CVRenderer:
+    """
+        Render CVs of person_model with cached section fragments
+    """
+
+    def __init__(self, person_model, template_name=TEMPLATE_NAME, cache_alias=None, timeout=None):
+        self.person_model = person_model
+        self.template_name = template_name
+        self.sections = get_sections(person_model)
+        self.single = [relation.get_accessor_name() for relation in get_profile_relations(person_model)[0]]
+        self.cache = caches[cache_alias or get_setting('CV_CACHE')]
+        self.timeout = get_setting('CV_CACHE_TIMEOUT') if timeout is None else timeout
+
+    def get_cache_key(self, section, pk, version):
+        latest, rows = version
+        digest = hashlib.md5(('%s:%s:%s:%s' % (
+            latest.isoformat() if latest else '', rows, translation.get_language(),
+            section.template.origin.name)).encode()).hexdigest()
+        return 'personals:cv:%s:%s:%s:%s' % (
+            self.person_model._meta.label_lower, section.name, pk, digest)
+
+    def render_sections(self, pks):
+        """
+            Return {person pk: [(title, html)]}, rendering and caching the
+            sections missing from the cache with one query per section
+        """
+        fragments = {pk: {} for pk in pks}
+        for section in self.sections:
+            # people without live rows have no section
+            versions = section.get_versions(pks)
+            keys = {pk: self.get_cache_key(section, pk, version) for pk, version in versions.items()}
+            cached = self.cache.get_many(list(keys.values()))
+            missing = [pk for pk in keys if keys[pk] not in cached]
+            if missing:
+                rendered = {keys[pk]: section.render(rows) for pk, rows in section.get_rows(missing).items()}
+                self.cache.set_many(rendered, self.timeout)
+                cached.update(rendered)
+            for pk, key in keys.items():
+                fragments[pk][section] = mark_safe(cached[key])
+        return {
+            pk: [(section.title, fragments[pk][section]) for section in self.sections if section in fragments[pk]]
+            for pk in pks}
+
+    def render_many(self, queryset):
+        """
+            Yield (person, html) of each person of queryset
+        """
+        people = list(queryset.select_related(*self.single))
+        sections = self.render_sections([person.pk for person in people])
+        for person in people:
+            yield person, render_to_string(self.template_name, {
+                'person': person, 'sections': sections[person.pk]})
+
+    def render(self, person):
+        queryset = self.person_model._base_manager.db_manager(person._state.db).filter(pk=person.pk)
+        return next(self.render_many(queryset))[1]
+
+
+def render_cv(person, template_name=TEMPLATE_NAME):
+    return CVRenderer(type(person), template_name).render(person)
+
+
+def render_cvs(queryset, template_name=TEMPLATE_NAME, batch_size=BATCH_SIZE):
+    """
+        Yield (person, html) of queryset, batch_size people at a time
+    """
+    renderer = CVRenderer(queryset.model, template_name)
+    pks = list(queryset.order_by('pk').values_list('pk', flat=True))
+    manager = queryset.model._base_manager.db_manager(queryset.db)
+    for start in range(0, len(pks), batch_size):
+        yield from renderer.render_many(manager.filter(pk__in=pks[start:start + batch_size]).order_by('pk'))
+
+
+def render_batch(label, pks, template_name=TEMPLATE_NAME, using=None):
+    """
+        Return [(file name, html)] of the people pks of model label, run by
+        export_cvs() workers
+    """
+    model = apps.get_model(label)
+    queryset = model._base_manager.db_manager(using).filter(pk__in=pks).order_by('pk')
+    return [
+        ('%s.html' % person.pk, html)
+        for person, html in CVRenderer(model, template_name).render_many(queryset)]
+
+
+def init_worker():
+    import django
+    # processes started with spawn import settings again
+    django.setup()
+
+
+class ZipStream:
+    """
+        Write only file object handing zip output over in chunks
+    """
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data, self.chunks = b''.join(self.chunks), []
+        return data
+
+
+def iter_zip(entries):
+    """
+        Yield a zip archive of (name, text) entries in chunks, one per entry
+    """
+    stream = ZipStream()
+    with zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, text in entries:
+            archive.writestr(name, text)
+            yield stream.pop()
+    yield stream.pop()
+
+
+def export_cvs(queryset, processes=None, batch_size=BATCH_SIZE, template_name=TEMPLATE_NAME):
+    """
+        Yield chunks of a zip archive holding <pk>.html of every person of
+        queryset. Batches of batch_size people are rendered in a pool of
+        processes (os.cpu_count() by default), processes=0 renders in this
+        process. The pool closes the connections of this process, do not
+        call it inside a request or an open transaction.
+    """
+    label = queryset.model._meta.label
+    pks = list(queryset.order_by('pk').values_list('pk', flat=True))
+    batches = [pks[start:start + batch_size] for start in range(0, len(pks), batch_size)]
+    arguments = ([label] * len(batches), batches, [template_name] * len(batches), [queryset.db] * len(batches))
+    if processes == 0 or len(batches) < 2:
+        yield from iter_zip(entry for batch in map(render_batch, *arguments) for entry in batch)
+        return
+    # forked workers must not share the connections of this process
+    connections.close_all()
+    with ProcessPoolExecutor(processes, initializer=init_worker) as executor:
+        yield from iter_zip(entry for batch in executor.map(render_batch, *arguments) for entry in batch)
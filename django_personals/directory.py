@@ -0,0 +1,321 @@
+"""
+    Flat people directory maintained from profile changes.
+
+    class Directory(DirectoryAbstract):
+        person = models.OneToOneField(
+            Person, primary_key=True, on_delete=models.CASCADE, related_name='directory')
+
+    Directory.objects.search('bandung').order_by('name')
+
+    Each live person has one indexed row holding its name, gender, contact
+    email and phone, primary address city and country, current institution
+    and position (latest live work history) and live skill count, so staff
+    listings read one table without joins nor is_trash filters.
+
+    Saving, trashing, restoring or deleting a person or one of its contact,
+    address, work or skill rows, and the bulk trash/restore/upsert of those,
+    mark the person dirty. Dirty people of a transaction are refreshed once
+    when it commits, with one SELECT, DELETE and INSERT per batch of people.
+    The table works the same on every database, where a PostgreSQL
+    materialized view could only be refreshed whole. Rebuild it after raw
+    SQL changes with python manage.py rebuild_personals_directory.
+"""
+import weakref
+
+from django.apps import apps
+from django.db import models, router, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone, translation
+
+from .completeness import live
+from .enums import MaxLength
+from .models import AddressAbstract, ContactAbstract, SkillAbstract, WorkingAbstract
+from .profiles import get_profile_relations
+from .signals import post_bulk_restore, post_bulk_trash, post_bulk_upsert, post_restore, post_trash
+
+_ = translation.gettext_lazy
+
+BATCH_SIZE = 1000
+
+# person fields whose change refreshes the entry
+PERSON_FIELDS = ('nickname', 'gender', 'is_trash')
+
+NONE = Value(None, output_field=models.CharField())
+
+
+class DirectoryQuerySet(models.QuerySet):
+
+    def search(self, text):
+        """
+            Entries whose name, email, city, institution or position
+            contains text
+        """
+        condition = Q()
+        for name in ('name', 'email', 'city', 'institution', 'position'):
+            condition |= Q(**{'%s__icontains' % name: text})
+        return self.filter(condition)
+
+    def people(self):
+        """
+            Person queryset of the entries
+        """
+        person_model = self.model._meta.get_field('person').related_model
+        return person_model.objects.filter(pk__in=self.values('person'))
+
+
+class DirectoryAbstract(models.Model):
+    """
+        Directory row of one person, declare person as a primary key
+        OneToOneField to the person model
+    """
+    class Meta:
+        abstract = True
+
+    objects = DirectoryQuerySet.as_manager()
+
+    name = models.CharField(
+        max_length=MaxLength.MEDIUM.value,
+        null=True, blank=True, db_index=True,
+        verbose_name=_('name'))
+    gender = models.CharField(
+        max_length=1,
+        null=True, blank=True,
+        verbose_name=_('gender'))
+    email = models.CharField(
+        max_length=MaxLength.SHORT.value,
+        null=True, blank=True,
+        verbose_name=_('email'))
+    phone = models.CharField(
+        max_length=MaxLength.SHORT.value,
+        null=True, blank=True,
+        verbose_name=_('phone'))
+    city = models.CharField(
+        max_length=MaxLength.SHORT.value,
+        null=True, blank=True, db_index=True,
+        verbose_name=_('city'))
+    country = models.CharField(
+        max_length=MaxLength.SHORT.value,
+        null=True, blank=True,
+        verbose_name=_('country'))
+    institution = models.CharField(
+        max_length=MaxLength.MEDIUM.value,
+        null=True, blank=True, db_index=True,
+        verbose_name=_('institution'))
+    position = models.CharField(
+        max_length=MaxLength.MEDIUM.value,
+        null=True, blank=True, db_index=True,
+        verbose_name=_('position'))
+    skills_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('skills'))
+    refreshed_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name=_('refreshed at'))
+
+    def __str__(self):
+        return self.name or str(self.pk)
+
+
+def find_relation(relations, abstract):
+    for relation in relations:
+        if issubclass(relation.related_model, abstract):
+            return relation
+    return None
+
+
+class Directory:
+    """
+        Refresh logic of one DirectoryAbstract model
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.person_model = model._meta.get_field('person').related_model
+        single, multiple = get_profile_relations(self.person_model)
+        self.contact = find_relation(single, ContactAbstract)
+        self.address = find_relation(multiple, AddressAbstract)
+        self.working = find_relation(multiple, WorkingAbstract)
+        self.skills = find_relation(multiple, SkillAbstract)
+        self.child_models = {
+            relation.related_model: relation
+            for relation in (self.contact, self.address, self.working, self.skills) if relation}
+
+    def get_children(self, relation, *ordering):
+        return live(relation.related_model._base_manager.filter(
+            **{relation.field.name: OuterRef('pk')})).order_by(*ordering)
+
+    def get_first(self, relation, field_name, *ordering):
+        if relation is None:
+            return NONE
+        return Subquery(self.get_children(relation, *ordering).values(field_name)[:1])
+
+    def get_expressions(self):
+        """
+            Return {entry column: expression over the person model}
+        """
+        person_fields = {field.name for field in self.person_model._meta.concrete_fields}
+        expressions = {
+            'name': F('nickname') if 'nickname' in person_fields else NONE,
+            'gender': F('gender'),
+            'city': self.get_first(self.address, 'city', '-is_primary', 'pk'),
+            'country': self.get_first(self.address, 'country', '-is_primary', 'pk'),
+            'institution': self.get_first(self.working, 'institution', '-date_start', '-pk'),
+            'position': self.get_first(self.working, 'position', '-date_start', '-pk'),
+            'skills_count': Value(0, output_field=models.IntegerField()),
+        }
+        for name in ('email', 'phone'):
+            expressions[name] = self.get_first(self.contact, name)
+        if self.skills is not None:
+            expressions['skills_count'] = Coalesce(Subquery(
+                self.get_children(self.skills).values(self.skills.field.name).annotate(
+                    count=Count('*')).values('count'),
+                output_field=models.IntegerField()), 0)
+        return expressions
+
+    def refresh(self, pks, batch_size=BATCH_SIZE, using=None):
+        """
+            Recompute entries of the given people, drop entries of trashed
+            or deleted people
+        """
+        using = using or router.db_for_write(self.model)
+        people = self.person_model._base_manager.db_manager(using)
+        manager = self.model._base_manager.db_manager(using)
+        pks = list({pk for pk in pks if pk is not None})
+        expressions = self.get_expressions()
+        now = timezone.now()
+        for start in range(0, len(pks), batch_size):
+            batch = pks[start:start + batch_size]
+            rows = people.filter(pk__in=batch, is_trash=False).annotate(**{
+                'directory_%s' % name: expression for name, expression in expressions.items()
+            }).values('pk', *['directory_%s' % name for name in expressions])
+            entries = [
+                self.model(person_id=row['pk'], refreshed_at=now, **{
+                    name: row['directory_%s' % name] for name in expressions})
+                for row in rows]
+            with transaction.atomic(using=using):
+                manager.filter(person_id__in=batch).delete()
+                manager.bulk_create(entries)
+
+    def rebuild(self, batch_size=BATCH_SIZE, using=None):
+        """
+            Recompute every entry, return the number of people
+        """
+        using = using or router.db_for_write(self.model)
+        people = self.person_model._base_manager.db_manager(using).filter(is_trash=False)
+        pks = list(people.values_list('pk', flat=True))
+        self.model._base_manager.db_manager(using).exclude(person_id__in=people.values('pk')).delete()
+        self.refresh(pks, batch_size, using)
+        return len(pks)
+
+    def get_parent_ids(self, sender, instance=None, pks=None, using=None):
+        attname = self.child_models[sender].field.attname
+        if instance is not None:
+            return [getattr(instance, attname)]
+        return list(sender._base_manager.db_manager(using).filter(
+            pk__in=pks).values_list(attname, flat=True).distinct())
+
+
+class PendingRefresh:
+    """
+        on_commit callback refreshing the people marked dirty in a
+        transaction, parents of bulk changed children are looked up then
+    """
+
+    def __init__(self, directory, using):
+        self.directory = directory
+        self.using = using
+        self.pks = set()
+        self.children = {}
+
+    def __call__(self):
+        for sender, pks in self.children.items():
+            pks = list(pks)
+            for start in range(0, len(pks), 500):
+                self.pks.update(self.directory.get_parent_ids(sender, pks=pks[start:start + 500], using=self.using))
+        self.directory.refresh(self.pks, using=self.using)
+
+
+# (connection, directory): PendingRefresh queued in the open transaction.
+# The queued callback is the only strong reference, the entry goes away
+# once it ran or a rollback dropped it.
+_pending = weakref.WeakValueDictionary()
+
+
+def schedule(directory, pks=(), sender=None, child_pks=(), using=None):
+    """
+        Refresh people pks and parents of child_pks of sender when the
+        current transaction commits, at once outside transactions.
+        Refreshing is idempotent, so a whole transaction shares one callback.
+    """
+    connection = transaction.get_connection(using)
+    key = (connection, directory)
+    pending = _pending.get(key) if connection.in_atomic_block else None
+    created = pending is None
+    if created:
+        pending = PendingRefresh(directory, connection.alias)
+    pending.pks.update(pks)
+    if sender is not None:
+        pending.children.setdefault(sender, set()).update(child_pks)
+    if created:
+        if connection.in_atomic_block:
+            _pending[key] = pending
+        # runs at once outside transactions
+        transaction.on_commit(pending, connection.alias)
+
+
+_directories = []
+
+
+def get_directories(person_model=None):
+    return [
+        directory for directory in _directories
+        if person_model is None or directory.person_model is person_model]
+
+
+def person_changed(sender, instance, raw=False, update_fields=None, using=None, **kwargs):
+    if raw or (update_fields is not None and not set(update_fields) & set(PERSON_FIELDS)):
+        return
+    for directory in get_directories(sender):
+        schedule(directory, [instance.pk], using=using)
+
+
+def people_changed(sender, pks, **kwargs):
+    for directory in get_directories(sender):
+        schedule(directory, pks, using=router.db_for_write(sender))
+
+
+def child_changed(sender, instance, raw=False, using=None, **kwargs):
+    if raw:
+        return
+    for directory in _directories:
+        if sender in directory.child_models:
+            schedule(directory, directory.get_parent_ids(sender, instance=instance), using=using)
+
+
+def children_changed(sender, pks, **kwargs):
+    for directory in _directories:
+        if sender in directory.child_models:
+            schedule(directory, sender=sender, child_pks=pks, using=router.db_for_write(sender))
+
+
+def connect():
+    """
+        Register directory models, called from AppConfig.ready
+    """
+    del _directories[:]
+    for model in apps.get_models():
+        if issubclass(model, DirectoryAbstract):
+            _directories.append(Directory(model))
+    uid = 'django_personals.directory'
+    for directory in _directories:
+        for signal in (post_save, post_trash, post_restore):
+            signal.connect(person_changed, sender=directory.person_model, dispatch_uid=uid)
+        for signal in (post_bulk_trash, post_bulk_restore, post_bulk_upsert):
+            signal.connect(people_changed, sender=directory.person_model, dispatch_uid=uid)
+        for child_model in directory.child_models:
+            for signal in (post_save, post_delete, post_trash, post_restore):
+                signal.connect(child_changed, sender=child_model, dispatch_uid=uid)
+            for signal in (post_bulk_trash, post_bulk_restore, post_bulk_upsert):
+                signal.connect(children_changed, sender=child_model, dispatch_uid=uid)
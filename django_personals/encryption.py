@@ -0,0 +1,285 @@
+"""
+    Field level encryption with searchable blind indexes.
+
+    class PersonContact(ContactAbstract):
+        email = EncryptedCharField(max_length=128, null=True, blank=True)
+        email_index = BlindIndexField('email')
+        phone = EncryptedCharField(max_length=128, null=True, blank=True)
+        phone_index = BlindIndexField('phone', normalizer=normalize_phone)
+
+    PersonContact.objects.filter(blind_lookup(PersonContact, email='Me@Mail.com'))
+
+    Lookup columns of ContactAbstract (contacts.LookupField) stay empty for
+    encrypted sources, contacts.find_by_contact() searches their blind
+    index, normalized with the normalizer of the lookup.
+
+    Values are encrypted with Fernet (requires the optional cryptography
+    package) using PERSONALS_ENCRYPTION_KEYS, the first key encrypts and
+    every key decrypts, so keys can be rotated. Blind indexes are HMAC-SHA256
+    digests of the normalized plaintext keyed by PERSONALS_BLIND_INDEX_KEY
+    (derived from SECRET_KEY by default). Ciphers and keys are built once
+    per process.
+
+    Loaded values are decrypted lazily on first attribute access, so list
+    views only pay for the columns they display, and unchanged values are
+    saved back without being encrypted again. bulk_update() bypasses
+    pre_save, call set_blind_indexes() on the objects first.
+"""
+import hashlib
+import hmac
+import re
+
+from django.conf import settings
+from django.core.exceptions import FieldError, ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.db import models
+from django.db.models import Q
+from django.dispatch import receiver
+
+from .conf import get_setting
+
+
+class DecryptionError(ValueError):
+    pass
+
+
+class Ciphertext(str):
+    """
+        Encrypted value loaded from the database, not decrypted yet
+    """
+
+
+_cipher = None
+_blind_index_key = None
+
+
+@receiver(setting_changed)
+def reset_keys(setting, **kwargs):
+    global _cipher, _blind_index_key
+    if setting in ('SECRET_KEY', 'PERSONALS_ENCRYPTION_KEYS', 'PERSONALS_BLIND_INDEX_KEY'):
+        _cipher = None
+        _blind_index_key = None
+
+
+def get_cipher():
+    global _cipher
+    if _cipher is None:
+        try:
+            from cryptography.fernet import Fernet, MultiFernet
+        except ImportError:
+            raise ImproperlyConfigured('Encrypted fields require the cryptography package.')
+        keys = get_setting('ENCRYPTION_KEYS')
+        if not keys:
+            raise ImproperlyConfigured('PERSONALS_ENCRYPTION_KEYS is empty.')
+        _cipher = MultiFernet([Fernet(key) for key in keys])
+    return _cipher
+
+
+def get_blind_index_key():
+    global _blind_index_key
+    if _blind_index_key is None:
+        key = get_setting('BLIND_INDEX_KEY')
+        if key is None:
+            key = hmac.new(
+                settings.SECRET_KEY.encode(), b'django_personals.blind_index', hashlib.sha256).digest()
+        _blind_index_key = key.encode() if isinstance(key, str) else key
+    return _blind_index_key
+
+
+def encrypt_many(values):
+    """
+        Encrypt a list of strings with one cipher lookup, None stays None
+    """
+    encrypt = get_cipher().encrypt
+    return [None if value is None else encrypt(str(value).encode()).decode() for value in values]
+
+
+def decrypt_many(tokens):
+    """
+        Decrypt a list of tokens with one cipher lookup, None stays None
+    """
+    from cryptography.fernet import InvalidToken
+    decrypt = get_cipher().decrypt
+    try:
+        return [None if token is None else decrypt(token.encode()).decode() for token in tokens]
+    except InvalidToken:
+        raise DecryptionError('Value was not encrypted with any PERSONALS_ENCRYPTION_KEYS.')
+
+
+def encrypt(value):
+    return encrypt_many([value])[0]
+
+
+def decrypt(token):
+    return decrypt_many([token])[0]
+
+
+def normalize_text(value):
+    return ' '.join(str(value).split()).casefold()
+
+
+def normalize_digits(value):
+    """
+        Keep digits and a leading +, for phone numbers and identifiers
+    """
+    value = str(value).strip()
+    return ('+' if value.startswith('+') else '') + re.sub(r'\D', '', value)
+
+
+def blind_index(value, normalizer=normalize_text):
+    if value is None:
+        return None
+    value = normalizer(value)
+    if not value:
+        return None
+    return hmac.new(get_blind_index_key(), value.encode(), hashlib.sha256).hexdigest()
+
+
+class EncryptedDescriptor:
+
+    def __init__(self, field):
+        self.field = field
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        attname = self.field.attname
+        if attname not in instance.__dict__:
+            # deferred field
+            instance.refresh_from_db(fields=[attname])
+        value = instance.__dict__[attname]
+        if isinstance(value, Ciphertext):
+            token, value = value, decrypt(value)
+            instance.__dict__[attname] = value
+            instance.__dict__.setdefault('_decrypted', {})[attname] = (token, value)
+        return value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = value
+
+
+class EncryptedMixin:
+    """
+        Store the Fernet token of the value in a text column
+    """
+
+    def contribute_to_class(self, cls, name, **kwargs):
+        super().contribute_to_class(cls, name, **kwargs)
+        setattr(cls, self.attname, EncryptedDescriptor(self))
+
+    def get_internal_type(self):
+        return 'TextField'
+
+    def get_lookup(self, lookup_name):
+        if lookup_name != 'isnull':
+            raise FieldError(
+                'Encrypted field %s only supports isnull lookups, '
+                'query its BlindIndexField instead.' % self.name)
+        return super().get_lookup(lookup_name)
+
+    def from_db_value(self, value, expression, connection):
+        return None if value is None else Ciphertext(value)
+
+    def get_stored_token(self, instance):
+        """
+            Return the loaded token when the value did not change since
+        """
+        value = instance.__dict__.get(self.attname)
+        if isinstance(value, Ciphertext):
+            return value
+        token, plaintext = instance.__dict__.get('_decrypted', {}).get(self.attname, (None, None))
+        return token if token is not None and plaintext == value else None
+
+    def pre_save(self, model_instance, add):
+        token = self.get_stored_token(model_instance)
+        return model_instance.__dict__.get(self.attname) if token is None else token
+
+    def get_db_prep_save(self, value, connection):
+        if value is None or isinstance(value, Ciphertext):
+            return value
+        return encrypt(self.to_python(value))
+
+
+class EncryptedCharField(EncryptedMixin, models.CharField):
+    """
+        Encrypted string, max_length validates the plaintext
+    """
+
+
+class EncryptedTextField(EncryptedMixin, models.TextField):
+    pass
+
+
+class BlindIndexField(models.CharField):
+    """
+        HMAC digest of the field named source, for equality lookups
+    """
+
+    def __init__(self, source=None, normalizer=normalize_text, *args, **kwargs):
+        self.source = source
+        self.normalizer = normalizer
+        kwargs.setdefault('max_length', 64)
+        kwargs.setdefault('null', True)
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('db_index', True)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['source'] = self.source
+        if self.normalizer is not normalize_text:
+            kwargs['normalizer'] = self.normalizer
+        if kwargs.get('max_length') == 64:
+            del kwargs['max_length']
+        if not kwargs.pop('null', False):
+            kwargs['null'] = False
+        if kwargs.pop('editable', True):
+            kwargs['editable'] = True
+        if not kwargs.pop('db_index', False):
+            kwargs['db_index'] = False
+        return name, path, args, kwargs
+
+    def get_source_field(self):
+        return self.model._meta.get_field(self.source)
+
+    def compute(self, instance):
+        source = self.get_source_field()
+        if isinstance(source, EncryptedMixin) and source.get_stored_token(instance) is not None:
+            # source unchanged since loaded, the index is still valid
+            return getattr(instance, self.attname)
+        return blind_index(getattr(instance, source.attname), self.normalizer)
+
+    def pre_save(self, model_instance, add):
+        value = self.compute(model_instance)
+        setattr(model_instance, self.attname, value)
+        return value
+
+
+def get_blind_index_fields(model):
+    return [field for field in model._meta.concrete_fields if isinstance(field, BlindIndexField)]
+
+
+def set_blind_indexes(instances):
+    """
+        Refresh blind index attributes of instances, e.g. before bulk_update()
+    """
+    for instance in instances:
+        for field in get_blind_index_fields(type(instance)):
+            field.pre_save(instance, False)
+
+
+def blind_lookup(model, **values):
+    """
+        Return Q matching rows whose source fields equal values
+    """
+    condition = Q()
+    fields = {field.source: field for field in get_blind_index_fields(model)}
+    for name, value in values.items():
+        if name not in fields:
+            raise FieldError('%s.%s has no BlindIndexField.' % (model._meta.label, name))
+        field = fields[name]
+        if value is None:
+            condition &= Q(**{'%s__isnull' % field.name: True})
+        else:
+            condition &= Q(**{field.name: blind_index(value, field.normalizer)})
+    return condition
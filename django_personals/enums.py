@@ -1,6 +1,8 @@
 import enum
 from django.utils.translation import ugettext_lazy as _
 
+from .choices import ChoiceTable
+
 
 class MaxLength(enum.Enum):
     SHORT = 128
@@ -15,9 +17,9 @@ class ActiveStatus(enum.Enum):
     ACTIVE = 'ACT'
     INACTIVE = 'INC'
 
-    CHOICES = (
-        (ACTIVE, _("active").title()),
-        (INACTIVE, _("inactive").title()),
+    CHOICES = ChoiceTable(
+        (ACTIVE, _("active")),
+        (INACTIVE, _("inactive")),
     )
 
 
@@ -31,15 +33,15 @@ class PrivacyStatus(enum.Enum):
     MANAGERS = 'managers'
     ME = 'me'
 
-    CHOICES = (
-        (ANYONE, _("anyone").title()),
-        (USERS, _('all users').title()),
-        (FRIENDS, _('all friends').title()),
-        (STUDENTS, _('all students').title()),
-        (TEACHERS, _('all teachers').title()),
-        (EMPLOYEES, _('all employees').title()),
-        (MANAGERS, _('all managers').title()),
-        (ME, _('only me').title())
+    CHOICES = ChoiceTable(
+        (ANYONE, _("anyone")),
+        (USERS, _('all users')),
+        (FRIENDS, _('all friends')),
+        (STUDENTS, _('all students')),
+        (TEACHERS, _('all teachers')),
+        (EMPLOYEES, _('all employees')),
+        (MANAGERS, _('all managers')),
+        (ME, _('only me'))
     )
 
 
@@ -47,9 +49,9 @@ class Gender(enum.Enum):
     MALE = 'L'
     FEMALE = 'P'
 
-    CHOICES = (
-        (MALE, _("male").title()),
-        (FEMALE, _("female").title()),
+    CHOICES = ChoiceTable(
+        (MALE, _("male")),
+        (FEMALE, _("female")),
     )
 
 
@@ -57,9 +59,9 @@ class AddressName(enum.Enum):
     HOME = 'home'
     OFFICE = 'office'
 
-    CHOICES = (
-        (HOME, _("home").title()),
-        (OFFICE, _("office").title()),
+    CHOICES = ChoiceTable(
+        (HOME, _("home")),
+        (OFFICE, _("office")),
     )
 
 
@@ -68,10 +70,10 @@ class EducationStatus(enum.Enum):
     ONGOING = 'ONG'
     UNFINISHED = 'UNF'
 
-    CHOICES = (
-        (FINISHED, _("finished").title()),
-        (ONGOING, _("ongoing").title()),
-        (UNFINISHED, _("unfinished").title()),
+    CHOICES = ChoiceTable(
+        (FINISHED, _("finished")),
+        (ONGOING, _("ongoing")),
+        (UNFINISHED, _("unfinished")),
     )
 
 
@@ -81,11 +83,11 @@ class WorkingStatus(enum.Enum):
     OUTSOURCE = 'OSR'
     ELSE = 'ELS'
 
-    CHOICES = (
-        (CONTRACT, _("contract").title()),
-        (FIXED, _("fixed").title()),
-        (OUTSOURCE, _("outsource").title()),
-        (ELSE, _("else").title())
+    CHOICES = ChoiceTable(
+        (CONTRACT, _("contract")),
+        (FIXED, _("fixed")),
+        (OUTSOURCE, _("outsource")),
+        (ELSE, _("else"))
     )
 
 
@@ -98,12 +100,28 @@ class FamilyRelation(enum.Enum):
     WIFE = 6
     OTHER = 99
 
-    CHOICES = (
-        (FATHER, _('father').title()),
-        (MOTHER, _('mother').title()),
-        (HUSBAND, _('husband').title()),
-        (WIFE, _('wife').title()),
-        (CHILD, _('children').title()),
-        (SIBLING, _('sibling').title()),
-        (OTHER, _('other').title()),
+    CHOICES = ChoiceTable(
+        (FATHER, _('father')),
+        (MOTHER, _('mother')),
+        (HUSBAND, _('husband')),
+        (WIFE, _('wife')),
+        (CHILD, _('children')),
+        (SIBLING, _('sibling')),
+        (OTHER, _('other')),
+    )
+
+
+class OutboxAction(enum.Enum):
+    CREATED = 'created'
+    UPDATED = 'updated'
+    TRASHED = 'trashed'
+    RESTORED = 'restored'
+    DELETED = 'deleted'
+
+    CHOICES = ChoiceTable(
+        (CREATED, _('created')),
+        (UPDATED, _('updated')),
+        (TRASHED, _('trashed')),
+        (RESTORED, _('restored')),
+        (DELETED, _('deleted')),
     )
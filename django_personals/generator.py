@@ -0,0 +1,455 @@
+"""
+    Deterministic synthetic data for concrete subclasses of the library models.
+
+    Every person is generated from its own seed (seed, index), so a dataset is
+    identical whatever the number of shards used to build it, and each shard
+    can be built in a separate process.
+"""
+import io
+import random
+import uuid
+from datetime import date, timedelta
+from itertools import accumulate
+
+from django.db import DEFAULT_DB_ALIAS, connections, models
+from django.utils import timezone
+
+from .completeness import rebuild_completeness
+from .contacts import LookupField
+from .counters import rebuild_counters
+from .encryption import BlindIndexField, blind_index
+from .enums import (
+    ActiveStatus, AddressName, EducationStatus, FamilyRelation, Gender,
+    PrivacyStatus, WorkingStatus
+)
+from .models import (
+    AddressAbstract, AwardAbstract, ContactAbstract, FamilyAbstract,
+    FormalEduAbstract, NonFormalEduAbstract, PublicationAbstract,
+    SkillAbstract, SocialAbstract, VolunteerAbstract, WorkingAbstract
+)
+from .profiles import get_profile_relations
+
+FIRST_NAMES = (
+    'Adi', 'Agus', 'Andi', 'Ayu', 'Bayu', 'Budi', 'Citra', 'Dewi', 'Dian',
+    'Eka', 'Fajar', 'Fitri', 'Gita', 'Hadi', 'Indah', 'Intan', 'Joko', 'Kartika',
+    'Lestari', 'Maya', 'Nur', 'Putri', 'Rizki', 'Sari', 'Siti', 'Taufik',
+    'Tri', 'Wahyu', 'Wulan', 'Yusuf',
+)
+LAST_NAMES = (
+    'Pratama', 'Saputra', 'Wijaya', 'Kusuma', 'Hidayat', 'Nugroho', 'Santoso',
+    'Setiawan', 'Siregar', 'Nasution', 'Lubis', 'Hasibuan', 'Harahap',
+    'Sinaga', 'Wibowo', 'Gunawan', 'Susanto', 'Halim', 'Rahman', 'Syahputra',
+)
+CITIES = (
+    ('Jakarta', 'DKI Jakarta'), ('Bandung', 'Jawa Barat'), ('Bogor', 'Jawa Barat'),
+    ('Semarang', 'Jawa Tengah'), ('Surabaya', 'Jawa Timur'), ('Malang', 'Jawa Timur'),
+    ('Yogyakarta', 'DI Yogyakarta'), ('Medan', 'Sumatera Utara'),
+    ('Palembang', 'Sumatera Selatan'), ('Makassar', 'Sulawesi Selatan'),
+    ('Denpasar', 'Bali'), ('Balikpapan', 'Kalimantan Timur'),
+)
+RELIGIONS = ('Islam', 'Protestant', 'Catholic', 'Hindu', 'Buddha', 'Confucian')
+SKILLS = (
+    'python', 'django', 'javascript', 'sql', 'excel', 'accounting', 'design',
+    'writing', 'public speaking', 'sales', 'english', 'project management',
+    'leadership', 'negotiation', 'data analysis', 'photography',
+)
+COMPANIES = (
+    'Bank', 'Telkom', 'Pertamina', 'Software House', 'Consulting', 'Retail',
+    'Logistics', 'Hospital', 'University', 'Government Office',
+)
+DEPARTMENTS = ('Finance', 'IT', 'Marketing', 'Operations', 'HR', 'Sales', 'Legal')
+POSITIONS = ('Staff', 'Senior Staff', 'Supervisor', 'Manager', 'Director', 'Intern')
+MAJORS = ('Information System', 'Accounting', 'Management', 'Law', 'Medicine', 'Engineering')
+SCHOOLS = ('SD', 'SMP', 'SMA')
+JOBS = ('Teacher', 'Farmer', 'Entrepreneur', 'Civil Servant', 'Nurse', 'Driver', 'Retired')
+PRIVACY_WEIGHTS = (
+    (PrivacyStatus.ANYONE.value, 50), (PrivacyStatus.USERS.value, 20),
+    (PrivacyStatus.FRIENDS.value, 10), (PrivacyStatus.EMPLOYEES.value, 10),
+    (PrivacyStatus.MANAGERS.value, 5), (PrivacyStatus.ME.value, 5),
+)
+PRIVACY_VALUES = [value for value, weight in PRIVACY_WEIGHTS]
+PRIVACY_CUM_WEIGHTS = list(accumulate(weight for value, weight in PRIVACY_WEIGHTS))
+PHONE_FORMATS = ('+62 8%d-%04d-%04d', '08%d%04d%04d', '(08%d) %04d %04d', '628%d%04d%04d')
+TODAY = date(2020, 1, 1)
+
+
+def shard_range(count, shard=0, shards=1):
+    """
+        Return (start, stop) person indexes built by shard out of shards
+    """
+    if not 0 <= shard < shards:
+        raise ValueError('shard must be in [0, %d)' % shards)
+    return count * shard // shards, count * (shard + 1) // shards
+
+
+def days(rng, low, high):
+    return timedelta(days=rng.randint(low, high))
+
+
+class ProfileGenerator:
+    """
+        Generate field values for a person model and every library model
+        related to it (see profiles.get_profile_relations)
+    """
+    builders = (
+        (ContactAbstract, 'build_contacts'),
+        (SocialAbstract, 'build_socials'),
+        (AddressAbstract, 'build_addresses'),
+        (SkillAbstract, 'build_skills'),
+        (AwardAbstract, 'build_awards'),
+        (FormalEduAbstract, 'build_formal_educations'),
+        (NonFormalEduAbstract, 'build_non_formal_educations'),
+        (WorkingAbstract, 'build_work_histories'),
+        (VolunteerAbstract, 'build_volunteers'),
+        (PublicationAbstract, 'build_publications'),
+        (FamilyAbstract, 'build_families'),
+    )
+
+    def __init__(self, person_model, seed=0, timestamp=None):
+        self.person_model = person_model
+        self.seed = seed
+        # value of auto_now/auto_now_add columns in raw rows
+        self.timestamp = timestamp or timezone.now()
+        self.children = []
+        single, multiple = get_profile_relations(person_model)
+        for relation in single + multiple:
+            builder = self.get_builder(relation.related_model)
+            if builder is not None:
+                self.children.append((relation.related_model, relation.field.attname, builder))
+        self.models = [person_model] + [model for model, attname, builder in self.children]
+        self.columns = {model: self.get_columns(model) for model in self.models}
+
+    def get_builder(self, model):
+        for abstract, name in self.builders:
+            if issubclass(model, abstract):
+                return getattr(self, name)
+        return None
+
+    def get_columns(self, model):
+        return [
+            field for field in model._meta.concrete_fields
+            if not isinstance(field, models.AutoField)
+        ]
+
+    def get_random(self, index):
+        return random.Random('%s:%s' % (self.seed, index))
+
+    def make_id(self, rng):
+        return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+    def privacy(self, rng):
+        return rng.choices(PRIVACY_VALUES, cum_weights=PRIVACY_CUM_WEIGHTS)[0]
+
+    # Builders return field values keyed by attname
+
+    def build_person(self, rng, index):
+        city, province = rng.choice(CITIES)
+        gender = rng.choice((Gender.MALE.value, Gender.FEMALE.value))
+        return {
+            'id': self.make_id(rng),
+            'pid': '%02d%014d' % (rng.randint(11, 94), index),
+            'gender': gender,
+            'date_of_birth': TODAY - days(rng, 18 * 365, 65 * 365),
+            'place_of_birth': city,
+            'nickname': rng.choice(FIRST_NAMES),
+            'about_me': None if rng.random() < .5 else 'Hi, I am from %s.' % city,
+            'religion': rng.choice(RELIGIONS),
+            'nation': 'Indonesia',
+            'privacy': self.privacy(rng),
+        }
+
+    def build_contacts(self, rng, person):
+        name = '%s.%s%d' % (person['nickname'], rng.choice(LAST_NAMES), rng.randrange(100))
+        phone = rng.choice(PHONE_FORMATS) % (
+            rng.randint(11, 99), rng.randrange(10000), rng.randrange(10000))
+        return [{
+            'phone': phone,
+            'fax': None,
+            'email': '%s@%s' % (name, rng.choice(('gmail.com', 'yahoo.co.id', 'Example.com'))),
+            'whatsapp': phone if rng.random() < .7 else None,
+            'website': None if rng.random() < .8 else 'https://%s.example.com' % name.lower(),
+            'privacy': self.privacy(rng),
+        }]
+
+    def build_socials(self, rng, person):
+        handle = ('%s%d' % (person['nickname'], rng.randrange(1000))).lower()
+        return [{
+            'facebook': handle if rng.random() < .7 else None,
+            'twitter': handle if rng.random() < .4 else None,
+            'instagram': handle if rng.random() < .6 else None,
+            'youtube': None,
+            'privacy': self.privacy(rng),
+        }]
+
+    def build_addresses(self, rng, person):
+        addresses = []
+        for i, name in enumerate((AddressName.HOME.value, AddressName.OFFICE.value)):
+            if i and rng.random() < .6:
+                break
+            city, province = rng.choice(CITIES)
+            addresses.append({
+                'is_primary': not i,
+                'name': name,
+                'street': 'Jl. %s No. %d' % (rng.choice(LAST_NAMES), rng.randint(1, 200)),
+                'city': city,
+                'province': province,
+                'country': 'Indonesia',
+                'zipcode': '%05d' % rng.randint(10000, 99999),
+                'privacy': self.privacy(rng),
+            })
+        return addresses
+
+    def build_skills(self, rng, person):
+        return [{
+            'id': self.make_id(rng),
+            'name': name,
+            'description': None,
+            'level': round(rng.betavariate(2, 3) * 10),
+            'privacy': self.privacy(rng),
+        } for name in rng.sample(SKILLS, rng.randint(1, 8))]
+
+    def build_awards(self, rng, person):
+        return [{
+            'id': self.make_id(rng),
+            'name': '%s Award' % rng.choice(('Best Employee', 'Innovation', 'Community')),
+            'description': None,
+            'date': TODAY - days(rng, 0, 3650),
+            'document_link': None,
+            'privacy': self.privacy(rng),
+        } for i in range(rng.choice((0, 0, 0, 1, 2)))]
+
+    def build_formal_educations(self, rng, person):
+        educations = []
+        start = person['date_of_birth'] + timedelta(days=7 * 365)
+        levels = SCHOOLS[:rng.randint(1, 3)]
+        if len(levels) == 3 and rng.random() < .5:
+            levels += ('University',)
+        for i, level in enumerate(levels):
+            length = 6 if level == 'SD' else 4 if level == 'University' else 3
+            end = start + timedelta(days=length * 365)
+            last = i == len(levels) - 1
+            educations.append({
+                'id': self.make_id(rng),
+                'institution': '%s %s %d' % (level, rng.choice(CITIES)[0], rng.randint(1, 20)),
+                'major': rng.choice(MAJORS) if level == 'University' else None,
+                'date_start': start,
+                'date_end': min(end, TODAY),
+                'status': (
+                    EducationStatus.ONGOING.value if last and end > TODAY
+                    else EducationStatus.UNFINISHED.value if last and rng.random() < .1
+                    else EducationStatus.FINISHED.value),
+                'document_link': None,
+                'privacy': self.privacy(rng),
+            })
+            start = end
+        return educations
+
+    def build_non_formal_educations(self, rng, person):
+        return [{
+            'id': self.make_id(rng),
+            'name': '%s course' % rng.choice(SKILLS),
+            'institution': '%s Academy' % rng.choice(LAST_NAMES),
+            'description': None,
+            'date_start': TODAY - days(rng, 60, 3650),
+            'date_end': TODAY - days(rng, 0, 59),
+            'status': rng.choice((EducationStatus.FINISHED.value, EducationStatus.ONGOING.value)),
+            'document_link': None,
+            'privacy': self.privacy(rng),
+        } for i in range(rng.choice((0, 0, 1, 2)))]
+
+    def build_work_histories(self, rng, person):
+        jobs = []
+        start = person['date_of_birth'] + timedelta(days=rng.randint(20, 25) * 365)
+        for i in range(rng.randint(0, 4)):
+            if start >= TODAY:
+                break
+            end = min(start + days(rng, 180, 2500), TODAY)
+            jobs.append({
+                'id': self.make_id(rng),
+                'name': rng.choice(POSITIONS),
+                'institution': '%s %s' % (rng.choice(COMPANIES), rng.choice(LAST_NAMES)),
+                'department': rng.choice(DEPARTMENTS),
+                'position': rng.choice(POSITIONS),
+                'description': None,
+                'employment': rng.choice([status.value for status in (
+                    WorkingStatus.CONTRACT, WorkingStatus.FIXED, WorkingStatus.OUTSOURCE)]),
+                'date_start': start,
+                'date_end': end,
+                'document_link': None,
+                'privacy': self.privacy(rng),
+            })
+            # one job out of five overlaps with the next one
+            start = end - days(rng, 30, 180) if rng.random() < .2 else end + days(rng, 0, 120)
+        return jobs
+
+    def build_volunteers(self, rng, person):
+        return [{
+            'id': self.make_id(rng),
+            'organization': '%s Foundation' % rng.choice(LAST_NAMES),
+            'position': rng.choice(('Member', 'Coordinator', 'Volunteer')),
+            'description': '-',
+            'date_start': TODAY - days(rng, 365, 3650),
+            'date_end': TODAY - days(rng, 0, 364),
+            'status': rng.choice((ActiveStatus.ACTIVE.value, ActiveStatus.INACTIVE.value)),
+            'document_link': None,
+            'privacy': self.privacy(rng),
+        } for i in range(rng.choice((0, 0, 0, 1)))]
+
+    def build_publications(self, rng, person):
+        count = min(int(rng.expovariate(1.5)), 10)
+        return [{
+            'id': self.make_id(rng),
+            'title': 'On %s, part %d' % (rng.choice(SKILLS), i + 1),
+            'description': None,
+            'publisher': '%s Press' % rng.choice(LAST_NAMES),
+            'date_published': TODAY - days(rng, 0, 3650),
+            'document_link': None,
+            'privacy': self.privacy(rng),
+        } for i in range(count)]
+
+    def build_families(self, rng, person):
+        last_name = rng.choice(LAST_NAMES)
+        relations = [FamilyRelation.FATHER.value, FamilyRelation.MOTHER.value]
+        if rng.random() < .6:
+            relations.append(
+                FamilyRelation.WIFE.value if person['gender'] == Gender.MALE.value
+                else FamilyRelation.HUSBAND.value)
+            relations += [FamilyRelation.CHILD.value] * rng.randint(0, 3)
+        relations += [FamilyRelation.SIBLING.value] * rng.randint(0, 2)
+        return [{
+            'id': self.make_id(rng),
+            'relation': relation,
+            'relationship': None,
+            'name': '%s %s' % (rng.choice(FIRST_NAMES), last_name),
+            'date_of_birth': None,
+            'place_of_birth': rng.choice(CITIES)[0],
+            'job': rng.choice(JOBS),
+            'address': None,
+            'privacy': self.privacy(rng),
+        } for relation in relations]
+
+    def iter_values(self, start, stop):
+        """
+            Yield (model, values) for people start..stop-1 and their children
+        """
+        for index in range(start, stop):
+            rng = self.get_random(index)
+            person = self.build_person(rng, index)
+            yield self.person_model, person
+            for model, attname, builder in self.children:
+                for values in builder(rng, person):
+                    values[attname] = person['id']
+                    yield model, values
+
+    def iter_instances(self, start, stop):
+        for model, values in self.iter_values(start, stop):
+            names = self.field_names(model)
+            yield model, model(**{k: v for k, v in values.items() if k in names})
+
+    def iter_rows(self, start, stop):
+        """
+            Yield (model, row) tuples ordered like self.columns[model]
+        """
+        for model, values in self.iter_values(start, stop):
+            yield model, tuple(self.get_column_value(field, values) for field in self.columns[model])
+
+    def get_column_value(self, field, values):
+        if field.attname in values:
+            return values[field.attname]
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+            return self.timestamp
+        if isinstance(field, LookupField):
+            return field.compute(values)
+        if isinstance(field, BlindIndexField):
+            return blind_index(values.get(field.get_source_field().attname), field.normalizer)
+        return field.get_default()
+
+    def field_names(self, model):
+        return {field.attname for field in self.columns[model]}
+
+    def iter_batches(self, start, stop, batch_size=1000, rows=False):
+        """
+            Yield (model, list) batches, people of a batch always come
+            before their children
+        """
+        iterator = self.iter_rows if rows else self.iter_instances
+        for batch_start in range(start, stop, batch_size):
+            batches = {model: [] for model in self.models}
+            for model, item in iterator(batch_start, min(batch_start + batch_size, stop)):
+                batches[model].append(item)
+            for model in self.models:
+                if batches[model]:
+                    yield model, batches[model]
+
+    def load(self, count, shard=0, shards=1, batch_size=1000, using=DEFAULT_DB_ALIAS, copy=None):
+        """
+            Insert the shard of count people, with COPY on PostgreSQL
+            and bulk_create elsewhere. Return number of rows created.
+        """
+        if copy is None:
+            copy = connections[using].vendor == 'postgresql'
+        start, stop = shard_range(count, shard, shards)
+        pk_index = self.columns[self.person_model].index(self.person_model._meta.pk)
+        total = 0
+        pks = []
+        for model, batch in self.iter_batches(start, stop, batch_size, rows=copy):
+            if copy:
+                copy_rows(model, self.columns[model], batch, using=using)
+            else:
+                model._base_manager.using(using).bulk_create(batch)
+            if model is self.person_model:
+                pks += [row[pk_index] if copy else row.pk for row in batch]
+            total += len(batch)
+        self.rebuild(pks, batch_size, using)
+        return total
+
+    def rebuild(self, pks, batch_size=1000, using=DEFAULT_DB_ALIAS):
+        """
+            Recompute counters and completeness of the loaded people,
+            COPY and bulk_create skip the signals maintaining them
+        """
+        manager = self.person_model._base_manager.using(using)
+        for start in range(0, len(pks), batch_size):
+            queryset = manager.filter(pk__in=pks[start:start + batch_size])
+            rebuild_counters(self.person_model, queryset)
+            rebuild_completeness(self.person_model, queryset, batch_size)
+
+
+def copy_value(value):
+    if value is None:
+        return '\\N'
+    if value is True:
+        return 't'
+    if value is False:
+        return 'f'
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace(
+        '\n', '\\n').replace('\r', '\\r')
+
+
+def get_copy_data(fields, rows, connection):
+    """
+        Return COPY text of rows, values go through get_db_prep_save()
+        like a save would (encrypted fields are encrypted)
+    """
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(
+            copy_value(field.get_db_prep_save(value, connection)) for field, value in zip(fields, row)))
+        buffer.write('\n')
+    buffer.seek(0)
+    return buffer
+
+
+def copy_rows(model, fields, rows, using=DEFAULT_DB_ALIAS):
+    """
+        Load rows into model table with PostgreSQL COPY
+    """
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    buffer = get_copy_data(fields, rows, connection)
+    sql = 'COPY %s (%s) FROM STDIN' % (
+        quote(model._meta.db_table), ', '.join(quote(field.column) for field in fields))
+    with connection.cursor() as cursor:
+        cursor.copy_expert(sql, buffer)
@@ -0,0 +1,119 @@
+"""
+    Opt-in identity map of BaseModel instances.
+
+    with identity_map():
+        person = Person.objects.get(pk=pk)      # one query
+        Person.objects.get(pk=pk) is person     # True, no query
+
+    Inside a scope, primary key get() calls of BaseManager return the
+    instance loaded earlier in the scope, from a get() or from iterating a
+    BaseQuerySet (e.g. a prefetch of child rows). An instance leaves the map
+    when it is saved, trashed, restored or deleted. queryset.update() and
+    delete(), set based trash and restore, and the bookkeeping updates of
+    counters, completeness and trashed_by drop the instances of the rows
+    they change, so a later get() reads the database again.
+    IdentityMapMiddleware opens one scope per request.
+
+    Changes made outside the scope (other requests, raw SQL) are not seen
+    until the scope ends, like any unit of work.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.core.exceptions import ValidationError
+
+_map = ContextVar('django_personals_identity_map', default=None)
+
+
+@contextmanager
+def identity_map():
+    """
+        Open an identity map scope, nested scopes share the outer map
+    """
+    if _map.get() is not None:
+        yield _map.get()
+        return
+    token = _map.set({})
+    try:
+        yield _map.get()
+    finally:
+        _map.reset(token)
+
+
+def is_active():
+    return _map.get() is not None
+
+
+def get_key(model, pk):
+    # not keyed by database: primary and replicas hold the same rows
+    model = model._meta.concrete_model
+    return model, model._meta.pk.to_python(pk)
+
+
+def get_pk_lookup(model, args, kwargs):
+    """
+        Return the primary key of a get(pk=...) lookup, None for other lookups
+    """
+    if args or len(kwargs) != 1:
+        return None
+    name, value = next(iter(kwargs.items()))
+    if name not in ('pk', model._meta.pk.name, model._meta.pk.attname) or value is None:
+        return None
+    return value
+
+
+def lookup(model, pk):
+    identities = _map.get()
+    if identities is None:
+        return None
+    try:
+        return identities.get(get_key(model, pk))
+    except ValidationError:
+        # malformed pk, let the query raise
+        return None
+
+
+def add(instance):
+    identities = _map.get()
+    if identities is not None and instance.pk is not None:
+        identities.setdefault(get_key(type(instance), instance.pk), instance)
+
+
+def add_many(instances):
+    if _map.get() is not None:
+        for instance in instances:
+            add(instance)
+
+
+def discard(instance):
+    identities = _map.get()
+    if identities is not None and instance.pk is not None:
+        identities.pop(get_key(type(instance), instance.pk), None)
+
+
+def discard_pks(model, pks):
+    identities = _map.get()
+    if identities:
+        for pk in pks:
+            identities.pop(get_key(model, pk), None)
+
+
+def discard_model(model):
+    identities = _map.get()
+    if identities:
+        model = model._meta.concrete_model
+        for key in [key for key in identities if key[0] is model]:
+            del identities[key]
+
+
+class IdentityMapMiddleware:
+    """
+        Run each request in its own identity map scope
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with identity_map():
+            return self.get_response(request)
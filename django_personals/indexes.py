@@ -0,0 +1,29 @@
+from django.db import models
+from django.db.models import Q
+
+
+class LiveIndex(models.Index):
+    """
+        Partial index over live rows (is_trash=False), the rows BaseManager
+        reads. Backends without partial indexes create a plain index.
+    """
+
+    def __init__(self, *, fields=(), name=None, **kwargs):
+        kwargs.setdefault('condition', Q(is_trash=False))
+        super().__init__(fields=fields, name=name, **kwargs)
+
+
+class KeysetIndex(LiveIndex):
+    """
+        Live rows index matching a keyset ordering: fields followed by
+        the primary key, in the direction of the last field.
+
+        KeysetIndex(fields=['-date_of_birth'], name='person_dob_keyset_idx')
+    """
+
+    def __init__(self, *, fields=(), name=None, **kwargs):
+        fields = list(fields)
+        if not any(field.lstrip('-') in ('id', 'pk') for field in fields):
+            descending = bool(fields) and fields[-1].startswith('-')
+            fields.append('-id' if descending else 'id')
+        super().__init__(fields=fields, name=name, **kwargs)
@@ -0,0 +1,186 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.db import connections
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .conf import get_setting
+
+logger = logging.getLogger('django_personals.instrumentation')
+
+
+class Sink:
+    """
+        Receive one measurement per instrumented operation
+    """
+
+    def record(self, model, operation, queries, rows, duration):
+        raise NotImplementedError
+
+
+class LoggingSink(Sink):
+
+    def __init__(self, logger=logger, level=logging.DEBUG):
+        self.logger = logger
+        self.level = level
+
+    def record(self, model, operation, queries, rows, duration):
+        self.logger.log(
+            self.level, '%s.%s queries=%d rows=%d time=%.2fms',
+            model._meta.label_lower, operation, queries, rows, duration * 1000)
+
+
+class StatsdSink(Sink):
+    """
+        Emit statsd-style counters and timers, client must provide
+        incr(name, count) and timing(name, milliseconds)
+    """
+
+    def __init__(self, client=None, prefix='personals'):
+        if client is None:
+            try:
+                import statsd
+            except ImportError:
+                raise ImproperlyConfigured('StatsdSink requires a client or the statsd package.')
+            client = statsd.StatsClient()
+        self.client = client
+        self.prefix = prefix
+
+    def record(self, model, operation, queries, rows, duration):
+        name = '%s.%s.%s' % (self.prefix, model._meta.label_lower, operation)
+        self.client.incr(name + '.calls', 1)
+        self.client.incr(name + '.queries', queries)
+        self.client.incr(name + '.rows', rows)
+        self.client.timing(name + '.time', duration * 1000)
+
+
+class PrometheusSink(Sink):
+    """
+        Aggregate counters in process and render Prometheus text format
+    """
+    metrics = (
+        ('calls', 'django_personals_operations_total', 'Instrumented operations.'),
+        ('queries', 'django_personals_queries_total', 'Queries executed.'),
+        ('rows', 'django_personals_rows_total', 'Rows returned.'),
+        ('seconds', 'django_personals_seconds_total', 'Time spent in seconds.'),
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.values = defaultdict(lambda: defaultdict(float))
+
+    def record(self, model, operation, queries, rows, duration):
+        key = (model._meta.label_lower, operation)
+        with self._lock:
+            values = self.values[key]
+            values['calls'] += 1
+            values['queries'] += queries
+            values['rows'] += rows
+            values['seconds'] += duration
+
+    def render(self):
+        lines = []
+        with self._lock:
+            items = sorted(self.values.items())
+            for field, name, help_text in self.metrics:
+                lines.append('# HELP %s %s' % (name, help_text))
+                lines.append('# TYPE %s counter' % name)
+                for (model, operation), values in items:
+                    lines.append('%s{model="%s",operation="%s"} %s' % (
+                        name, model, operation, repr(values[field])))
+        return '\n'.join(lines) + '\n'
+
+
+class MemorySink(Sink):
+    """
+        Keep every measurement, mostly useful in tests
+    """
+
+    def __init__(self):
+        self.records = []
+
+    def record(self, model, operation, queries, rows, duration):
+        self.records.append((model, operation, queries, rows, duration))
+
+
+_sinks = None
+
+
+def get_sinks():
+    global _sinks
+    if _sinks is None:
+        sinks = []
+        for sink in get_setting('INSTRUMENTATION_SINKS'):
+            if isinstance(sink, str):
+                sink = import_string(sink)()
+            sinks.append(sink)
+        _sinks = sinks
+    return _sinks
+
+
+def add_sink(sink):
+    get_sinks().append(sink)
+    return sink
+
+
+def remove_sink(sink):
+    get_sinks().remove(sink)
+
+
+@receiver(setting_changed)
+def reset_sinks(setting, **kwargs):
+    global _sinks
+    if setting == 'PERSONALS_INSTRUMENTATION_SINKS':
+        _sinks = None
+
+
+def is_enabled():
+    return bool(get_sinks())
+
+
+class QueryCounter:
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Measurement:
+
+    def __init__(self):
+        self.rows = 0
+
+
+@contextmanager
+def measure(model, operation):
+    """
+        Measure queries, rows and time of the wrapped block and send them
+        to every sink, set rows on the yielded measurement
+    """
+    sinks = get_sinks()
+    if not sinks:
+        yield Measurement()
+        return
+    counter = QueryCounter()
+    measurement = Measurement()
+    start = time.perf_counter()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(counter))
+        yield measurement
+    duration = time.perf_counter() - start
+    for sink in sinks:
+        sink.record(model, operation, counter.count, measurement.rows, duration)
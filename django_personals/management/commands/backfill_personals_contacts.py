@@ -0,0 +1,27 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from django_personals.contacts import backfill_contacts
+from django_personals.models import ContactAbstract, SocialAbstract
+
+
+class Command(BaseCommand):
+    help = 'Recompute normalized contact lookup columns and social handles.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', help='contact or social model labels, default all')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--database', default=None)
+
+    def handle(self, *args, **options):
+        try:
+            models = [apps.get_model(label) for label in options['models']]
+        except (LookupError, ValueError) as e:
+            raise CommandError(e)
+        if not models:
+            models = [
+                model for model in apps.get_models()
+                if issubclass(model, (ContactAbstract, SocialAbstract))]
+        for model in models:
+            rows = backfill_contacts(model, options['batch_size'], options['database'])
+            self.stdout.write('%s: %d rows updated.' % (model._meta.label, rows))
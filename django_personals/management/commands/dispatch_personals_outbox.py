@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from django_personals import outbox
+
+
+class Command(BaseCommand):
+    help = 'Deliver pending outbox events to PERSONALS_OUTBOX_SINK.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--interval', type=float, default=1.0,
+                            help='seconds to sleep when the outbox is empty')
+        parser.add_argument('--once', action='store_true',
+                            help='stop when the outbox is empty')
+        parser.add_argument('--database', default=None)
+        parser.add_argument('--purge-days', type=int, default=None,
+                            help='delete events dispatched more than N days ago first')
+
+    def handle(self, *args, **options):
+        if options['purge_days'] is not None:
+            purged = outbox.purge_dispatched(
+                timedelta(days=options['purge_days']), using=options['database'])
+            self.stdout.write('%d dispatched events purged.' % purged)
+        delivered = outbox.run_worker(
+            batch_size=options['batch_size'],
+            interval=None if options['once'] else options['interval'],
+            using=options['database'])
+        self.stdout.write('%d events delivered.' % delivered)
@@ -0,0 +1,29 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from django_personals.cv import BATCH_SIZE, TEMPLATE_NAME, export_cvs
+
+
+class Command(BaseCommand):
+    help = 'Render CVs of every live person of a model into a zip archive.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', help='person model label, e.g. example.Person')
+        parser.add_argument('--output', required=True, help='zip file path')
+        parser.add_argument('--processes', type=int, default=None,
+                            help='worker processes, 0 renders in this process')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--template', default=TEMPLATE_NAME)
+
+    def handle(self, *args, **options):
+        try:
+            model = apps.get_model(options['model'])
+        except (LookupError, ValueError) as e:
+            raise CommandError(e)
+        size = 0
+        with open(options['output'], 'wb') as output:
+            for chunk in export_cvs(
+                    model._default_manager.all(), processes=options['processes'],
+                    batch_size=options['batch_size'], template_name=options['template']):
+                size += output.write(chunk)
+        self.stdout.write('%d bytes written to %s.' % (size, options['output']))
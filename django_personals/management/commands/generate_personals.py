@@ -0,0 +1,60 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from django_personals.generator import ProfileGenerator
+
+
+def load_shard(model_label, count, seed, shard, shards, batch_size, using):
+    generator = ProfileGenerator(apps.get_model(model_label), seed=seed)
+    return generator.load(count, shard, shards, batch_size=batch_size, using=using)
+
+
+def load_shard_in_worker(*args):
+    import django
+    django.setup()
+    try:
+        return load_shard(*args)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Generate deterministic synthetic people and all their profile data.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', help='person model label, e.g. example.Person')
+        parser.add_argument('count', type=int, help='number of people')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--shard', type=int, default=None,
+                            help='only build this shard (for multi host loads)')
+        parser.add_argument('--shards', type=int, default=1)
+        parser.add_argument('--workers', type=int, default=1,
+                            help='processes used to build the shards')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        try:
+            apps.get_model(options['model'])
+        except (LookupError, ValueError) as e:
+            raise CommandError(e)
+        shards = options['shards']
+        if options['shard'] is not None:
+            shard_ids = [options['shard']]
+        else:
+            shard_ids = range(shards)
+        jobs = [(
+            options['model'], options['count'], options['seed'], shard, shards,
+            options['batch_size'], options['database']
+        ) for shard in shard_ids]
+
+        if options['workers'] > 1:
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+                total = sum(executor.map(load_shard_in_worker, *zip(*jobs)))
+        else:
+            total = sum(load_shard(*job) for job in jobs)
+        self.stdout.write('%d rows created.' % total)
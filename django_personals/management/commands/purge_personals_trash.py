@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from django_personals.conf import get_setting
+from django_personals.purge import BATCH_SIZE, PurgeError, get_plan, get_purged_models, purge
+
+
+class Command(BaseCommand):
+    help = 'Erase rows trashed more than PERSONALS_PURGE_AFTER_DAYS days ago and their dependents.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', help='model labels, every BaseModel by default')
+        parser.add_argument('--days', type=int, default=None)
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--pause', type=float, default=None,
+                            help='seconds to sleep between batches')
+        parser.add_argument('--plan', action='store_true', help='print the statements and exit')
+
+    def handle(self, *args, **options):
+        days = get_setting('PURGE_AFTER_DAYS') if options['days'] is None else options['days']
+        pause = get_setting('PURGE_PAUSE_SECONDS') if options['pause'] is None else options['pause']
+        try:
+            models = [apps.get_model(label) for label in options['models']] or get_purged_models()
+        except (LookupError, ValueError) as e:
+            raise CommandError(e)
+        try:
+            if options['plan']:
+                for model in models:
+                    self.stdout.write('%s: %s' % (model._meta.label, ', '.join(map(repr, get_plan(model)))))
+                return
+            if days is None:
+                raise CommandError('Give --days or set PERSONALS_PURGE_AFTER_DAYS.')
+            before = timezone.now() - timedelta(days=days)
+            for model in models:
+                counts = purge(model, before, batch_size=options['batch_size'], pause=pause)
+                for erased_model, erased in counts.items():
+                    self.stdout.write('%s: %d %s rows erased.' % (
+                        model._meta.label, erased, erased_model._meta.label))
+        except PurgeError as e:
+            raise CommandError(e)
@@ -0,0 +1,24 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from django_personals.completeness import BATCH_SIZE, get_scorers
+
+
+class Command(BaseCommand):
+    help = 'Recompute CompletenessField columns with batched SQL UPDATEs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', help='person model labels, default all')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            models = [apps.get_model(label) for label in options['models']]
+        except (LookupError, ValueError) as e:
+            raise CommandError(e)
+        for scorer in get_scorers():
+            if models and scorer.model not in models:
+                continue
+            rows = scorer.rebuild(batch_size=options['batch_size'])
+            self.stdout.write('%s.%s: %d rows updated.' % (
+                scorer.model._meta.label, scorer.field.name, rows))
@@ -0,0 +1,26 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from django_personals.counters import get_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute CounterField columns from child tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', help='person model labels, default all')
+
+    def handle(self, *args, **options):
+        try:
+            models = [apps.get_model(label) for label in options['models']]
+        except (LookupError, ValueError) as e:
+            raise CommandError(e)
+        counters = [
+            counter for counter in get_counters()
+            if not models or counter.model in models]
+        for counter in counters:
+            with transaction.atomic():
+                rows = counter.rebuild()
+            self.stdout.write('%s.%s: %d rows updated.' % (
+                counter.model._meta.label, counter.field.name, rows))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from django_personals.directory import BATCH_SIZE, get_directories
+
+
+class Command(BaseCommand):
+    help = 'Recompute every row of DirectoryAbstract models.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--database', default=None)
+
+    def handle(self, *args, **options):
+        for directory in get_directories():
+            people = directory.rebuild(batch_size=options['batch_size'], using=options['database'])
+            self.stdout.write('%s: %d people refreshed.' % (directory.model._meta.label, people))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from django_personals.analytics import get_summarized_models, rebuild_summary
+
+
+class Command(BaseCommand):
+    help = 'Recompute SkillSummary rows of PERSONALS_SKILL_SUMMARY_MODELS.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--database', default=None)
+
+    def handle(self, *args, **options):
+        for model in get_summarized_models():
+            names = rebuild_summary(model, batch_size=options['batch_size'], using=options['database'])
+            self.stdout.write('%s: %d skills summarized.' % (model._meta.label, names))
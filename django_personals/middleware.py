@@ -0,0 +1,17 @@
+from .routers import pinning_scope
+
+
+class ReplicaPinningMiddleware:
+    """
+        Give each request its own replica pinning scope, keyed by the
+        authenticated user. Place it after AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        user = getattr(request, 'user', None)
+        user_id = user.pk if user is not None and user.is_authenticated else None
+        with pinning_scope(user_id=user_id):
+            return self.get_response(request)
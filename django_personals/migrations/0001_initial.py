@@ -0,0 +1,39 @@
+# Generated by Django 2.2.28 on 2026-10-18 20:47
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('model', models.CharField(max_length=128, verbose_name='model')),
+                ('object_pk', models.CharField(max_length=128, verbose_name='object id')),
+                ('action', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('trashed', 'Trashed'), ('restored', 'Restored'), ('deleted', 'Deleted')], max_length=16, verbose_name='action')),
+                ('payload', models.TextField(blank=True, null=True, verbose_name='payload')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='created at')),
+                ('dispatched_at', models.DateTimeField(blank=True, null=True, verbose_name='dispatched at')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='attempts')),
+                ('last_error', models.TextField(blank=True, null=True, verbose_name='last error')),
+                ('claimed_by', models.UUIDField(blank=True, editable=False, null=True)),
+                ('claimed_until', models.DateTimeField(blank=True, editable=False, null=True)),
+            ],
+            options={
+                'verbose_name': 'outbox event',
+                'verbose_name_plural': 'outbox events',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='outboxevent',
+            index=models.Index(condition=models.Q(dispatched_at__isnull=True), fields=['id'], name='personals_outbox_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 2.2.28 on 2026-10-18 21:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_personals', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SkillSummary',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=128, verbose_name='model')),
+                ('name', models.CharField(max_length=256, verbose_name='name')),
+                ('level', models.SmallIntegerField(verbose_name='Skill level')),
+                ('people', models.PositiveIntegerField(default=0, verbose_name='people')),
+            ],
+            options={
+                'verbose_name': 'skill summary',
+                'verbose_name_plural': 'skill summaries',
+                'unique_together': {('model', 'name', 'level')},
+            },
+        ),
+    ]
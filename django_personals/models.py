@@ -1,19 +1,145 @@
 import uuid
-from django.db import models
+from contextvars import ContextVar
+from django.db import models, router, transaction, DatabaseError
+from django.db.models import F
 from django.utils import translation, timezone
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
-
-from .enums import MaxLength, ActiveStatus, PrivacyStatus
+from django.db.models.query import ModelIterable
+
+from . import identity, instrumentation, outbox
+from .conf import get_setting
+from .contacts import LookupField, normalize_email, normalize_handle, normalize_phone
+from .pagination import KeysetPaginator
+from .rows import RowManager, RowQuerySet
+from .signals import post_trash, post_restore, post_bulk_trash, post_bulk_restore
+from .routers import ReplicaRouter
+from .enums import MaxLength, ActiveStatus, PrivacyStatus, OutboxAction
 from django_personals.enums import (
     Gender, EducationStatus, WorkingStatus, FamilyRelation, AddressName
 )
 
 _ = translation.gettext_lazy
 
+# Rows updated per statement by set based trash and restore
+BULK_BATCH_SIZE = 500
+
+
+class StaleObjectError(DatabaseError):
+    """
+        The row changed since the instance was loaded
+    """
+
+
+class BaseQuerySet(RowQuerySet):
+
+    def _fetch_all(self):
+        if self._result_cache is None and instrumentation.is_enabled():
+            with instrumentation.measure(self.model, 'fetch') as measurement:
+                super()._fetch_all()
+                measurement.rows = len(self._result_cache)
+        else:
+            super()._fetch_all()
+        if identity.is_active() and self._iterable_class is ModelIterable and self._loads_whole_rows():
+            identity.add_many(self._result_cache)
+
+    def _loads_whole_rows(self):
+        # deferred or annotated instances must not answer later get() calls
+        query = self.query
+        return not query.deferred_loading[0] and not query.annotations and not query.extra
+
+    def update(self, **kwargs):
+        identity.discard_model(self.model)
+        if issubclass(self.model, BaseModel):
+            if 'version' not in kwargs:
+                # loaded instances of the rows become stale
+                kwargs['version'] = F('version') + 1
+            kwargs.setdefault('modified_at', timezone.now())
+        return super().update(**kwargs)
+
+    def delete(self):
+        identity.discard_model(self.model)
+        return super().delete()
+
+    def primary(self):
+        """
+            Read from primary database, bypassing replica routing
+        """
+        return self.using(get_setting('PRIMARY_DATABASE'))
+
+    def replica(self, alias=None):
+        """
+            Read from the given (or a random) replica, ignoring primary pinning
+        """
+        if alias is None:
+            router = ReplicaRouter()
+            replicas = router.get_replicas()
+            alias = router.choose_replica(replicas) if replicas else router.get_primary()
+        return self.using(alias)
+
+    def keyset(self, per_page, cursor=None, ordering=None):
+        """
+            Return the KeysetPage after cursor, see pagination.KeysetPaginator
+        """
+        return KeysetPaginator(self, per_page, ordering=ordering).page(cursor)
+
+    def _bulk_update_trash(self, signal, operation, action, **values):
+        queryset = self.filter(is_trash=not values['is_trash'])
+        with_outbox = outbox.is_enabled(self.model)
+        with instrumentation.measure(self.model, operation) as measurement:
+            if not signal.has_listeners(self.model) and not with_outbox:
+                measurement.rows = queryset.update(**values)
+                return measurement.rows, []
+            pks = list(queryset.values_list('pk', flat=True))
+            manager = self.model._base_manager.db_manager(self.db)
+            with transaction.atomic(using=self.db, savepoint=False):
+                for start in range(0, len(pks), BULK_BATCH_SIZE):
+                    measurement.rows += manager.filter(
+                        pk__in=pks[start:start + BULK_BATCH_SIZE],
+                        is_trash=not values['is_trash']
+                    ).update(**values)
+                if with_outbox:
+                    outbox.record_many(self.model, pks, action, self.db)
+            identity.discard_pks(self.model, pks)
+        return measurement.rows, pks
+
+    def bulk_upsert(self, objs, **kwargs):
+        """
+            Insert, update, restore and trash rows matching objs on the
+            model NATURAL_KEY, see upsert.bulk_upsert
+        """
+        from .upsert import bulk_upsert
+        return bulk_upsert(self.model, objs, using=self.db, **kwargs)
+
+    def trash(self, user=None):
+        """
+            Paranoid delete every row of the queryset with set based UPDATEs,
+            return the number of trashed rows
+        """
+        rows, pks = self._bulk_update_trash(
+            post_bulk_trash, 'bulk_trash', OutboxAction.TRASHED.value,
+            is_trash=True, trashed_by=user, trashed_at=timezone.now(),
+            modified_at=timezone.now(), version=F('version') + 1)
+        if pks:
+            post_bulk_trash.send(sender=self.model, pks=pks, user=user)
+        return rows
+
+    def restore(self):
+        """
+            Restore every trashed row of the queryset with set based UPDATEs,
+            return the number of restored rows
+        """
+        rows, pks = self._bulk_update_trash(
+            post_bulk_restore, 'bulk_restore', OutboxAction.RESTORED.value,
+            is_trash=False, trashed_by=None, trashed_at=None,
+            modified_at=timezone.now(), version=F('version') + 1)
+        if pks:
+            post_bulk_restore.send(sender=self.model, pks=pks)
+        return rows
+
 
-class BaseManager(models.Manager):
+class BaseManager(models.Manager.from_queryset(BaseQuerySet)):
     """
         Implement paranoid mechanism queryset
     """
@@ -21,16 +147,34 @@ class BaseManager(models.Manager):
     def get_queryset(self):
         return super().get_queryset().filter(is_trash=False)
 
+    def matches(self, instance):
+        """
+            Whether the identity map instance belongs to this manager rows
+        """
+        return not instance.is_trash
+
     def get(self, *args, **kwargs):
+        pk = identity.get_pk_lookup(self.model, args, kwargs) if identity.is_active() else None
+        if pk is not None:
+            instance = identity.lookup(self.model, pk)
+            if instance is not None and self.matches(instance):
+                return instance
         kwargs['is_trash'] = False
         return super().get(*args, **kwargs)
 
 
+class AllObjectsManager(models.Manager.from_queryset(BaseQuerySet)):
+    """
+        Queryset including trashed rows
+    """
+
+
 class BaseModel(models.Model):
     class Meta:
         abstract = True
 
     objects = BaseManager()
+    all_objects = AllObjectsManager()
 
     id = models.UUIDField(
         default=uuid.uuid4,
@@ -46,10 +190,51 @@ class BaseModel(models.Model):
         editable=False,
         null=True, blank=True,
         related_name="%(class)s_trashes",
-        on_delete=models.CASCADE,
+        # PERSONALS_TRASHED_BY_ON_DELETE is applied by trash.user_deleting
+        on_delete=models.DO_NOTHING,
         verbose_name=_('trashed by'))
     trashed_at = models.DateTimeField(
         null=True, blank=True, editable=False)
+    modified_at = models.DateTimeField(
+        auto_now=True, db_index=True,
+        verbose_name=_('modified at'))
+    version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=_('version'))
+
+    def save(self, *args, **kwargs):
+        """
+            Updates only apply to the loaded version of the row, raise
+            StaleObjectError when it changed since
+        """
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'modified_at', 'version'}
+        action = OutboxAction.CREATED if self._state.adding else OutboxAction.UPDATED
+        with outbox.recording(self, action.value, kwargs.get('using')):
+            super().save(*args, **kwargs)
+        identity.discard(self)
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        version_field = self._meta.get_field('version')
+        values = [
+            value for value in values
+            if value[0] is not version_field and getattr(value[0], 'saved_on_update', True)]
+        values.append((version_field, None, self.version + 1))
+        filtered = base_qs.filter(pk=pk_val, version=self.version)
+        if filtered._update(values) > 0:
+            self.version += 1
+            return True
+        if base_qs.filter(pk=pk_val).exists():
+            raise StaleObjectError('%s %s changed since it was loaded.' % (self._meta.label, pk_val))
+        return False
+
+    def get_outbox_payload(self):
+        """
+            JSON serializable data stored with outbox events of this instance
+        """
+        return None
 
     def pass_delete_validation(self):
         return True
@@ -60,41 +245,190 @@ class BaseModel(models.Model):
     def get_deletion_message(self):
         return _("E1010: %s deletion can't be performed.") % self._meta.verbose_name
 
+    def _update_trash(self, using, action, **values):
+        """
+            Set values with one UPDATE conditional on the trash state, so
+            concurrent trash or restore calls have a single winner. Fields
+            of a stale instance stay stale, save() raises afterwards.
+        """
+        using = using or router.db_for_write(type(self), instance=self)
+        values['modified_at'] = timezone.now()
+        queryset = type(self)._base_manager.using(using).filter(pk=self.pk, is_trash=not values['is_trash'])
+        with transaction.atomic(using=using, savepoint=False):
+            won = queryset.update(version=F('version') + 1, **values) > 0
+            if won and outbox.is_enabled(type(self)):
+                outbox.record(self, action, using)
+        if won:
+            for name, value in values.items():
+                setattr(self, name, value)
+            self.version += 1
+            identity.discard(self)
+        return won
+
     def delete(self, using=None, keep_parents=False, paranoid=False, user=None):
         """
-            Give paranoid delete mechanism to each record
+            Give paranoid delete mechanism to each record, paranoid delete
+            returns whether this call moved the row to trash
         """
         if not self.pass_delete_validation():
             raise ValidationError(self.get_deletion_error_message())
 
         if paranoid:
-            self.is_trash = True
-            self.trashed_by = user
-            self.trashed_at = timezone.now()
-            self.save()
+            with instrumentation.measure(type(self), 'trash') as measurement:
+                won = self._update_trash(
+                    using, OutboxAction.TRASHED.value,
+                    is_trash=True, trashed_by=user, trashed_at=timezone.now())
+                measurement.rows = int(won)
+            if won:
+                post_trash.send(sender=type(self), instance=self, user=user)
+            return won
         else:
-            super().delete(using=using, keep_parents=keep_parents)
+            identity.discard(self)
+            with instrumentation.measure(type(self), 'delete') as measurement, \
+                    outbox.recording(self, OutboxAction.DELETED.value, using):
+                deleted = super().delete(using=using, keep_parents=keep_parents)
+                measurement.rows = deleted[0]
+            return deleted
 
     def pass_restore_validation(self):
-        return self.is_trash
+        # the trash state is checked by the restoring UPDATE itself
+        return True
 
     def get_restoration_error_message(self):
         return _("E1002: %s restoration can't be performed.") % self._meta.verbose_name
 
-    def restore(self):
+    def restore(self, using=None):
+        """
+            Bring the row back from trash, return whether this call
+            restored it
+        """
         if not self.pass_restore_validation():
             raise ValidationError(self.get_restoration_error_message())
 
-        self.is_trash = False
-        self.trashed_by = None
-        self.trashed_at = None
-        self.save()
+        with instrumentation.measure(type(self), 'restore') as measurement:
+            won = self._update_trash(
+                using, OutboxAction.RESTORED.value,
+                is_trash=False, trashed_by=None, trashed_at=None)
+            measurement.rows = int(won)
+        if won:
+            post_restore.send(sender=type(self), instance=self)
+        return won
+
+
+def update_rows(queryset, **values):
+    """
+        UPDATE rows for library bookkeeping (counters, scores, trashed_by),
+        BaseModel rows get a new modified_at for the change feed and leave
+        the identity map. version is only bumped when given, the columns
+        set here are not written by save() or are recomputed after it.
+    """
+    identity.discard_model(queryset.model)
+    if issubclass(queryset.model, BaseModel):
+        values.setdefault('modified_at', timezone.now())
+    return queryset.update(**values)
+
+
+_deleting = ContextVar('django_personals_deleting', default=frozenset())
+
+
+def parent_deleting(sender, instance, **kwargs):
+    """
+        pre_delete of people keeping counters or scores, their children
+        deleted by the same cascade skip the bookkeeping
+    """
+    _deleting.set(_deleting.get() | {(sender, instance.pk)})
+
+
+def parent_deleted(sender, instance, **kwargs):
+    _deleting.set(_deleting.get() - {(sender, instance.pk)})
+
+
+def is_deleting(model, pk):
+    return (model, pk) in _deleting.get()
+
+
+class OutboxEvent(models.Model):
+    """
+        Change event written in the transaction of the change,
+        drained by outbox.dispatch()
+    """
+    class Meta:
+        verbose_name = _('outbox event')
+        verbose_name_plural = _('outbox events')
+        indexes = [
+            models.Index(
+                fields=['id'], name='personals_outbox_pending_idx',
+                condition=models.Q(dispatched_at__isnull=True)),
+        ]
+
+    id = models.BigAutoField(primary_key=True)
+    model = models.CharField(
+        max_length=MaxLength.SHORT.value,
+        verbose_name=_('model'))
+    object_pk = models.CharField(
+        max_length=MaxLength.SHORT.value,
+        verbose_name=_('object id'))
+    action = models.CharField(
+        max_length=16,
+        choices=OutboxAction.CHOICES.value,
+        verbose_name=_('action'))
+    payload = models.TextField(
+        null=True, blank=True,
+        verbose_name=_('payload'))
+    created_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name=_('created at'))
+    dispatched_at = models.DateTimeField(
+        null=True, blank=True,
+        verbose_name=_('dispatched at'))
+    attempts = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('attempts'))
+    last_error = models.TextField(
+        null=True, blank=True,
+        verbose_name=_('last error'))
+    claimed_by = models.UUIDField(
+        null=True, blank=True, editable=False)
+    claimed_until = models.DateTimeField(
+        null=True, blank=True, editable=False)
+
+    def __str__(self):
+        return '%s %s %s' % (self.model, self.object_pk, self.action)
+
+
+class SkillSummary(models.Model):
+    """
+        People per skill name and level of a SkillAbstract model, kept by
+        the analytics signal handlers
+    """
+    class Meta:
+        verbose_name = _('skill summary')
+        verbose_name_plural = _('skill summaries')
+        unique_together = ('model', 'name', 'level')
+
+    model = models.CharField(
+        max_length=MaxLength.SHORT.value,
+        verbose_name=_('model'))
+    name = models.CharField(
+        max_length=MaxLength.MEDIUM.value,
+        verbose_name=_('name'))
+    level = models.SmallIntegerField(
+        verbose_name=_('Skill level'))
+    people = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('people'))
+
+    def __str__(self):
+        return '%s %s %s' % (self.name, self.level, self.people)
 
 
 class ContactAbstract(models.Model):
     class Meta:
         abstract = True
 
+    # completeness.CompletenessField weights
+    COMPLETENESS_WEIGHTS = {'phone': 2, 'email': 2, 'whatsapp': 1, 'website': 1}
+
     phone = models.CharField(
         max_length=MaxLength.SHORT.value,
         null=True, blank=True,
@@ -125,11 +459,26 @@ class ContactAbstract(models.Model):
             'Designates who can see this information.'
         ))
 
+    # Normalized copies for contacts.find_by_contact()
+    phone_lookup = LookupField('phone', normalizer=normalize_phone)
+    whatsapp_lookup = LookupField('whatsapp', normalizer=normalize_phone)
+    email_lookup = LookupField('email', normalizer=normalize_email)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {
+                field.name for field in self._meta.concrete_fields
+                if isinstance(field, LookupField) and field.source in update_fields}
+        super().save(*args, **kwargs)
+
 
 class SocialAbstract(models.Model):
     class Meta:
         abstract = True
 
+    COMPLETENESS_WEIGHTS = {'facebook': 1, 'twitter': 1, 'instagram': 1, 'youtube': 1}
+
     # Social Media
     facebook = models.SlugField(
         null=True, blank=True,
@@ -154,11 +503,23 @@ class SocialAbstract(models.Model):
             'Designates who can see this information.'
         ))
 
+    HANDLE_FIELDS = ('facebook', 'twitter', 'instagram', 'youtube')
+
+    def save(self, *args, **kwargs):
+        # canonical handles keep contacts.find_by_contact() an index lookup
+        for name in self.HANDLE_FIELDS:
+            setattr(self, name, normalize_handle(getattr(self, name)))
+        super().save(*args, **kwargs)
+
 
 class AddressAbstract(models.Model):
     class Meta:
         abstract = True
 
+    objects = RowManager()
+
+    COMPLETENESS_PRESENCE = 2
+
     is_primary = models.BooleanField(
         default=True, verbose_name=_('primary'))
     name = models.CharField(
@@ -238,6 +599,8 @@ class PersonMinimalAbstract(BaseModel):
     class Meta:
         abstract = True
 
+    COMPLETENESS_WEIGHTS = {'pid': 1, 'date_of_birth': 1, 'place_of_birth': 1}
+
     pid = models.CharField(
         null=True, blank=True,
         max_length=MaxLength.MEDIUM.value,
@@ -270,6 +633,10 @@ class PersonAbstract(PersonMinimalAbstract):
     class Meta:
         abstract = True
 
+    COMPLETENESS_WEIGHTS = dict(
+        PersonMinimalAbstract.COMPLETENESS_WEIGHTS,
+        nickname=1, about_me=2, religion=1, nation=1)
+
     nickname = models.CharField(
         null=True, blank=True,
         max_length=MaxLength.MEDIUM.value,
@@ -292,6 +659,9 @@ class HistoryBase(BaseModel):
     class Meta:
         abstract = True
 
+    # upsert.bulk_upsert() match fields, person is the concrete parent FK
+    NATURAL_KEY = ('person', 'institution', 'date_start')
+
     name = models.CharField(
         max_length=50,
         verbose_name=_('name'))
@@ -322,6 +692,8 @@ class FormalEduAbstract(HistoryBase):
     class Meta:
         abstract = True
 
+    COMPLETENESS_PRESENCE = 3
+
     name = None
     major = models.CharField(
         max_length=MaxLength.MEDIUM.value,
@@ -339,6 +711,8 @@ class NonFormalEduAbstract(HistoryBase):
     class Meta:
         abstract = True
 
+    COMPLETENESS_PRESENCE = 1
+
     description = models.CharField(
         max_length=MaxLength.MEDIUM.value,
         null=True, blank=True,
@@ -354,6 +728,8 @@ class WorkingAbstract(HistoryBase):
     class Meta:
         abstract = True
 
+    COMPLETENESS_PRESENCE = 3
+
     department = models.CharField(
         max_length=MaxLength.MEDIUM.value,
         verbose_name=_("department"))
@@ -451,6 +827,10 @@ class SkillAbstract(BaseModel):
     class Meta:
         abstract = True
 
+    NATURAL_KEY = ('person', 'name')
+
+    COMPLETENESS_PRESENCE = 3
+
     name = models.CharField(
         max_length=MaxLength.MEDIUM.value,
         verbose_name=_("name"))
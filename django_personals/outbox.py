@@ -0,0 +1,273 @@
+"""
+    Transactional outbox for BaseModel change events.
+
+    Saves, paranoid deletes, restores, hard deletes and the set based
+    trash/restore of models listed in PERSONALS_OUTBOX_MODELS insert
+    OutboxEvent rows in the same transaction as the change, so an event
+    exists if and only if the change committed. A worker drains the table
+    in batches and hands events to PERSONALS_OUTBOX_SINK:
+
+    python manage.py dispatch_personals_outbox --batch-size 500
+
+    Delivery is at least once, ordered by event id within a batch only;
+    sinks should be idempotent on OutboxEvent.id. When a batch fails, its
+    events are sent one by one so good events still go out. Failed events
+    wait PERSONALS_OUTBOX_RETRY_SECONDS, doubled per attempt, before the
+    next try, and after PERSONALS_OUTBOX_MAX_ATTEMPTS they are dead letters,
+    left out of dispatch until their attempts are reset.
+"""
+import json
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.signals import setting_changed
+from django.db import connections, router, transaction
+from django.db.models import F
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .conf import get_setting
+
+logger = logging.getLogger('django_personals.outbox')
+
+# Seconds a claimed batch stays reserved on backends without SKIP LOCKED
+CLAIM_SECONDS = 300
+
+# Longest wait between two attempts of a failed event
+MAX_RETRY_SECONDS = 24 * 3600
+
+_recording = ContextVar('django_personals_outbox_recording', default=())
+
+
+class Sink:
+    """
+        Deliver a list of OutboxEvent, raise to retry the events later
+    """
+
+    def send(self, events):
+        raise NotImplementedError
+
+
+class LoggingSink(Sink):
+
+    def __init__(self, logger=logger, level=logging.INFO):
+        self.logger = logger
+        self.level = level
+
+    def send(self, events):
+        for event in events:
+            self.logger.log(
+                self.level, '%s %s %s', event.model, event.object_pk, event.action)
+
+
+class MemorySink(Sink):
+    """
+        Keep every delivered event, mostly useful in tests
+    """
+
+    def __init__(self):
+        self.events = []
+
+    def send(self, events):
+        self.events.extend(events)
+
+
+_sink = None
+
+
+def get_sink():
+    global _sink
+    if _sink is None:
+        sink = get_setting('OUTBOX_SINK')
+        _sink = import_string(sink)() if isinstance(sink, str) else sink
+    return _sink
+
+
+@receiver(setting_changed)
+def reset_sink(setting, **kwargs):
+    global _sink
+    if setting == 'PERSONALS_OUTBOX_SINK':
+        _sink = None
+
+
+def get_event_model():
+    return apps.get_model('django_personals', 'OutboxEvent')
+
+
+def is_enabled(model):
+    labels = get_setting('OUTBOX_MODELS')
+    return labels == '__all__' or model._meta.label_lower in [label.lower() for label in labels]
+
+
+def get_payload(instance):
+    payload = instance.get_outbox_payload()
+    return None if payload is None else json.dumps(payload, cls=DjangoJSONEncoder)
+
+
+def record(instance, action, using, pk=None):
+    """
+        Insert the event of one instance, call it inside the transaction
+        changing the instance
+    """
+    return get_event_model()._base_manager.using(using).create(
+        model=instance._meta.label_lower, object_pk=str(pk or instance.pk),
+        action=action, payload=get_payload(instance))
+
+
+def record_many(model, pks, action, using):
+    """
+        Insert one event per primary key with bulk INSERTs
+    """
+    event_model = get_event_model()
+    now = timezone.now()
+    events = [
+        event_model(model=model._meta.label_lower, object_pk=str(pk), action=action, created_at=now)
+        for pk in pks]
+    event_model._base_manager.using(using).bulk_create(events, batch_size=500)
+
+
+@contextmanager
+def recording(instance, action, using=None):
+    """
+        Run the wrapped write and the event insert in one transaction.
+        Nested writes of the same instance (paranoid delete saving the
+        instance) only record the outer action.
+    """
+    key = (type(instance), id(instance))
+    if key in _recording.get() or not is_enabled(type(instance)):
+        yield
+        return
+    using = using or router.db_for_write(type(instance), instance=instance)
+    # hard delete clears instance.pk
+    pk = instance.pk
+    token = _recording.set(_recording.get() + (key,))
+    try:
+        with transaction.atomic(using=using, savepoint=False):
+            yield
+            record(instance, action, using, pk)
+    finally:
+        _recording.reset(token)
+
+
+def get_pending(using):
+    """
+        Undelivered events below PERSONALS_OUTBOX_MAX_ATTEMPTS
+    """
+    return get_event_model()._base_manager.using(using).filter(
+        dispatched_at__isnull=True, attempts__lt=get_setting('OUTBOX_MAX_ATTEMPTS')).order_by('id')
+
+
+def get_available(using):
+    """
+        Pending events neither claimed by a worker nor waiting for a retry
+    """
+    return get_pending(using).exclude(claimed_until__gt=timezone.now())
+
+
+def get_dead_letters(using=None):
+    """
+        Undelivered events that reached PERSONALS_OUTBOX_MAX_ATTEMPTS
+    """
+    using = using or router.db_for_write(get_event_model())
+    return get_event_model()._base_manager.using(using).filter(
+        dispatched_at__isnull=True, attempts__gte=get_setting('OUTBOX_MAX_ATTEMPTS')).order_by('id')
+
+
+def get_retry_delay(attempts):
+    return timedelta(seconds=min(get_setting('OUTBOX_RETRY_SECONDS') * 2 ** (attempts - 1), MAX_RETRY_SECONDS))
+
+
+def dispatch(batch_size=100, sink=None, using=None):
+    """
+        Deliver one batch of pending events, return the number delivered.
+        Workers lock rows with SELECT ... FOR UPDATE SKIP LOCKED where the
+        database supports it, and claim rows with an UPDATE lease otherwise
+        (SQLite, older MySQL).
+    """
+    sink = sink or get_sink()
+    using = using or router.db_for_write(get_event_model())
+    if connections[using].features.has_select_for_update_skip_locked:
+        return _dispatch_locked(sink, batch_size, using)
+    return _dispatch_claimed(sink, batch_size, using)
+
+
+def _fail(event, error, using):
+    attempts = event.attempts + 1
+    if attempts >= get_setting('OUTBOX_MAX_ATTEMPTS'):
+        logger.error('Outbox event %s failed %d times, left as a dead letter.', event.pk, attempts)
+    # claimed_until holds the event back until its retry
+    get_event_model()._base_manager.using(using).filter(pk=event.pk).update(
+        attempts=F('attempts') + 1, last_error=repr(error),
+        claimed_by=None, claimed_until=timezone.now() + get_retry_delay(attempts))
+
+
+def _deliver(sink, events, using):
+    manager = get_event_model()._base_manager.using(using)
+    try:
+        sink.send(events)
+    except Exception as e:
+        logger.exception('Outbox delivery of %d events failed.', len(events))
+        if len(events) == 1:
+            _fail(events[0], e, using)
+            return 0
+        # retry one by one, a bad event must not hold back the others
+        return sum(_deliver(sink, [event], using) for event in events)
+    manager.filter(pk__in=[event.pk for event in events]).update(dispatched_at=timezone.now())
+    return len(events)
+
+
+def _dispatch_locked(sink, batch_size, using):
+    with transaction.atomic(using=using):
+        events = list(get_available(using).select_for_update(skip_locked=True)[:batch_size])
+        if not events:
+            return 0
+        return _deliver(sink, events, using)
+
+
+def _dispatch_claimed(sink, batch_size, using):
+    now = timezone.now()
+    claim = uuid.uuid4()
+    available = get_available(using)
+    pks = list(available.values_list('pk', flat=True)[:batch_size])
+    if not pks:
+        return 0
+    # single UPDATE, rows claimed meanwhile by another worker are skipped
+    available.filter(pk__in=pks).update(
+        claimed_by=claim, claimed_until=now + timedelta(seconds=CLAIM_SECONDS))
+    events = list(get_pending(using).filter(claimed_by=claim))
+    if not events:
+        return 0
+    return _deliver(sink, events, using)
+
+
+def run_worker(batch_size=100, interval=1.0, max_batches=None, sink=None, using=None):
+    """
+        Dispatch batches until max_batches, sleep interval seconds when
+        the outbox is empty (stop instead when interval is None)
+    """
+    batches = delivered = 0
+    while max_batches is None or batches < max_batches:
+        count = dispatch(batch_size, sink=sink, using=using)
+        delivered += count
+        batches += 1
+        if count < batch_size:
+            if interval is None:
+                break
+            time.sleep(interval)
+    return delivered
+
+
+def purge_dispatched(older_than=timedelta(days=7), using=None):
+    """
+        Delete events dispatched before older_than ago
+    """
+    using = using or router.db_for_write(get_event_model())
+    return get_event_model()._base_manager.using(using).filter(
+        dispatched_at__lt=timezone.now() - older_than).delete()[0]
@@ -0,0 +1,239 @@
+"""
+    Keyset (seek) pagination helpers.
+
+    Rows are ordered by one or more fields followed by the primary key, and
+    the next page starts right after the last row of the previous one, so
+    any page costs the same as the first one when an index matches the
+    ordering (see indexes.KeysetIndex).
+"""
+import datetime
+import json
+
+from django.core import signing
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from django.db.models.expressions import OrderBy
+
+CURSOR_SALT = 'django_personals.pagination'
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class OrderingField:
+
+    def __init__(self, name, descending=False, nullable=False):
+        self.name = name
+        self.descending = descending
+        self.nullable = nullable
+
+    def __eq__(self, other):
+        return (self.name, self.descending) == (other.name, other.descending)
+
+    def __repr__(self):
+        return '%s%s' % ('-' if self.descending else '', self.name)
+
+    def order_by(self):
+        expression = F(self.name)
+        if self.nullable:
+            # NULLs last in both directions on every backend
+            return expression.desc(nulls_last=True) if self.descending else expression.asc(nulls_last=True)
+        return expression.desc() if self.descending else expression.asc()
+
+
+def get_field(model, name):
+    opts = model._meta
+    field = None
+    for part in name.split('__'):
+        field = opts.pk if part == 'pk' else opts.get_field(part)
+        if field.is_relation and field.related_model is not None:
+            opts = field.related_model._meta
+    return field
+
+
+def normalize_ordering(model, ordering):
+    """
+        Return OrderingField list for ordering, which may contain field
+        names ('-name') and F() ordering expressions, always ending with
+        the primary key. Raise ValueError on other expressions.
+    """
+    fields = []
+    for item in ordering:
+        if isinstance(item, str):
+            if item == '?':
+                raise ValueError('Random ordering cannot be paginated by keyset.')
+            name, descending = item.lstrip('-'), item.startswith('-')
+        elif isinstance(item, OrderBy) and isinstance(item.expression, F):
+            name, descending = item.expression.name, item.descending
+        else:
+            raise ValueError('Unsupported keyset ordering: %r' % (item,))
+        if name == model._meta.pk.name:
+            name = 'pk'
+        field = get_field(model, name)
+        fields.append(OrderingField(name, descending, field.null))
+        if name == 'pk':
+            return fields
+    descending = fields[-1].descending if fields else False
+    fields.append(OrderingField('pk', descending))
+    return fields
+
+
+def keyset_order_by(queryset, ordering):
+    return queryset.order_by(*[field.order_by() for field in ordering])
+
+
+def keyset_filter(ordering, values):
+    """
+        Return Q matching rows after values in ordering
+    """
+    condition = None
+    for field, value in reversed(list(zip(ordering, values))):
+        branches = []
+        if value is not None:
+            lookup = 'lt' if field.descending else 'gt'
+            branches.append(Q(**{'%s__%s' % (field.name, lookup): value}))
+            if field.nullable:
+                branches.append(Q(**{'%s__isnull' % field.name: True}))
+        if condition is not None:
+            if value is None:
+                equal = Q(**{'%s__isnull' % field.name: True})
+            else:
+                equal = Q(**{field.name: value})
+            branches.append(equal & condition)
+        condition = Q(pk__in=[])
+        if branches:
+            condition = branches[0]
+            for branch in branches[1:]:
+                condition |= branch
+    return condition
+
+
+def get_cursor_values(obj, ordering):
+    values = []
+    for field in ordering:
+        value = obj
+        for part in field.name.split('__'):
+            value = getattr(value, part)
+            if value is None:
+                break
+        if hasattr(value, '_meta'):
+            value = value.pk
+        if isinstance(value, (datetime.datetime, datetime.time)):
+            # DjangoJSONEncoder drops microseconds, which would stall the keyset
+            value = value.isoformat()
+        values.append(value)
+    return values
+
+
+class CursorSerializer:
+
+    def dumps(self, obj):
+        return json.dumps(obj, separators=(',', ':'), cls=DjangoJSONEncoder).encode('latin-1')
+
+    def loads(self, data):
+        return json.loads(data.decode('latin-1'))
+
+
+def encode_cursor(ordering, values):
+    """
+        Return an opaque, signed token for the position after values
+    """
+    return signing.dumps(
+        [[repr(field) for field in ordering], values],
+        salt=CURSOR_SALT, serializer=CursorSerializer, compress=True)
+
+
+def decode_cursor(token, ordering):
+    """
+        Return the values of token, raise InvalidCursor when it is
+        corrupted or was made for another ordering
+    """
+    try:
+        spec, values = signing.loads(token, salt=CURSOR_SALT, serializer=CursorSerializer)
+    except (signing.BadSignature, ValueError, TypeError) as e:
+        raise InvalidCursor(str(e))
+    if spec != [repr(field) for field in ordering] or len(values) != len(ordering):
+        raise InvalidCursor('Cursor does not match ordering.')
+    return values
+
+
+def get_default_ordering(queryset):
+    ordering = queryset.query.order_by or queryset.model._meta.ordering or ['pk']
+    return list(ordering)
+
+
+class KeysetPage:
+
+    def __init__(self, object_list, next_cursor, cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.cursor = cursor
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def is_first(self):
+        return self.cursor is None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __repr__(self):
+        return '<KeysetPage %d rows, has_next=%s>' % (len(self), self.has_next())
+
+
+class KeysetPaginator:
+    """
+        Forward keyset paginator, pages are addressed by opaque cursors.
+
+        paginator = KeysetPaginator(Person.objects.all(), 50, ordering=['-date_of_birth'])
+        page = paginator.page(request.GET.get('cursor'))
+        page.next_cursor  # None on the last page
+    """
+
+    def __init__(self, queryset, per_page, ordering=None):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        if ordering is None:
+            ordering = get_default_ordering(queryset)
+        self.ordering = normalize_ordering(queryset.model, ordering)
+
+    def get_queryset(self, cursor=None):
+        queryset = keyset_order_by(self.queryset, self.ordering)
+        if cursor:
+            values = decode_cursor(cursor, self.ordering)
+            queryset = queryset.filter(keyset_filter(self.ordering, values))
+        return queryset
+
+    def page(self, cursor=None):
+        """
+            Return the page after cursor (first page when cursor is empty),
+            raise InvalidCursor on tampered or foreign cursors
+        """
+        rows = list(self.get_queryset(cursor)[:self.per_page + 1])
+        object_list = rows[:self.per_page]
+        next_cursor = None
+        if len(rows) > self.per_page:
+            next_cursor = self.get_cursor(object_list[-1])
+        return KeysetPage(object_list, next_cursor, cursor=cursor or None)
+
+    def get_cursor(self, obj):
+        return encode_cursor(self.ordering, get_cursor_values(obj, self.ordering))
+
+    def iterate(self, cursor=None):
+        """
+            Yield every page, starting after cursor
+        """
+        while True:
+            page = self.page(cursor)
+            yield page
+            if not page.has_next():
+                return
+            cursor = page.next_cursor
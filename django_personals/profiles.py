@@ -0,0 +1,54 @@
+from django.db.models import Prefetch
+
+
+def is_profile_model(model):
+    from .models import BaseModel, ContactAbstract, SocialAbstract, AddressAbstract
+    return issubclass(model, (BaseModel, ContactAbstract, SocialAbstract, AddressAbstract))
+
+
+def get_profile_relations(person_model):
+    """
+        Return reverse relations of person_model pointing to library models,
+        split into (single, multiple) relation lists
+    """
+    single, multiple = [], []
+    for relation in person_model._meta.related_objects:
+        if relation.many_to_many or not is_profile_model(relation.related_model):
+            continue
+        if relation.one_to_one:
+            single.append(relation)
+        else:
+            multiple.append(relation)
+    return single, multiple
+
+
+def load_profiles(queryset):
+    """
+        Attach every profile collection of each person in queryset using
+        one join for single relations and one query per collection,
+        trashed children are excluded by their default manager.
+    """
+    single, multiple = get_profile_relations(queryset.model)
+    return queryset.select_related(
+        *[relation.get_accessor_name() for relation in single]
+    ).prefetch_related(*[
+        Prefetch(
+            relation.get_accessor_name(),
+            queryset=relation.related_model._default_manager.all())
+        for relation in multiple
+    ])
+
+
+def load_profile(queryset, **lookup):
+    """
+        Return one fully loaded person
+    """
+    return load_profiles(queryset).get(**lookup)
+
+
+def get_profile_query_budget(person_model):
+    """
+        Expected number of queries to load any number of full profiles
+    """
+    single, multiple = get_profile_relations(person_model)
+    return 1 + len(multiple)
@@ -0,0 +1,187 @@
+"""
+    Hard purge of trashed rows.
+
+    purge(Person, before=timezone.now() - timedelta(days=90))
+
+    Erases rows trashed before a date together with the rows depending on
+    them, without loading either into memory. The relation graph of a
+    model is walked once into a plan of set based statements ordered by
+    foreign key dependencies, children first. Trashed rows are then taken
+    in primary key ranges of batch_size rows, every range runs the plan in
+    one short transaction, with an optional pause between ranges.
+
+    CASCADE relations are deleted, SET_NULL and SET_DEFAULT relations
+    updated and DO_NOTHING relations left alone, PROTECT and SET() stop
+    the plan with PurgeError. trashed_by columns pointing at an erased row
+    (the %(class)s_trashes relations of the user model) are always cleared,
+    a purged user never takes the rows they trashed along.
+
+    Statements are raw DELETEs and UPDATEs: no delete signals nor outbox
+    events are sent, post_purge reports the rows erased per model instead.
+    Run python manage.py purge_personals_trash daily to erase rows trashed
+    more than PERSONALS_PURGE_AFTER_DAYS ago.
+"""
+import time
+from datetime import timedelta
+
+from django.apps import apps
+from django.db import models, router, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import identity, instrumentation
+from .conf import get_setting
+from .models import BaseModel, update_rows
+from .signals import post_purge
+
+BATCH_SIZE = 500
+
+_plans = {}
+
+
+class PurgeError(Exception):
+    pass
+
+
+def is_trashed_by(field):
+    return field.name == 'trashed_by' and issubclass(field.model, BaseModel)
+
+
+def get_relations(model):
+    """
+        Reverse one-to-one and many-to-one relations of model, hidden ones
+        (many-to-many through tables) included
+    """
+    return [
+        field for field in model._meta.get_fields(include_hidden=True)
+        if field.auto_created and not field.concrete and (field.one_to_one or field.one_to_many)]
+
+
+class Step:
+    """
+        One statement of a purge plan over the rows of model reached from
+        the purged rows through field, deleting them when value is DELETE
+        or setting field to value
+    """
+    DELETE = object()
+
+    def __init__(self, model, parent=None, field=None, value=DELETE):
+        self.model = model
+        self.parent = parent
+        self.field = field
+        self.value = value
+
+    def __repr__(self):
+        action = 'delete' if self.value is self.DELETE else 'set %s' % self.field.name
+        return '<Step %s %s>' % (action, self.model._meta.label)
+
+    def get_queryset(self, rows, using):
+        """
+            Rows of model reached from the purged rows queryset
+        """
+        if self.parent is None:
+            return rows
+        parent = self.parent.get_queryset(rows, using)
+        return self.model._base_manager.using(using).filter(**{
+            '%s__in' % self.field.name: parent.values(self.field.target_field.attname)})
+
+    def run(self, rows, using):
+        queryset = self.get_queryset(rows, using)
+        if self.value is self.DELETE:
+            return queryset._raw_delete(using)
+        values = {self.field.attname: self.value}
+        if issubclass(self.model, BaseModel):
+            values['version'] = F('version') + 1
+        return update_rows(queryset, **values)
+
+
+def get_steps(model, parent=None, field=None, path=()):
+    if model in path:
+        raise PurgeError('%s can not be purged, it is part of a cycle of CASCADE relations.' % (
+            model._meta.label))
+    node = Step(model, parent, field)
+    steps = []
+    for relation in get_relations(model):
+        child, on_delete = relation.field, relation.on_delete
+        if is_trashed_by(child) or on_delete is models.SET_NULL:
+            steps.append(Step(relation.related_model, node, child, None))
+        elif on_delete is models.SET_DEFAULT:
+            steps.append(Step(relation.related_model, node, child, child.get_default()))
+        elif on_delete is models.CASCADE:
+            steps.extend(get_steps(relation.related_model, node, child, path + (model,)))
+        elif on_delete is not models.DO_NOTHING:
+            raise PurgeError('%s can not be purged, %s.%s does not CASCADE nor SET_NULL.' % (
+                model._meta.label, relation.related_model._meta.label, child.name))
+    steps.append(node)
+    return steps
+
+
+def get_plan(model):
+    """
+        Return the statements erasing rows of model, children first
+    """
+    if model not in _plans:
+        _plans[model] = get_steps(model)
+    return _plans[model]
+
+
+def purge(model, before, batch_size=BATCH_SIZE, pause=0, using=None):
+    """
+        Erase rows of model trashed before the given datetime and their
+        dependents, return {model: rows erased}
+    """
+    using = using or router.db_for_write(model)
+    plan = get_plan(model)
+    trashed = model._base_manager.using(using).filter(is_trash=True, trashed_at__lt=before)
+    counts = {}
+    last = None
+    while True:
+        batch = trashed if last is None else trashed.filter(pk__gt=last)
+        pks = list(batch.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            break
+        # the range repeats the trash condition, rows restored since stay
+        rows = trashed.filter(pk__gte=pks[0], pk__lte=pks[-1])
+        with instrumentation.measure(model, 'purge') as measurement, transaction.atomic(using=using):
+            for step in plan:
+                erased = step.run(rows, using)
+                if step.value is Step.DELETE:
+                    counts[step.model] = counts.get(step.model, 0) + erased
+            measurement.rows = len(pks)
+        last = pks[-1]
+        if len(pks) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+    for step in plan:
+        identity.discard_model(step.model)
+    for erased_model, erased in counts.items():
+        if erased:
+            post_purge.send(sender=erased_model, rows=erased)
+    return counts
+
+
+def get_purged_models():
+    return [
+        model for model in apps.get_models()
+        if issubclass(model, BaseModel) and model._meta.managed and not model._meta.proxy]
+
+
+# Background job entry point, arguments must stay serializable
+
+def purge_expired(days=None, batch_size=BATCH_SIZE, pause=None):
+    """
+        Purge rows of every BaseModel trashed more than days (default
+        PERSONALS_PURGE_AFTER_DAYS) ago, return {model label: rows erased}
+    """
+    days = get_setting('PURGE_AFTER_DAYS') if days is None else days
+    if days is None:
+        return {}
+    pause = get_setting('PURGE_PAUSE_SECONDS') if pause is None else pause
+    before = timezone.now() - timedelta(days=days)
+    totals = {}
+    for model in get_purged_models():
+        for erased_model, erased in purge(model, before, batch_size, pause).items():
+            label = erased_model._meta.label
+            totals[label] = totals.get(label, 0) + erased
+    return totals
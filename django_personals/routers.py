@@ -0,0 +1,157 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from .conf import get_setting
+from .signals import read_routed
+
+PIN_CACHE_KEY = 'django_personals:replica-pin:%s'
+
+_scope = ContextVar('django_personals_pinning_scope', default=None)
+
+
+class PinningScope:
+    """
+        Hold primary pinning state for one request (or one unit of work)
+    """
+
+    def __init__(self, user_id=None, pinned_until=0):
+        self.user_id = user_id
+        self.pinned_until = pinned_until
+
+    @property
+    def is_pinned(self):
+        return self.pinned_until > time.monotonic()
+
+
+def get_scope():
+    scope = _scope.get()
+    if scope is None:
+        scope = PinningScope()
+        _scope.set(scope)
+    return scope
+
+
+@contextmanager
+def pinning_scope(user_id=None):
+    """
+        Open a new pinning scope, picking up a pin left by the same user
+        in a previous request
+    """
+    scope = PinningScope(user_id=user_id)
+    if user_id is not None:
+        from django.core.cache import cache
+        remaining = cache.get(PIN_CACHE_KEY % user_id)
+        if remaining:
+            scope.pinned_until = time.monotonic() + max(remaining - time.time(), 0)
+    token = _scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _scope.reset(token)
+
+
+def pin_primary(seconds=None):
+    """
+        Send BaseModel reads of the current scope and user to primary database
+    """
+    if seconds is None:
+        seconds = get_setting('REPLICA_PIN_SECONDS')
+    if not seconds:
+        return
+    scope = get_scope()
+    scope.pinned_until = max(scope.pinned_until, time.monotonic() + seconds)
+    if scope.user_id is not None:
+        from django.core.cache import cache
+        cache.set(PIN_CACHE_KEY % scope.user_id, time.time() + seconds, seconds)
+
+
+def is_pinned():
+    return get_scope().is_pinned
+
+
+class RoutingStats:
+    """
+        Thread safe counters of routed BaseModel reads
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts = {'replica': 0, 'pinned': 0, 'no_replica': 0}
+
+    def incr(self, reason):
+        with self._lock:
+            self.counts[reason] += 1
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    @property
+    def replica_ratio(self):
+        total = self.total
+        return self.counts['replica'] / total if total else 0.0
+
+
+routing_stats = RoutingStats()
+
+
+def is_routed_model(model):
+    from .models import BaseModel
+    return issubclass(model, BaseModel)
+
+
+class ReplicaRouter:
+    """
+        Send BaseModel reads to PERSONALS_REPLICA_DATABASES, and pin reads
+        to PERSONALS_PRIMARY_DATABASE for PERSONALS_REPLICA_PIN_SECONDS
+        after any write made in the same scope or by the same user.
+        Non BaseModel models are left to the next router.
+    """
+
+    def get_primary(self):
+        return get_setting('PRIMARY_DATABASE')
+
+    def get_replicas(self):
+        return get_setting('REPLICA_DATABASES')
+
+    def choose_replica(self, replicas):
+        return random.choice(replicas)
+
+    def db_for_read(self, model, **hints):
+        if not is_routed_model(model):
+            return None
+        replicas = self.get_replicas()
+        if not replicas:
+            database, reason = self.get_primary(), 'no_replica'
+        elif is_pinned():
+            database, reason = self.get_primary(), 'pinned'
+        else:
+            database, reason = self.choose_replica(replicas), 'replica'
+        routing_stats.incr(reason)
+        read_routed.send(sender=model, database=database, reason=reason)
+        return database
+
+    def db_for_write(self, model, **hints):
+        if not is_routed_model(model):
+            return None
+        if self.get_replicas():
+            pin_primary()
+        return self.get_primary()
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {self.get_primary(), *self.get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in self.get_replicas():
+            return False
+        return None
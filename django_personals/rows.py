@@ -0,0 +1,96 @@
+"""
+    Read-only row objects for listing paths.
+
+    for skill in Skill.objects.filter(person=person).rows('name', 'level'):
+        print(skill, skill.percent, skill.get_privacy_display())
+
+    rows() fetches the given fields (all concrete fields by default, the
+    primary key always) like values_list() and wraps each tuple into an
+    immutable namedtuple subclass without __dict__. Row classes carry the
+    properties and __str__ of the model (percent, fulladdress, ...), pk and
+    get_<field>_display() of selected choice fields, so templates written
+    for instances keep working as long as they only read selected fields.
+    Row classes are built once per model and field list.
+"""
+from collections import namedtuple
+
+from django.db import models
+from django.db.models.query import BaseIterable, ValuesListIterable
+
+from .choices import get_display
+
+_row_classes = {}
+
+
+def get_model_attributes(model):
+    """
+        Return {name: attribute} of properties and __str__ declared on
+        model and its abstract bases
+    """
+    attributes = {}
+    for klass in reversed(model.__mro__):
+        if klass in (models.Model, object) or klass.__module__.startswith('django.db.'):
+            continue
+        for name, value in vars(klass).items():
+            if name == '__str__' or (isinstance(value, property) and name != 'pk'):
+                attributes[name] = value
+    return attributes
+
+
+def get_display_method(name):
+    def get_field_display(self):
+        return get_display(self, name)
+    return get_field_display
+
+
+class RowIterable(BaseIterable):
+    row_class = None
+
+    def __iter__(self):
+        make = self.row_class._make
+        for values in ValuesListIterable(self.queryset, self.chunked_fetch, self.chunk_size):
+            yield make(values)
+
+
+def get_row_class(model, fields=None):
+    """
+        Return the row class of model holding fields, field names or
+        attnames, all concrete fields when None
+    """
+    key = (model, tuple(fields) if fields else None)
+    if key not in _row_classes:
+        opts = model._meta
+        selected = [opts.get_field(name) for name in fields] if fields else list(opts.concrete_fields)
+        if opts.pk not in selected:
+            selected.insert(0, opts.pk)
+        attnames = [field.attname for field in selected]
+        attributes = get_model_attributes(model)
+        attributes.update({
+            '__slots__': (),
+            '_meta': opts,
+            'pk': property(lambda self, attname=opts.pk.attname: getattr(self, attname)),
+        })
+        for field in selected:
+            if field.choices:
+                attributes['get_%s_display' % field.name] = get_display_method(field.name)
+        name = '%sRow' % model.__name__
+        row_class = type(name, (namedtuple(name, attnames),), attributes)
+        row_class.iterable_class = type('%sIterable' % name, (RowIterable,), {'row_class': row_class})
+        _row_classes[key] = row_class
+    return _row_classes[key]
+
+
+class RowQuerySet(models.QuerySet):
+
+    def rows(self, *fields):
+        """
+            Yield read-only row objects of fields (default all) instead of
+            model instances
+        """
+        row_class = get_row_class(self.model, fields)
+        clone = self.values_list(*row_class._fields)
+        clone._iterable_class = row_class.iterable_class
+        return clone
+
+
+RowManager = models.Manager.from_queryset(RowQuerySet)
@@ -0,0 +1,30 @@
+from django.dispatch import Signal
+
+# Sent by ReplicaRouter every time it decides where a BaseModel read goes.
+# Arguments: sender (model class), database, reason
+# ('replica', 'pinned' or 'no_replica').
+read_routed = Signal()
+
+# Sent after BaseModel.delete(paranoid=True) moved an instance to trash.
+# Arguments: sender (model class), instance, user
+post_trash = Signal()
+
+# Sent after BaseModel.restore() brought an instance back from trash.
+# Arguments: sender (model class), instance
+post_restore = Signal()
+
+# Sent after BaseQuerySet.trash() moved rows to trash with set based updates.
+# Arguments: sender (model class), pks, user
+post_bulk_trash = Signal()
+
+# Sent after BaseQuerySet.restore() brought rows back with set based updates.
+# Arguments: sender (model class), pks
+post_bulk_restore = Signal()
+
+# Sent after upsert.bulk_upsert() inserted or updated rows with set based
+# statements. Arguments: sender (model class), pks
+post_bulk_upsert = Signal()
+
+# Sent after purge.purge() erased rows of sender with raw DELETEs, once per
+# model and purge. Arguments: sender (model class), rows
+post_purge = Signal()
@@ -0,0 +1,44 @@
+"""
+    Minimal background job dispatch.
+
+    Jobs are plain functions referenced by dotted path and called with
+    serializable arguments, so PERSONALS_TASK_RUNNER can hand them to any
+    queue, e.g. a Celery task calling run_now(func_path, *args). Without a
+    runner jobs run synchronously, run_in_thread is an opt-in runner for
+    development.
+"""
+import threading
+
+from django.db import connections, transaction
+from django.utils.module_loading import import_string
+
+from .conf import get_setting
+
+
+def run_now(func_path, *args):
+    return import_string(func_path)(*args)
+
+
+def run_in_thread(func_path, *args):
+    def target():
+        try:
+            run_now(func_path, *args)
+        finally:
+            connections.close_all()
+    thread = threading.Thread(target=target, name=func_path, daemon=True)
+    thread.start()
+    return thread
+
+
+def get_runner():
+    runner = get_setting('TASK_RUNNER')
+    return import_string(runner) if isinstance(runner, str) else runner
+
+
+def run_in_background(func_path, *args):
+    """
+        Hand the job to PERSONALS_TASK_RUNNER once the current transaction
+        commits, run it then in this thread when no runner is configured
+    """
+    runner = get_runner() or run_now
+    transaction.on_commit(lambda: runner(func_path, *args))
@@ -0,0 +1,22 @@
+from django import template
+
+from django_personals import enums
+from django_personals.choices import get_display
+
+register = template.Library()
+
+
+@register.filter
+def choice_label(value, enum_name):
+    """
+        {{ person.privacy|choice_label:"PrivacyStatus" }}
+    """
+    return getattr(enums, enum_name).CHOICES.value.label(value, default=value)
+
+
+@register.filter
+def display(instance, field_name):
+    """
+        {{ person|display:"gender" }}
+    """
+    return get_display(instance, field_name)
@@ -0,0 +1,236 @@
+"""
+    Tenant scoping for BaseModel tables.
+
+    class Person(TenantMixin, PersonAbstract):
+        class Meta:
+            indexes = [TenantIndex(fields=['nickname'], name='person_tenant_nick_idx')]
+
+    with tenant_scope('acme'):
+        Person.objects.filter(...)      # live rows of tenant 'acme' only
+        Person.objects.create(...)      # tenant_id set to 'acme'
+
+    TenantMiddleware opens the scope of each request from
+    PERSONALS_TENANT_RESOLVER. Outside a scope managers are not filtered,
+    unless PERSONALS_TENANT_STRICT is set, then they raise TenantRequired.
+    all_objects is never tenant scoped, use for_tenant() on it.
+
+    PartitionByTenant turns a table into a PostgreSQL table partitioned by
+    hash or list of tenant_id, see its docstring for the constraints.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models
+from django.db.migrations.operations.base import Operation
+from django.utils import translation
+from django.utils.module_loading import import_string
+
+from .conf import get_setting
+from .indexes import LiveIndex
+from .models import BaseManager, BaseQuerySet
+
+_ = translation.gettext_lazy
+
+_tenant = ContextVar('django_personals_tenant', default=None)
+
+
+class TenantRequired(ImproperlyConfigured):
+    pass
+
+
+def get_current_tenant():
+    return _tenant.get()
+
+
+@contextmanager
+def tenant_scope(tenant_id):
+    """
+        Scope TenantManager queries and new rows to tenant_id
+    """
+    token = _tenant.set(tenant_id)
+    try:
+        yield tenant_id
+    finally:
+        _tenant.reset(token)
+
+
+def get_request_tenant(request):
+    """
+        Default PERSONALS_TENANT_RESOLVER, tenant_id of the logged in user
+    """
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return None
+    return getattr(user, 'tenant_id', None)
+
+
+class TenantMiddleware:
+    """
+        Run each request in the tenant scope returned by
+        PERSONALS_TENANT_RESOLVER(request). Place it after
+        AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.resolver = import_string(get_setting('TENANT_RESOLVER'))
+
+    def __call__(self, request):
+        with tenant_scope(self.resolver(request)):
+            return self.get_response(request)
+
+
+def require_tenant():
+    tenant_id = get_current_tenant()
+    if tenant_id is None and get_setting('TENANT_STRICT'):
+        raise TenantRequired('No tenant scope is active.')
+    return tenant_id
+
+
+class TenantQuerySet(BaseQuerySet):
+
+    def for_tenant(self, tenant_id):
+        return self.filter(tenant_id=tenant_id)
+
+
+class TenantManager(BaseManager.from_queryset(TenantQuerySet)):
+    """
+        Live rows of the current tenant
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        tenant_id = require_tenant()
+        if tenant_id is not None:
+            queryset = queryset.filter(tenant_id=tenant_id)
+        return queryset
+
+    def matches(self, instance):
+        tenant_id = require_tenant()
+        return super().matches(instance) and tenant_id in (None, instance.tenant_id)
+
+
+class TenantAllObjectsManager(models.Manager.from_queryset(TenantQuerySet)):
+    """
+        Rows of every tenant, including trashed rows
+    """
+
+
+class TenantMixin(models.Model):
+    """
+        Add tenant_id to a BaseModel subclass, override the field in the
+        concrete model to change its type
+    """
+    class Meta:
+        abstract = True
+
+    objects = TenantManager()
+    all_objects = TenantAllObjectsManager()
+
+    tenant_id = models.CharField(
+        max_length=64,
+        editable=False,
+        verbose_name=_('tenant'))
+
+    def save(self, *args, **kwargs):
+        if not self.tenant_id:
+            self.tenant_id = require_tenant()
+            if self.tenant_id is None:
+                raise TenantRequired('%s has no tenant_id.' % self._meta.label)
+        super().save(*args, **kwargs)
+
+
+class TenantIndex(LiveIndex):
+    """
+        Live rows index leading with tenant_id
+
+        TenantIndex(fields=['nickname'], name='person_tenant_nick_idx')
+    """
+
+    def __init__(self, *, fields=(), name=None, **kwargs):
+        fields = list(fields)
+        if 'tenant_id' not in fields:
+            fields.insert(0, 'tenant_id')
+        super().__init__(fields=fields, name=name, **kwargs)
+
+
+def get_partition_sql(schema_editor, model, method='hash', partitions=8, tenants=()):
+    """
+        Return statements rebuilding the table of model as a PostgreSQL
+        table partitioned by tenant_id: hash into partitions tables, or one
+        list partition per tenant plus a default partition
+    """
+    if method not in ('hash', 'list'):
+        raise ValueError('Partition method must be hash or list.')
+    quote = schema_editor.quote_name
+    table = model._meta.db_table
+    old = '%s_unpartitioned' % table
+    tenant_column = model._meta.get_field('tenant_id').column
+    statements = [
+        'ALTER TABLE %s RENAME TO %s' % (quote(table), quote(old)),
+        'CREATE TABLE %s (LIKE %s INCLUDING DEFAULTS INCLUDING CONSTRAINTS, '
+        'PRIMARY KEY (%s, %s)) PARTITION BY %s (%s)' % (
+            quote(table), quote(old), quote(tenant_column), quote(model._meta.pk.column),
+            method.upper(), quote(tenant_column)),
+    ]
+    if method == 'hash':
+        for remainder in range(partitions):
+            statements.append('CREATE TABLE %s PARTITION OF %s FOR VALUES WITH (MODULUS %d, REMAINDER %d)' % (
+                quote('%s_p%d' % (table, remainder)), quote(table), partitions, remainder))
+    else:
+        for number, tenant_id in enumerate(tenants):
+            statements.append('CREATE TABLE %s PARTITION OF %s FOR VALUES IN (%s)' % (
+                quote('%s_p%d' % (table, number)), quote(table), schema_editor.quote_value(tenant_id)))
+        statements.append('CREATE TABLE %s PARTITION OF %s DEFAULT' % (
+            quote('%s_default' % table), quote(table)))
+    statements += [
+        'INSERT INTO %s SELECT * FROM %s' % (quote(table), quote(old)),
+        'DROP TABLE %s CASCADE' % quote(old),
+    ]
+    statements += [str(statement) for statement in schema_editor._model_indexes_sql(model)]
+    for field in model._meta.local_fields:
+        if field.remote_field and field.db_constraint and schema_editor.sql_create_fk:
+            statements.append(str(schema_editor._create_fk_sql(model, field, '_fk_%(to_table)s_%(to_column)s')))
+    return statements
+
+
+class PartitionByTenant(Operation):
+    """
+        Migration operation partitioning a TenantMixin table on PostgreSQL
+        11+, a no-op on other databases. The primary key becomes
+        (tenant_id, id), so foreign keys pointing to the model need
+        db_constraint=False and unique constraints must include tenant_id.
+
+        PartitionByTenant('Person', method='hash', partitions=16)
+    """
+    reduces_to_sql = True
+    reversible = False
+
+    def __init__(self, model_name, method='hash', partitions=8, tenants=()):
+        self.model_name = model_name
+        self.method = method
+        self.partitions = partitions
+        self.tenants = list(tenants)
+
+    def deconstruct(self):
+        kwargs = {'model_name': self.model_name, 'method': self.method}
+        if self.method == 'hash':
+            kwargs['partitions'] = self.partitions
+        else:
+            kwargs['tenants'] = self.tenants
+        return self.__class__.__name__, [], kwargs
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        model = to_state.apps.get_model(app_label, self.model_name)
+        for statement in get_partition_sql(
+                schema_editor, model, self.method, self.partitions, self.tenants):
+            schema_editor.execute(statement, params=None)
+
+    def describe(self):
+        return 'Partition %s by %s of tenant_id' % (self.model_name, self.method)
@@ -0,0 +1,64 @@
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+from .profiles import get_profile_query_budget, get_profile_relations, load_profiles
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def assert_query_budget(budget, using=DEFAULT_DB_ALIAS):
+    """
+        Fail when the wrapped block runs more than budget queries
+    """
+    with CaptureQueriesContext(connections[using]) as context:
+        yield context
+    executed = len(context.captured_queries)
+    if executed > budget:
+        queries = '\n'.join(
+            '%d. %s' % (i, query['sql'])
+            for i, query in enumerate(context.captured_queries, start=1))
+        raise QueryBudgetExceeded(
+            '%d queries executed, budget is %d:\n%s' % (executed, budget, queries))
+
+
+def assert_profile_load_budget(queryset, budget=None, using=DEFAULT_DB_ALIAS):
+    """
+        Load full profiles of queryset, touching every collection, and fail
+        when it costs more than budget queries (default: one per collection,
+        whatever the number of people)
+    """
+    if budget is None:
+        budget = get_profile_query_budget(queryset.model)
+    with assert_query_budget(budget, using=using):
+        people = list(load_profiles(queryset))
+        for person in people:
+            touch_profile(person)
+    return people
+
+
+def touch_profile(person):
+    """
+        Access every profile relation, like a template rendering it would
+    """
+    single, multiple = get_profile_relations(type(person))
+    for relation in single:
+        getattr(person, relation.get_accessor_name(), None)
+    for relation in multiple:
+        list(getattr(person, relation.get_accessor_name()).all())
+
+
+class QueryBudgetMixin:
+    """
+        TestCase mixin with query budget assertions
+    """
+
+    def assertQueryBudget(self, budget, using=DEFAULT_DB_ALIAS):
+        return assert_query_budget(budget, using=using)
+
+    def assertProfileLoadBudget(self, queryset, budget=None, using=DEFAULT_DB_ALIAS):
+        return assert_profile_load_budget(queryset, budget=budget, using=using)
@@ -0,0 +1,156 @@
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_save, pre_delete, pre_save
+
+from .conf import get_setting
+from .models import BaseModel, update_rows
+from .tasks import run_in_background
+
+BATCH_SIZE = 1000
+
+TRASHED_BY_POLICIES = ('SET_NULL', 'REASSIGN')
+
+
+def iter_pk_batches(queryset, batch_size=BATCH_SIZE):
+    pks = list(queryset.order_by().values_list('pk', flat=True))
+    for start in range(0, len(pks), batch_size):
+        yield pks[start:start + batch_size]
+
+
+def trash_in_batches(queryset, user=None, batch_size=BATCH_SIZE):
+    """
+        Trash queryset rows, one short transaction per batch
+    """
+    manager = queryset.model.all_objects.db_manager(queryset.db)
+    total = 0
+    for pks in iter_pk_batches(queryset.filter(is_trash=False), batch_size):
+        with transaction.atomic(using=queryset.db):
+            total += manager.filter(pk__in=pks).trash(user=user)
+    return total
+
+
+def restore_in_batches(queryset, batch_size=BATCH_SIZE):
+    """
+        Restore trashed queryset rows, one short transaction per batch
+    """
+    manager = queryset.model.all_objects.db_manager(queryset.db)
+    total = 0
+    for pks in iter_pk_batches(queryset.filter(is_trash=True), batch_size):
+        with transaction.atomic(using=queryset.db):
+            total += manager.filter(pk__in=pks).restore()
+    return total
+
+
+def get_trashed_by_models():
+    return [
+        model for model in apps.get_models()
+        if issubclass(model, BaseModel) and model._meta.managed and not model._meta.proxy]
+
+
+def get_trashed_by_replacement(user_id):
+    """
+        Return the user id PERSONALS_TRASHED_BY_ON_DELETE puts in place
+        of user_id
+    """
+    policy = get_setting('TRASHED_BY_ON_DELETE')
+    if policy not in TRASHED_BY_POLICIES:
+        raise ImproperlyConfigured('PERSONALS_TRASHED_BY_ON_DELETE must be one of %s.' % (
+            ', '.join(TRASHED_BY_POLICIES)))
+    if policy == 'SET_NULL':
+        return None
+    replacement = get_setting('TRASHED_BY_REASSIGN_TO')
+    if replacement is None or str(replacement) == str(user_id):
+        raise ImproperlyConfigured(
+            'PERSONALS_TRASHED_BY_REASSIGN_TO must be the id of another user.')
+    return replacement
+
+
+def release_trashed_by(user_id, batch_size=BATCH_SIZE, using=None):
+    """
+        Apply the trashed_by policy to rows trashed by user_id with set
+        based updates, one short transaction per batch and table, return
+        the number of rows changed. batch_size=None runs one UPDATE per
+        table in the current transaction.
+    """
+    replacement = get_trashed_by_replacement(user_id)
+    total = 0
+    for model in get_trashed_by_models():
+        manager = model._base_manager.db_manager(using)
+        if batch_size is None:
+            total += update_rows(
+                manager.filter(trashed_by_id=user_id),
+                trashed_by_id=replacement, version=F('version') + 1)
+            continue
+        while True:
+            pks = list(manager.filter(trashed_by_id=user_id).values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            with transaction.atomic(using=manager.db):
+                total += update_rows(
+                    manager.filter(pk__in=pks, trashed_by_id=user_id),
+                    trashed_by_id=replacement, version=F('version') + 1)
+    return total
+
+
+def user_deleting(sender, instance, using=None, **kwargs):
+    # rows left by the background job, trashed_by does not cascade. Runs
+    # in the transaction of the delete, where batches would only be
+    # savepoints of one long transaction.
+    release_trashed_by(instance.pk, batch_size=None, using=using)
+
+
+def user_saving(sender, instance, raw=False, using=None, update_fields=None, **kwargs):
+    if raw or instance._state.adding or getattr(instance, 'is_active', True):
+        return
+    if not get_setting('TRASHED_BY_RELEASE_ON_DEACTIVATE'):
+        return
+    if update_fields is not None and 'is_active' not in update_fields:
+        return
+    # only the active to inactive transition queues a release
+    instance._release_trashed_by = bool(sender._base_manager.db_manager(using).filter(
+        pk=instance.pk, is_active=True).exists())
+
+
+def user_saved(sender, instance, raw=False, **kwargs):
+    if not raw and instance.__dict__.pop('_release_trashed_by', False):
+        run_in_background('django_personals.trash.release_user', instance.pk)
+
+
+def connect():
+    """
+        Apply the trashed_by policy on user deletion, called from
+        AppConfig.ready
+    """
+    uid = 'django_personals.trash'
+    user_model = get_user_model()
+    pre_delete.connect(user_deleting, sender=user_model, dispatch_uid=uid)
+    pre_save.connect(user_saving, sender=user_model, dispatch_uid=uid)
+    post_save.connect(user_saved, sender=user_model, dispatch_uid=uid)
+
+
+# Background job entry points, arguments must stay serializable
+
+def trash_pks(model_label, pks, user_id=None, batch_size=BATCH_SIZE):
+    model = apps.get_model(model_label)
+    user = get_user_model()._base_manager.filter(pk=user_id).first() if user_id else None
+    total = 0
+    for start in range(0, len(pks), batch_size):
+        queryset = model.all_objects.filter(pk__in=pks[start:start + batch_size])
+        total += trash_in_batches(queryset, user=user, batch_size=batch_size)
+    return total
+
+
+def restore_pks(model_label, pks, batch_size=BATCH_SIZE):
+    model = apps.get_model(model_label)
+    total = 0
+    for start in range(0, len(pks), batch_size):
+        queryset = model.all_objects.filter(pk__in=pks[start:start + batch_size])
+        total += restore_in_batches(queryset, batch_size=batch_size)
+    return total
+
+
+def release_user(user_id, batch_size=BATCH_SIZE):
+    return release_trashed_by(user_id, batch_size=batch_size)
@@ -0,0 +1,166 @@
+"""
+    Bulk upsert of profile rows keyed on natural keys.
+
+    Working.objects.bulk_upsert([
+        Working(person=person, institution='ACME', date_start=date(2019, 1, 1), ...),
+        ...
+    ])
+
+    Rows are matched on model.NATURAL_KEY, e.g. (person, institution,
+    date_start) for work histories or (person, name) for skills. New rows
+    are inserted, changed rows updated, unchanged rows left alone, trashed
+    rows coming back restored, and live rows of the same people missing
+    from the feed are trashed, with a handful of set based statements.
+
+    On Django 4.1+ with a UniqueConstraint over the natural key, inserts and
+    updates go through one bulk_create(update_conflicts=True) statement,
+    older versions and models without the constraint use bulk_create plus
+    bulk_update.
+"""
+import django
+from django.db import connections, models, router, transaction
+from django.utils import timezone
+
+from .signals import post_bulk_upsert
+
+BATCH_SIZE = 500
+
+# BaseModel bookkeeping columns, never compared nor copied from the feed
+SKIP_FIELDS = ('is_trash', 'trashed_by', 'trashed_at', 'modified_at', 'version')
+
+
+class UpsertResult:
+
+    def __init__(self):
+        self.created = []
+        self.updated = []
+        self.unchanged = []
+        self.restored = []
+        self.trashed = []
+
+    def __repr__(self):
+        return '<UpsertResult created=%d updated=%d unchanged=%d restored=%d trashed=%d>' % (
+            len(self.created), len(self.updated), len(self.unchanged),
+            len(self.restored), len(self.trashed))
+
+
+def get_natural_key(model):
+    natural_key = getattr(model, 'NATURAL_KEY', None)
+    if not natural_key:
+        raise ValueError('%s declares no NATURAL_KEY.' % model._meta.label)
+    return [model._meta.get_field(name) for name in natural_key]
+
+
+def get_update_fields(model, key_fields):
+    return [
+        field for field in model._meta.concrete_fields
+        if not field.primary_key and field not in key_fields and field.name not in SKIP_FIELDS]
+
+
+def get_key(obj, key_fields):
+    return tuple(field.to_python(getattr(obj, field.attname)) for field in key_fields)
+
+
+def has_unique_key(model, key_fields):
+    names = {field.name for field in key_fields}
+    if any(set(fields) == names for fields in model._meta.unique_together):
+        return True
+    return any(
+        isinstance(constraint, models.UniqueConstraint) and not constraint.condition
+        and set(constraint.fields) == names
+        for constraint in model._meta.constraints)
+
+
+def supports_update_conflicts(model, key_fields, using):
+    features = connections[using].features
+    return (
+        django.VERSION >= (4, 1)
+        and getattr(features, 'supports_update_conflicts_with_target', False)
+        and has_unique_key(model, key_fields))
+
+
+def bulk_upsert(model, objs, scope=None, delete_missing=True, user=None, using=None, batch_size=BATCH_SIZE):
+    """
+        Upsert objs of model on model.NATURAL_KEY, return UpsertResult with
+        the primary keys of every outcome. Missing rows are trashed within
+        scope: the values of the first natural key field found in objs
+        (the people of the feed) unless given.
+    """
+    objs = list(objs)
+    using = using or router.db_for_write(model)
+    key_fields = get_natural_key(model)
+    update_fields = get_update_fields(model, key_fields)
+    scope_field = key_fields[0]
+    if scope is None:
+        scope = {getattr(obj, scope_field.attname) for obj in objs}
+    scope = list(scope)
+    manager = model._base_manager.db_manager(using)
+    result = UpsertResult()
+
+    with transaction.atomic(using=using):
+        existing = {}
+        for start in range(0, len(scope), batch_size):
+            queryset = manager.filter(**{'%s__in' % scope_field.attname: scope[start:start + batch_size]})
+            for row in queryset.select_for_update():
+                existing[get_key(row, key_fields)] = row
+
+        created, changed, seen = [], [], set()
+        for obj in objs:
+            key = get_key(obj, key_fields)
+            if key in seen:
+                raise ValueError('Duplicate natural key %r in %s feed.' % (key, model._meta.label))
+            seen.add(key)
+            row = existing.get(key)
+            if row is None:
+                created.append(obj)
+                continue
+            if getattr(row, 'is_trash', False):
+                result.restored.append(row.pk)
+            obj.pk = row.pk
+            if any(field.to_python(getattr(obj, field.attname)) != getattr(row, field.attname)
+                   for field in update_fields):
+                changed.append(obj)
+            else:
+                result.unchanged.append(row.pk)
+
+        if result.restored:
+            model.all_objects.db_manager(using).filter(pk__in=result.restored).restore()
+        if delete_missing:
+            missing = [
+                row.pk for key, row in existing.items()
+                if key not in seen and not getattr(row, 'is_trash', False)]
+            if missing:
+                model.all_objects.db_manager(using).filter(pk__in=missing).trash(user=user)
+                result.trashed = missing
+
+        names = [field.name for field in update_fields]
+        if any(field.name == 'modified_at' for field in model._meta.concrete_fields):
+            now = timezone.now()
+            for obj in changed:
+                obj.modified_at = now
+            names.append('modified_at')
+        if any(field.name == 'version' for field in model._meta.concrete_fields):
+            restored = set(result.restored)
+            for obj in changed:
+                # rows are locked, restore() above bumped restored rows once
+                obj.version = existing[get_key(obj, key_fields)].version + (obj.pk in restored) + 1
+            names.append('version')
+        if supports_update_conflicts(model, key_fields, using):
+            for obj in changed:
+                # keep the stored primary key, the conflict updates that row
+                obj.pk = model._meta.pk.get_default()
+            manager.bulk_create(
+                created + changed, batch_size=batch_size, update_conflicts=True,
+                unique_fields=[field.name for field in key_fields], update_fields=names)
+            for obj in changed:
+                obj.pk = existing[get_key(obj, key_fields)].pk
+        else:
+            manager.bulk_create(created, batch_size=batch_size)
+            if changed:
+                manager.bulk_update(changed, names, batch_size=batch_size)
+        result.created = [obj.pk for obj in created]
+        result.updated = [obj.pk for obj in changed]
+
+    if result.created or result.updated:
+        post_bulk_upsert.send(sender=model, pks=result.created + result.updated)
+    return result
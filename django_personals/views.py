@@ -0,0 +1,12 @@
+from django.http import HttpResponse
+
+from .instrumentation import PrometheusSink, get_sinks
+
+
+def metrics_view(request):
+    """
+        Expose PrometheusSink counters in Prometheus text format
+    """
+    body = ''.join(
+        sink.render() for sink in get_sinks() if isinstance(sink, PrometheusSink))
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -1,4 +1,8 @@
 from django.contrib import admin
+
+from django_personals.admin import (
+    PaginatedStackedInline, PaginatedTabularInline, PersonalModelAdmin
+)
 from .models import (
     Person,
     PersonContact,
@@ -13,9 +17,10 @@ class PersonContactInline(admin.StackedInline):
     extra = 0
 
 
-class PersonAddressInline(admin.StackedInline):
+class PersonAddressInline(PaginatedStackedInline):
     model = PersonAddress
     extra = 0
+    per_page = 5
 
 
 class SocialMediaInline(admin.StackedInline):
@@ -23,12 +28,15 @@ class SocialMediaInline(admin.StackedInline):
     extra = 0
 
 
-class SkillInline(admin.TabularInline):
+class SkillInline(PaginatedTabularInline):
     model = Skill
     extra = 0
+    per_page = 25
 
 
-class PersonAdmin(admin.ModelAdmin):
+class PersonAdmin(PersonalModelAdmin):
+    list_display = ['nickname', 'gender', 'date_of_birth']
+    ordering = ['nickname', 'id']
     inlines = [
         PersonContactInline,
         PersonAddressInline,
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.28 on 2026-10-18 20:36
+
+from django.db import migrations, models
+import django_personals.indexes
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('example', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='person',
+            index=django_personals.indexes.LiveIndex(condition=models.Q(is_trash=False), fields=['nickname', 'id'], name='example_person_live_nick_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 2.2.28 on 2026-10-18 20:51
+
+from django.db import migrations
+import django_personals.contacts
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('example', '0003_basemodel_modified_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='personcontact',
+            name='email_lookup',
+            field=django_personals.contacts.LookupField(normalizer=django_personals.contacts.normalize_email, source='email'),
+        ),
+        migrations.AddField(
+            model_name='personcontact',
+            name='phone_lookup',
+            field=django_personals.contacts.LookupField(normalizer=django_personals.contacts.normalize_phone, source='phone'),
+        ),
+        migrations.AddField(
+            model_name='personcontact',
+            name='whatsapp_lookup',
+            field=django_personals.contacts.LookupField(normalizer=django_personals.contacts.normalize_phone, source='whatsapp'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 2.2.28 on 2026-10-18 21:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('example', '0004_contact_lookup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='award',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='version'),
+        ),
+        migrations.AddField(
+            model_name='family',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='version'),
+        ),
+        migrations.AddField(
+            model_name='formaleducation',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='version'),
+        ),
+        migrations.AddField(
+            model_name='nonformaleducation',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='version'),
+        ),
+        migrations.AddField(
+            model_name='person',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='version'),
+        ),
+        migrations.AddField(
+            model_name='publication',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='version'),
+        ),
+        migrations.AddField(
+            model_name='skill',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='version'),
+        ),
+        migrations.AddField(
+            model_name='volunteer',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='version'),
+        ),
+        migrations.AddField(
+            model_name='working',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='version'),
+        ),
+    ]
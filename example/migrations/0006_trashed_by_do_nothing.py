@@ -0,0 +1,60 @@
+# Generated by Django 2.2.28 on 2026-10-18 21:11
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('example', '0005_basemodel_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='award',
+            name='trashed_by',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='award_trashes', to=settings.AUTH_USER_MODEL, verbose_name='trashed by'),
+        ),
+        migrations.AlterField(
+            model_name='family',
+            name='trashed_by',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='family_trashes', to=settings.AUTH_USER_MODEL, verbose_name='trashed by'),
+        ),
+        migrations.AlterField(
+            model_name='formaleducation',
+            name='trashed_by',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='formaleducation_trashes', to=settings.AUTH_USER_MODEL, verbose_name='trashed by'),
+        ),
+        migrations.AlterField(
+            model_name='nonformaleducation',
+            name='trashed_by',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='nonformaleducation_trashes', to=settings.AUTH_USER_MODEL, verbose_name='trashed by'),
+        ),
+        migrations.AlterField(
+            model_name='person',
+            name='trashed_by',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='person_trashes', to=settings.AUTH_USER_MODEL, verbose_name='trashed by'),
+        ),
+        migrations.AlterField(
+            model_name='publication',
+            name='trashed_by',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='publication_trashes', to=settings.AUTH_USER_MODEL, verbose_name='trashed by'),
+        ),
+        migrations.AlterField(
+            model_name='skill',
+            name='trashed_by',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='skill_trashes', to=settings.AUTH_USER_MODEL, verbose_name='trashed by'),
+        ),
+        migrations.AlterField(
+            model_name='volunteer',
+            name='trashed_by',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='volunteer_trashes', to=settings.AUTH_USER_MODEL, verbose_name='trashed by'),
+        ),
+        migrations.AlterField(
+            model_name='working',
+            name='trashed_by',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='working_trashes', to=settings.AUTH_USER_MODEL, verbose_name='trashed by'),
+        ),
+    ]
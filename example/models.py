@@ -3,6 +3,7 @@ from django.contrib import admin
 from django.db import models
 from django.utils import translation
 
+from django_personals.indexes import LiveIndex
 from django_personals.models import (
     PersonAbstract,
     ContactAbstract,
@@ -25,6 +26,10 @@ class Person(PersonAbstract):
     class Meta:
         verbose_name = _('Person')
         verbose_name_plural = _('Persons')
+        indexes = [
+            # PersonAdmin change list ordering
+            LiveIndex(fields=['nickname', 'id'], name='example_person_live_nick_idx'),
+        ]
 
 
 class PersonContact(ContactAbstract):
@@ -24,12 +24,21 @@ setup(
     url='https://github.com/sasriawesome/django_personals',
     packages=[
         'django_personals',
+        'django_personals.management',
+        'django_personals.management.commands',
         'django_personals.migrations',
+        'django_personals.templatetags',
         'django_personals.utils',
     ],
+    include_package_data=True,
+    python_requires='>=3.7',
     install_requires=[
         'Django>=2.2',
     ],
+    extras_require={
+        'encryption': ['cryptography'],
+        'analytics': ['numpy'],
+    },
     classifiers=[
         "Development Status :: 3 - Alpha",
         "Environment :: Web Environment",
@@ -38,6 +47,9 @@ setup(
         "License :: OSI Approved :: BSD License",
         "Operating System :: OS Independent",
         "Programming Language :: Python",
+        "Programming Language :: Python :: 3",
+        "Programming Language :: Python :: 3 :: Only",
+        "Programming Language :: Python :: 3.7",
         "Topic :: Software Development :: Libraries :: Python Modules",
     ],
     tes_suite="tests.run_tests.run_tests"
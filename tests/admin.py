@@ -0,0 +1,21 @@
+from django.contrib import admin
+
+from django_personals.admin import PaginatedTabularInline, PersonalModelAdmin
+from .models import Person, Skill
+
+
+class SkillInline(PaginatedTabularInline):
+    model = Skill
+    extra = 0
+    per_page = 2
+    ordering = ['level']
+
+
+class PersonAdmin(PersonalModelAdmin):
+    list_display = ['nickname', 'gender']
+    list_per_page = 2
+    ordering = ['nickname']
+    inlines = [SkillInline]
+
+
+admin.site.register(Person, PersonAdmin)
@@ -1,9 +1,131 @@
 import uuid
 from django.db import models
 
+from django_personals.completeness import CompletenessField
+from django_personals.counters import CounterField
+from django_personals.directory import DirectoryAbstract
+from django_personals.contacts import normalize_email, normalize_phone
+from django_personals.encryption import EncryptedCharField, BlindIndexField, normalize_digits
+from django_personals.tenancy import TenantIndex, TenantMixin
+from django_personals.models import (
+    PersonMinimalAbstract,
+    PersonAbstract,
+    ContactAbstract,
+    AddressAbstract,
+    SocialAbstract,
+    SkillAbstract,
+    AwardAbstract,
+    FormalEduAbstract,
+    NonFormalEduAbstract,
+    WorkingAbstract,
+    VolunteerAbstract,
+    PublicationAbstract,
+    FamilyAbstract
+)
+
 UUID = {
     'default': uuid.uuid4,
     'unique': True,
     'primary_key': True,
     'editable': True
-}
\ No newline at end of file
+}
+
+
+class Person(PersonAbstract):
+    skills_count = CounterField('skills')
+    addresses_count = CounterField('addresses')
+    completeness = CompletenessField()
+
+
+class PersonContact(ContactAbstract):
+    person = models.OneToOneField(
+        Person, on_delete=models.CASCADE,
+        related_name='contact')
+
+
+class SocialMedia(SocialAbstract):
+    person = models.OneToOneField(
+        Person, on_delete=models.CASCADE,
+        related_name='social_media')
+
+
+class PersonAddress(AddressAbstract):
+    person = models.ForeignKey(
+        Person, on_delete=models.CASCADE,
+        related_name='addresses')
+
+
+class Skill(SkillAbstract):
+    person = models.ForeignKey(
+        Person, on_delete=models.CASCADE,
+        related_name='skills')
+
+
+class Award(AwardAbstract):
+    person = models.ForeignKey(
+        Person, on_delete=models.CASCADE,
+        related_name='awards')
+
+
+class FormalEducation(FormalEduAbstract):
+    person = models.ForeignKey(
+        Person, on_delete=models.CASCADE,
+        related_name='formal_educations')
+
+
+class NonFormalEducation(NonFormalEduAbstract):
+    person = models.ForeignKey(
+        Person, on_delete=models.CASCADE,
+        related_name='non_formal_educations')
+
+
+class Working(WorkingAbstract):
+    person = models.ForeignKey(
+        Person, on_delete=models.CASCADE,
+        related_name='work_histories')
+
+
+class Volunteer(VolunteerAbstract):
+    person = models.ForeignKey(
+        Person, on_delete=models.CASCADE,
+        related_name='volunteers')
+
+
+class Publication(PublicationAbstract):
+    person = models.ForeignKey(
+        Person, on_delete=models.CASCADE,
+        related_name='publications')
+
+
+class Family(FamilyAbstract):
+    person = models.ForeignKey(
+        Person, on_delete=models.CASCADE,
+        related_name='families')
+
+
+class SecretContact(models.Model):
+    email = EncryptedCharField(max_length=128, null=True, blank=True)
+    email_index = BlindIndexField('email')
+    phone = EncryptedCharField(max_length=128, null=True, blank=True)
+    phone_index = BlindIndexField('phone', normalizer=normalize_digits)
+
+
+class Member(TenantMixin, PersonMinimalAbstract):
+    class Meta:
+        indexes = [TenantIndex(fields=['gender'], name='tests_member_tenant_idx')]
+
+
+class MemberContact(ContactAbstract):
+    member = models.OneToOneField(
+        Member, on_delete=models.CASCADE,
+        related_name='contact')
+    phone = EncryptedCharField(max_length=128, null=True, blank=True)
+    phone_index = BlindIndexField('phone', normalizer=normalize_phone)
+    email = EncryptedCharField(max_length=128, null=True, blank=True)
+    email_index = BlindIndexField('email', normalizer=normalize_email)
+
+
+class Directory(DirectoryAbstract):
+    person = models.OneToOneField(
+        Person, primary_key=True, on_delete=models.CASCADE,
+        related_name='directory')
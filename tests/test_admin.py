@@ -0,0 +1,118 @@
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from .models import Person, Skill
+
+
+class TestPersonalModelAdmin(TestCase):
+
+    def setUp(self):
+        user = User.objects.create_superuser('admin', 'admin@example.com', 'secret')
+        self.client.force_login(user)
+        self.people = [Person.objects.create(nickname=name) for name in 'abcde']
+
+    def get_names(self, response):
+        return [person.nickname for person in response.context['cl'].result_list]
+
+    def test_keyset_change_list(self):
+        url = reverse('admin:tests_person_changelist')
+        response = self.client.get(url)
+        self.assertEqual(self.get_names(response), ['a', 'b'])
+        names = self.get_names(response)
+        while response.context['cl'].next_cursor:
+            response = self.client.get(url + response.context['cl'].get_next_page_url())
+            names += self.get_names(response)
+        self.assertEqual(names, list('abcde'))
+
+    def test_change_list_hides_trash(self):
+        self.people[0].delete(paranoid=True)
+        response = self.client.get(reverse('admin:tests_person_changelist'))
+        self.assertEqual(self.get_names(response), ['b', 'c'])
+
+    def test_invalid_cursor_shows_first_page(self):
+        response = self.client.get(reverse('admin:tests_person_changelist') + '?cursor=bogus')
+        self.assertEqual(self.get_names(response), ['a', 'b'])
+
+    def test_paginated_inline(self):
+        person = self.people[0]
+        for level in range(5):
+            Skill.objects.create(person=person, name='skill %d' % level, level=level)
+        url = reverse('admin:tests_person_change', args=[person.pk])
+        formset = self.client.get(url).context['inline_admin_formsets'][0].formset
+        self.assertEqual(len(formset.forms), 2)
+        response = self.client.get(url + '?skills-page=3')
+        formset = response.context['inline_admin_formsets'][0].formset
+        self.assertEqual([form.instance.level for form in formset.forms], [4])
+        self.assertContains(response, 'Page 3 of 3')
+
+
+class TestTrashAdmin(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'secret')
+        self.client.force_login(self.user)
+        self.people = [Person.objects.create(nickname=name) for name in 'abc']
+
+    def post_action(self, url, action, people):
+        return self.client.post(url, {
+            'action': action,
+            '_selected_action': [person.pk for person in people],
+        })
+
+    def test_trash_and_restore_actions(self):
+        url = reverse('admin:tests_person_changelist')
+        self.post_action(url, 'trash_selected', self.people[:2])
+        self.assertEqual(Person.objects.count(), 1)
+        self.assertEqual(Person.all_objects.filter(trashed_by=self.user).count(), 2)
+
+        trash_url = reverse('admin:tests_person_trash')
+        response = self.client.get(trash_url)
+        self.assertEqual(len(response.context['cl'].result_list), 2)
+        self.post_action(trash_url, 'restore_selected', self.people[:1])
+        self.assertEqual(Person.objects.count(), 2)
+
+    def test_hard_delete_action_is_removed(self):
+        response = self.client.get(reverse('admin:tests_person_changelist'))
+        actions = [name for name, label in response.context['action_form'].fields['action'].choices]
+        self.assertIn('trash_selected', actions)
+        self.assertNotIn('delete_selected', actions)
+
+    def test_bulk_trash_updates_counters(self):
+        person = self.people[0]
+        skills = [Skill.objects.create(person=person, name=str(i), level=i) for i in range(3)]
+        Skill.objects.filter(pk__in=[skill.pk for skill in skills[:2]]).trash()
+        person.refresh_from_db()
+        self.assertEqual(person.skills_count, 1)
+        Skill.all_objects.restore()
+        person.refresh_from_db()
+        self.assertEqual(person.skills_count, 3)
+
+
+@override_settings(PERSONALS_TASK_RUNNER='django_personals.tasks.run_now')
+class TestTrashAdminBackground(TransactionTestCase):
+
+    def trash_large_selection(self):
+        user = User.objects.create_superuser('admin', 'admin@example.com', 'secret')
+        self.client.force_login(user)
+        people = [Person.objects.create() for i in range(3)]
+        admin.site._registry[Person].background_threshold = 2
+        try:
+            return self.client.post(reverse('admin:tests_person_changelist'), {
+                'action': 'trash_selected',
+                '_selected_action': [person.pk for person in people],
+            }, follow=True)
+        finally:
+            admin.site._registry[Person].background_threshold = 1000
+
+    def test_large_selection_runs_in_background(self):
+        response = self.trash_large_selection()
+        self.assertContains(response, 'in background')
+        self.assertEqual(Person.objects.count(), 0)
+
+    @override_settings(PERSONALS_TASK_RUNNER=None)
+    def test_large_selection_without_runner(self):
+        response = self.trash_large_selection()
+        self.assertContains(response, 'Moved 3 ')
+        self.assertEqual(Person.objects.count(), 0)
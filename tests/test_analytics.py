@@ -0,0 +1,102 @@
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from django_personals import analytics
+from django_personals.models import SkillSummary
+from .models import Person, Skill
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestSkillAnalytics(TestCase):
+
+    def setUp(self):
+        self.people = [Person.objects.create() for i in range(4)]
+        for person, level in zip(self.people, (2, 5, 5, 9)):
+            Skill.objects.create(person=person, name='python', level=level)
+        Skill.objects.create(person=self.people[3], name='sql', level=4)
+        Skill.objects.create(person=self.people[1], name='sql', level=6)
+        Skill.objects.create(person=self.people[0], name='cobol', level=10).delete(paranoid=True)
+
+    def test_distribution(self):
+        values = analytics.histogram(Skill, 'python')
+        self.assertEqual(values, [0, 0, 1, 0, 0, 2, 0, 0, 0, 1, 0])
+        self.assertEqual(analytics.mean(values), 5.25)
+        self.assertEqual(analytics.percentiles(Skill, 'python'), {25: 2, 50: 5, 75: 5, 90: 9})
+        self.assertEqual(analytics.histogram(Skill, 'cobol'), [0] * 11)
+        self.assertIsNone(analytics.percentile(analytics.histogram(Skill, 'cobol'), 50))
+
+    def test_top_people_and_cooccurrence(self):
+        top = list(analytics.top_people(Skill, 'python', 2))
+        self.assertEqual([skill.level for skill in top], [9, 5])
+        self.assertEqual(top[0].person, self.people[3])
+        self.assertEqual(analytics.cooccurrence(Skill, 'python'), [('sql', 2)])
+        self.assertEqual(analytics.cooccurrence(Skill, 'sql'), [('python', 2)])
+
+    @override_settings(PERSONALS_SKILL_SUMMARY_MODELS=['tests.Skill'])
+    def test_summary(self):
+        self.assertEqual(analytics.rebuild_summary(Skill), 2)
+        self.assertEqual(SkillSummary.objects.get(name='python', level=5).people, 2)
+        skill = Skill.objects.create(person=self.people[2], name='sql', level=6)
+        self.assertEqual(analytics.histogram(Skill, 'sql')[6], 2)
+        skill.name = 'go'
+        skill.save()
+        self.assertEqual(analytics.histogram(Skill, 'sql')[6], 1)
+        self.assertEqual(analytics.histogram(Skill, 'go')[6], 1)
+        Skill.objects.filter(name='python').trash()
+        self.assertEqual(analytics.histogram(Skill, 'python'), [0] * 11)
+        Skill.objects.get(name='go').delete()
+        self.assertFalse(SkillSummary.objects.filter(name='go').exists())
+        out = StringIO()
+        call_command('rebuild_personals_skill_summary', stdout=out)
+        self.assertIn('tests.Skill: 1 skills summarized.', out.getvalue())
+
+    @override_settings(PERSONALS_SKILL_SUMMARY_MODELS=['tests.Skill'])
+    def test_summary_deltas(self):
+        analytics.rebuild_summary(Skill)
+        skill = Skill.objects.get(name='python', level=2)
+        skill.level = 5
+        with CaptureQueriesContext(connection) as queries:
+            skill.save()
+        self.assertFalse([query for query in queries if 'GROUP BY' in query['sql']])
+        self.assertEqual(analytics.histogram(Skill, 'python'), [0, 0, 0, 0, 0, 3, 0, 0, 0, 1, 0])
+        skill.delete(paranoid=True)
+        skill.restore()
+        Skill.objects.filter(name='sql').trash()
+        Skill.all_objects.filter(name='sql', level=4).restore()
+        Skill.objects.create(person=self.people[2], name='go', level=3)
+        Skill.all_objects.get(name='cobol').delete()
+        expected = analytics.histograms(Skill, queryset=Skill.objects.all())
+        self.assertEqual(analytics.histograms(Skill), expected)
+        analytics.rebuild_summary(Skill)
+        self.assertEqual(analytics.histograms(Skill), expected)
+
+    @override_settings(PERSONALS_SKILL_SUMMARY_MODELS=['tests.Skill'])
+    def test_people_counted_once(self):
+        analytics.rebuild_summary(Skill)
+        twin = Skill.objects.create(person=self.people[1], name='python', level=5)
+        self.assertEqual(analytics.histogram(Skill, 'python')[5], 2)
+        twin.delete()
+        self.assertEqual(analytics.histogram(Skill, 'python')[5], 2)
+        twin = Skill.objects.create(person=self.people[1], name='python', level=5)
+        Skill.objects.filter(pk=twin.pk).trash()
+        self.assertEqual(analytics.histogram(Skill, 'python')[5], 2)
+        Skill.all_objects.filter(pk=twin.pk).restore()
+        self.assertEqual(analytics.histogram(Skill, 'python', queryset=Skill.objects.all())[5], 2)
+        self.assertEqual(analytics.histograms(Skill), analytics.histograms(Skill, queryset=Skill.objects.all()))
+
+    @skipUnless(numpy, 'numpy is not installed')
+    def test_skill_matrix(self):
+        people, matrix = analytics.skill_matrix(Skill, ['python', 'sql'])
+        self.assertEqual(matrix.shape, (4, 2))
+        self.assertEqual(int(matrix[people.index(self.people[3].pk)].sum()), 13)
+        has = (matrix > 0).astype(int)
+        self.assertEqual(int((has.T @ has)[0, 1]), 2)
@@ -0,0 +1,55 @@
+from django.test import TestCase, override_settings
+
+from django_personals.changefeed import get_latest_cursor, iter_changes
+from .models import Person, Skill
+
+
+@override_settings(PERSONALS_CHANGE_FEED_LAG_SECONDS=0)
+class TestChangeFeed(TestCase):
+
+    def changed(self, cursor=None):
+        pks, last_cursor = [], cursor
+        for batch in iter_changes(Person, cursor=cursor, batch_size=2):
+            pks += [person.pk for person in batch]
+            last_cursor = batch.cursor
+        return pks, last_cursor
+
+    def test_feed_yields_deltas(self):
+        people = [Person.objects.create() for i in range(5)]
+        pks, cursor = self.changed()
+        self.assertEqual(sorted(pks), sorted(person.pk for person in people))
+        self.assertEqual(self.changed(cursor), ([], cursor))
+
+        people[1].nickname = 'changed'
+        people[1].save(update_fields=['nickname'])
+        people[2].delete(paranoid=True)
+        Person.objects.filter(pk=people[3].pk).trash()
+        pks, cursor = self.changed(cursor)
+        self.assertEqual(pks, [people[1].pk, people[2].pk, people[3].pk])
+
+        Person.all_objects.filter(pk=people[3].pk).restore()
+        self.assertEqual(self.changed(cursor)[0], [people[3].pk])
+
+    def test_latest_cursor(self):
+        Person.objects.create()
+        cursor = get_latest_cursor(Person)
+        person = Person.objects.create()
+        self.assertEqual(self.changed(cursor)[0], [person.pk])
+
+    @override_settings(PERSONALS_CHANGE_FEED_LAG_SECONDS=60)
+    def test_recent_changes_are_held_back(self):
+        Person.objects.create()
+        self.assertEqual(self.changed()[0], [])
+
+    def test_queryset_update(self):
+        person = Person.objects.create()
+        Person.objects.create()
+        cursor = self.changed()[1]
+        Person.objects.filter(pk=person.pk).update(nickname='changed')
+        self.assertEqual(self.changed(cursor)[0], [person.pk])
+
+    def test_counter_update(self):
+        person = Person.objects.create()
+        cursor = self.changed()[1]
+        Skill.objects.create(person=person, name='python', level=5)
+        self.assertIn(person.pk, self.changed(cursor)[0])
@@ -0,0 +1,41 @@
+from django.template import Context, Template
+from django.test import TestCase
+from django.utils import translation
+
+from django_personals.choices import ChoiceTable, get_display
+from django_personals.enums import Gender, PrivacyStatus
+from .models import Person
+
+
+class TestChoiceTable(TestCase):
+
+    def test_iterates_like_choices(self):
+        self.assertEqual(
+            [(value, str(label)) for value, label in Gender.CHOICES.value],
+            [('L', 'Male'), ('P', 'Female')])
+
+    def test_labels_are_memoized_per_language(self):
+        table = ChoiceTable(('a', 'first thing'))
+        labels = table.get_labels('en')
+        self.assertIs(table.get_labels('en'), labels)
+        self.assertEqual(table.label('a', language='en'), 'First Thing')
+        self.assertIsNot(table.get_labels('id'), labels)
+
+    def test_labels_follow_active_language(self):
+        table = ChoiceTable(('a', 'label'), transform=lambda label: translation.get_language())
+        with translation.override('de'):
+            self.assertEqual(table.label('a'), 'de')
+        with translation.override('fr'):
+            self.assertEqual(table.label('a'), 'fr')
+
+    def test_get_display(self):
+        person = Person(gender=Gender.FEMALE.value, privacy=PrivacyStatus.ME.value)
+        self.assertEqual(get_display(person, 'gender'), person.get_gender_display())
+        self.assertEqual(get_display(person, 'privacy'), 'Only Me')
+
+    def test_template_filters(self):
+        person = Person(gender=Gender.FEMALE.value)
+        template = Template(
+            '{% load personals %}{{ person|display:"gender" }} '
+            '{{ person.privacy|choice_label:"PrivacyStatus" }}')
+        self.assertEqual(template.render(Context({'person': person})), 'Female Anyone')
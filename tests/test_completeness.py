@@ -0,0 +1,55 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from django_personals.completeness import get_scorers, rebuild_completeness
+from .models import Person, PersonContact, Skill
+
+
+class TestCompleteness(TestCase):
+
+    def setUp(self):
+        self.scorer = get_scorers(Person)[0]
+        self.total = sum(self.scorer.weights.values())
+        self.person = Person.objects.create(nickname='budi', date_of_birth=None)
+
+    def score(self, *weights):
+        return sum(weights) * 100 // self.total
+
+    def test_declared_weights(self):
+        weights = self.scorer.weights
+        self.assertEqual(weights['nickname'], 1)
+        self.assertEqual(weights['contact__phone'], 2)
+        self.assertEqual(weights['social_media__twitter'], 1)
+        self.assertEqual(weights['skills'], 3)
+        self.assertNotIn('awards', weights)
+
+    def test_incremental_updates(self):
+        self.assertEqual(self.person.completeness, self.score(1))
+        contact = PersonContact.objects.create(person=self.person, phone='0812345678', email='')
+        self.assertEqual(Person.objects.get().completeness, self.score(1, 2))
+        skill = Skill.objects.create(person=self.person, level=1)
+        self.assertEqual(Person.objects.get().completeness, self.score(1, 2, 3))
+        skill.delete(paranoid=True)
+        self.assertEqual(Person.objects.get().completeness, self.score(1, 2))
+        Skill.all_objects.filter(pk=skill.pk).restore()
+        self.assertEqual(Person.objects.get().completeness, self.score(1, 2, 3))
+        Skill.objects.filter(pk=skill.pk).trash()
+        contact.delete()
+        self.assertEqual(Person.objects.get().completeness, self.score(1))
+        self.person.about_me = 'hi'
+        self.person.save(update_fields=['about_me'])
+        self.assertEqual(self.person.completeness, self.score(1, 2))
+
+    def test_bulk_rebuild(self):
+        people = [self.person] + [Person.objects.create(nickname='x', religion='y') for i in range(3)]
+        Person.objects.update(completeness=0)
+        self.assertEqual(rebuild_completeness(Person, batch_size=2), 4)
+        self.assertEqual(
+            list(Person.objects.order_by('pk').values_list('completeness', flat=True)),
+            [self.score(1) if person is self.person else self.score(1, 1, 1)
+             for person in sorted(people, key=lambda person: person.pk)])
+        out = StringIO()
+        call_command('rebuild_personals_completeness', stdout=out)
+        self.assertIn('tests.Person.completeness: 4 rows updated.', out.getvalue())
@@ -0,0 +1,99 @@
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from django_personals.contacts import (
+    find_by_contact, normalize_email, normalize_handle, normalize_phone
+)
+from .models import Member, MemberContact, Person, PersonContact, SocialMedia
+
+try:
+    from cryptography.fernet import Fernet
+except ImportError:
+    Fernet = None
+
+
+class TestNormalizers(TestCase):
+
+    def test_phone(self):
+        for value in ('0812-3456-7890', '+62 812 3456 7890', '(0812) 3456 7890', '62812 3456 7890', '0062 81234567890'):
+            self.assertEqual(normalize_phone(value), '+6281234567890')
+        self.assertEqual(normalize_phone('020 7946 0018', region='GB'), '+442079460018')
+        self.assertIsNone(normalize_phone('123'))
+        self.assertIsNone(normalize_phone(''))
+        with override_settings(PERSONALS_PHONE_REGION='MY'):
+            self.assertEqual(normalize_phone('012-345 6789'), '+60123456789')
+
+    def test_email_and_handle(self):
+        self.assertEqual(normalize_email(' Me@Mail.COM '), 'me@mail.com')
+        self.assertIsNone(normalize_email('not an email'))
+        for value in ('@SomeOne', 'https://twitter.com/someone', 'www.instagram.com/SomeOne/?hl=en', 'someone'):
+            self.assertEqual(normalize_handle(value), 'someone')
+
+
+class TestFindByContact(TestCase):
+
+    def setUp(self):
+        self.person = Person.objects.create()
+        PersonContact.objects.create(
+            person=self.person, phone='0812-3456-7890', email='Me@Mail.com', whatsapp='+62 811 111 1111')
+        SocialMedia.objects.create(person=self.person, twitter='@Someone')
+        self.other = Person.objects.create()
+
+    def test_lookups(self):
+        for value in ('+6281234567890', '(0812) 3456 7890', '0811-1111-111', 'ME@mail.com', 'https://x.com/someone'):
+            self.assertEqual(list(find_by_contact(Person, value)), [self.person], value)
+        self.assertFalse(find_by_contact(Person, 'nobody@mail.com').exists())
+        self.assertFalse(find_by_contact(Person, '').exists())
+
+    def test_lookups_query_contact_tables(self):
+        with CaptureQueriesContext(connection) as queries:
+            list(find_by_contact(Person, '0812-3456-7890'))
+        sql = queries[0]['sql']
+        self.assertNotIn('JOIN', sql)
+        self.assertNotIn('DISTINCT', sql)
+        self.assertIn('UNION', sql)
+
+    def test_update_fields_refresh_lookup(self):
+        contact = self.person.contact
+        contact.email = 'new@mail.com'
+        contact.save(update_fields=['email'])
+        self.assertEqual(list(find_by_contact(Person, 'NEW@mail.com')), [self.person])
+
+    def test_backfill(self):
+        PersonContact.objects.update(phone_lookup=None, email_lookup=None)
+        SocialMedia.objects.update(twitter='@Someone')
+        out = StringIO()
+        call_command('backfill_personals_contacts', batch_size=1, stdout=out)
+        self.assertIn('tests.PersonContact: 1 rows updated.', out.getvalue())
+        self.assertIn('tests.SocialMedia: 1 rows updated.', out.getvalue())
+        self.assertEqual(list(find_by_contact(Person, '081234567890')), [self.person])
+        self.assertEqual(SocialMedia.objects.get().twitter, 'someone')
+
+
+@skipUnless(Fernet, 'cryptography is not installed')
+@override_settings(PERSONALS_ENCRYPTION_KEYS=[Fernet.generate_key()] if Fernet else [])
+class TestFindByEncryptedContact(TestCase):
+
+    def setUp(self):
+        self.member = Member.objects.create(tenant_id='acme')
+        MemberContact.objects.create(
+            member=self.member, phone='0812-3456-7890', email='Me@Mail.com', whatsapp='0811-1111-111')
+
+    def assertFound(self):
+        for value in ('+62 812 3456 7890', 'ME@mail.com', '+628111111111'):
+            self.assertEqual(list(find_by_contact(Member, value)), [self.member], value)
+
+    def test_lookups_use_blind_indexes(self):
+        row = MemberContact.objects.values('phone_lookup', 'email_lookup', 'whatsapp_lookup').get()
+        self.assertEqual(row, {'phone_lookup': None, 'email_lookup': None, 'whatsapp_lookup': '+628111111111'})
+        self.assertFound()
+        contact = MemberContact.objects.get()
+        contact.privacy = contact.privacy
+        contact.save()
+        self.assertIsNone(MemberContact.objects.values_list('phone_lookup', flat=True).get())
+        self.assertFound()
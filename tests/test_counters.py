@@ -0,0 +1,66 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .models import Person, PersonAddress, Skill
+
+
+class TestCounters(TestCase):
+
+    def setUp(self):
+        self.person = Person.objects.create()
+
+    def assertCount(self, skills, addresses=0):
+        self.person.refresh_from_db()
+        self.assertEqual(self.person.skills_count, skills)
+        self.assertEqual(self.person.addresses_count, addresses)
+
+    def test_create_and_delete(self):
+        skill = Skill.objects.create(person=self.person, name='python', level=5)
+        Skill.objects.create(person=self.person, name='sql', level=5)
+        PersonAddress.objects.create(person=self.person)
+        self.assertCount(2, 1)
+        skill.delete()
+        self.assertCount(1, 1)
+
+    def test_parent_delete_skips_children(self):
+        Skill.objects.create(person=self.person, name='python', level=5)
+        Skill.objects.create(person=self.person, name='sql', level=5)
+        with CaptureQueriesContext(connection) as queries:
+            self.person.delete()
+        table = Person._meta.db_table
+        self.assertEqual(len([q for q in queries if q['sql'].startswith('UPDATE "%s"' % table)]), 0)
+        self.person = Person.objects.create()
+        skill = Skill.objects.create(person=self.person, name='python', level=5)
+        skill.delete()
+        self.assertCount(0)
+
+    def test_trash_and_restore(self):
+        skill = Skill.objects.create(person=self.person, name='python', level=5)
+        skill.delete(paranoid=True)
+        self.assertCount(0)
+        skill.delete()
+        self.assertCount(0)
+        skill = Skill.objects.create(person=self.person, name='sql', level=5)
+        skill.delete(paranoid=True)
+        skill.restore()
+        self.assertCount(1)
+
+    def test_rebuild(self):
+        Skill.objects.bulk_create([
+            Skill(person=self.person, name='python', level=5),
+            Skill(person=self.person, name='sql', level=5, is_trash=True),
+        ])
+        self.assertCount(0)
+        call_command('rebuild_personals_counters', 'tests.Person', stdout=StringIO())
+        self.assertCount(1)
+
+    def test_stale_person_save_keeps_count(self):
+        Skill.objects.create(person=self.person, name='python', level=5)
+        self.person.nickname = 'budi'
+        self.person.save()
+        self.assertCount(1)
+        self.assertEqual(Person.objects.get(pk=self.person.pk).nickname, 'budi')
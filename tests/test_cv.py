@@ -0,0 +1,67 @@
+import io
+import multiprocessing
+import zipfile
+from datetime import date
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from django_personals.cv import CVRenderer, export_cvs, get_sections, render_cv
+from .models import Person, PersonContact, Skill, Working
+
+
+class TestCV(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.person = Person.objects.create(nickname='budi')
+        PersonContact.objects.create(person=self.person, email='budi@example.com')
+        Working.objects.create(
+            person=self.person, institution='ACME', date_start=date(2015, 1, 1),
+            date_end=date(2018, 1, 1), department='it', position='engineer')
+        self.skill = Skill.objects.create(person=self.person, name='python', level=8)
+
+    def test_sections(self):
+        names = [section.name for section in get_sections(Person)]
+        self.assertEqual(names[0], 'work_histories')
+        self.assertEqual(names[-1], 'skills')
+        self.assertNotIn('families', names)
+
+    def test_render(self):
+        html = render_cv(self.person)
+        self.assertIn('budi@example.com', html)
+        self.assertIn('ACME, engineer', html)
+        self.assertIn('80%', html)
+        self.assertNotIn('Publications', html)
+
+    def test_section_cache(self):
+        renderer = CVRenderer(Person)
+        sections = len(renderer.sections)
+        renderer.render(self.person)
+        # person plus one version query per section, nothing to render
+        with self.assertNumQueries(1 + sections):
+            renderer.render(self.person)
+        self.skill.level = 3
+        self.skill.save()
+        with self.assertNumQueries(2 + sections):
+            html = renderer.render(self.person)
+        self.assertIn('30%', html)
+        self.skill.delete(paranoid=True)
+        self.assertNotIn('python', renderer.render(self.person))
+
+    def assertExported(self, processes):
+        other = Person.objects.create(nickname='sari')
+        data = b''.join(export_cvs(Person.objects.all(), processes=processes, batch_size=1))
+        archive = zipfile.ZipFile(io.BytesIO(data))
+        self.assertEqual(
+            sorted(archive.namelist()), sorted('%s.html' % pk for pk in (self.person.pk, other.pk)))
+        self.assertIn('ACME', archive.read('%s.html' % self.person.pk).decode())
+
+    def test_export(self):
+        self.assertExported(processes=0)
+
+    # workers only see the in-memory test database when forked
+    @skipUnless(multiprocessing.get_start_method() == 'fork', 'process pool workers are not forked')
+    def test_export_process_pool(self):
+        self.assertExported(processes=2)
@@ -0,0 +1,86 @@
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import DatabaseError, transaction
+from django.db.utils import ConnectionDoesNotExist
+from django.test import TestCase, TransactionTestCase
+
+from django_personals.directory import get_directories
+from .models import Directory, Person, PersonAddress, PersonContact, Skill, Working
+
+
+class TestDirectory(TransactionTestCase):
+
+    def setUp(self):
+        self.person = Person.objects.create(nickname='budi')
+
+    def test_entry_follows_profile(self):
+        with transaction.atomic():
+            PersonContact.objects.create(person=self.person, email='budi@example.com')
+            PersonAddress.objects.create(person=self.person, city='Jakarta', is_primary=False)
+            PersonAddress.objects.create(person=self.person, city='Bandung', country='ID')
+            Working.objects.create(
+                person=self.person, institution='ACME', date_start=date(2015, 1, 1),
+                department='it', position='engineer')
+            Working.objects.create(
+                person=self.person, institution='Initech', date_start=date(2019, 1, 1),
+                department='it', position='lead')
+            for name in ('python', 'sql'):
+                Skill.objects.create(person=self.person, name=name, level=5)
+            # refreshed once, on commit
+            self.assertEqual(Directory.objects.get().email, None)
+        entry = Directory.objects.get()
+        self.assertEqual(
+            (entry.name, entry.email, entry.city, entry.country, entry.institution, entry.position,
+             entry.skills_count),
+            ('budi', 'budi@example.com', 'Bandung', 'ID', 'Initech', 'lead', 2))
+        Working.objects.get(institution='Initech').delete(paranoid=True)
+        Skill.objects.filter(name='sql').trash()
+        entry = Directory.objects.get()
+        self.assertEqual((entry.institution, entry.skills_count), ('ACME', 1))
+        self.assertEqual(list(Directory.objects.search('bandung').people()), [self.person])
+        self.person.delete(paranoid=True)
+        self.assertFalse(Directory.objects.exists())
+        self.person.restore()
+        self.assertTrue(Directory.objects.exists())
+
+    def rename(self, nickname):
+        person = Person.objects.get()
+        person.nickname = nickname
+        person.save()
+
+    def test_rolled_back_refresh_is_not_reused(self):
+        Directory.objects.all().delete()
+        with self.assertRaises(DatabaseError), transaction.atomic():
+            self.rename('sari')
+            raise DatabaseError
+        with transaction.atomic():
+            with self.assertRaises(DatabaseError), transaction.atomic():
+                self.rename('dewi')
+                raise DatabaseError
+            self.rename('ayu')
+        self.assertEqual(Directory.objects.get().name, 'ayu')
+
+
+class TestDirectoryRebuild(TestCase):
+
+    def test_rebuild(self):
+        people = [Person.objects.create(nickname=name) for name in ('a', 'b')]
+        Directory.objects.all().delete()
+        Directory.objects.create(person=people[1], name='stale')
+        people[1].delete(paranoid=True)
+        out = StringIO()
+        call_command('rebuild_personals_directory', stdout=out)
+        self.assertIn('tests.Directory: 1 people refreshed.', out.getvalue())
+        self.assertEqual(list(Directory.objects.values_list('name', flat=True)), ['a'])
+        self.assertEqual(len(get_directories(Person)), 1)
+
+    def test_refresh_runs_on_given_database(self):
+        person = Person.objects.create(nickname='a')
+        directory = get_directories(Person)[0]
+        with self.assertRaises(ConnectionDoesNotExist):
+            directory.refresh([person.pk], using='other')
+        Directory.objects.all().delete()
+        directory.refresh([person.pk], using='default')
+        self.assertEqual(Directory.objects.get().name, 'a')
@@ -0,0 +1,76 @@
+from unittest import skipUnless
+
+from django.core.exceptions import FieldError
+from django.test import TestCase, override_settings
+
+from django_personals.encryption import (
+    BlindIndexField, Ciphertext, blind_index, blind_lookup, normalize_digits
+)
+from .models import SecretContact
+
+try:
+    from cryptography.fernet import Fernet
+except ImportError:
+    Fernet = None
+
+KEYS = [Fernet.generate_key()] if Fernet else []
+
+
+class TestBlindIndex(TestCase):
+
+    def test_normalized_and_keyed(self):
+        self.assertEqual(blind_index(' Me@Mail.COM '), blind_index('me@mail.com'))
+        self.assertEqual(len(blind_index('me@mail.com')), 64)
+        self.assertEqual(
+            blind_index('+62 812-3456', normalize_digits), blind_index('+628123456', normalize_digits))
+        self.assertIsNone(blind_index(''))
+        with override_settings(PERSONALS_BLIND_INDEX_KEY='other'):
+            other = blind_index('me@mail.com')
+        self.assertNotEqual(other, blind_index('me@mail.com'))
+
+    def test_lookups(self):
+        condition = blind_lookup(SecretContact, email='Me@Mail.com', phone=None)
+        self.assertIn(('email_index', blind_index('me@mail.com')), condition.children)
+        self.assertIn(('phone_index__isnull', True), condition.children)
+        with self.assertRaises(FieldError):
+            SecretContact.objects.filter(email='me@mail.com')
+        with self.assertRaises(FieldError):
+            blind_lookup(SecretContact, pk=1)
+        self.assertFalse(SecretContact.objects.filter(email__isnull=False).exists())
+
+    def test_deconstruct(self):
+        field = SecretContact._meta.get_field('phone_index')
+        name, path, args, kwargs = field.deconstruct()
+        self.assertEqual(kwargs, {'source': 'phone', 'normalizer': normalize_digits})
+        self.assertEqual(BlindIndexField(*args, **kwargs).db_index, True)
+
+
+@skipUnless(Fernet, 'cryptography is not installed')
+@override_settings(PERSONALS_ENCRYPTION_KEYS=KEYS)
+class TestEncryptedFields(TestCase):
+
+    def test_round_trip_and_lookup(self):
+        contact = SecretContact.objects.create(email='Me@Mail.com', phone='+62 812 3456')
+        raw = SecretContact.objects.values_list('email', flat=True).get()
+        self.assertNotIn('Mail', raw)
+        found = SecretContact.objects.get(blind_lookup(SecretContact, email='me@mail.com '))
+        self.assertEqual(found.pk, contact.pk)
+        self.assertIsInstance(found.__dict__['email'], Ciphertext)
+        self.assertEqual(found.email, 'Me@Mail.com')
+        self.assertTrue(SecretContact.objects.filter(blind_lookup(SecretContact, phone='+628123456')).exists())
+
+    def test_unchanged_values_are_not_encrypted_again(self):
+        SecretContact.objects.create(email='me@mail.com')
+        contact = SecretContact.objects.get()
+        token = contact.__dict__['email']
+        contact.email
+        contact.save()
+        self.assertEqual(SecretContact.objects.values_list('email', flat=True).get(), token)
+        contact.email = 'new@mail.com'
+        contact.save()
+        self.assertTrue(SecretContact.objects.filter(blind_lookup(SecretContact, email='new@mail.com')).exists())
+
+    def test_key_rotation(self):
+        SecretContact.objects.create(email='me@mail.com')
+        with override_settings(PERSONALS_ENCRYPTION_KEYS=[Fernet.generate_key()] + KEYS):
+            self.assertEqual(SecretContact.objects.get().email, 'me@mail.com')
@@ -0,0 +1,77 @@
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from django_personals.completeness import rebuild_completeness
+from django_personals.enums import FamilyRelation
+from django_personals.contacts import normalize_email
+from django_personals.encryption import blind_index
+from django_personals.generator import ProfileGenerator, get_copy_data, shard_range
+from .models import Family, Member, MemberContact, Person, PersonContact, Skill
+
+try:
+    from cryptography.fernet import Fernet
+except ImportError:
+    Fernet = None
+
+
+class TestProfileGenerator(TestCase):
+
+    def setUp(self):
+        self.timestamp = timezone.now()
+        self.generator = ProfileGenerator(Person, seed=42, timestamp=self.timestamp)
+
+    def test_deterministic_per_seed(self):
+        first = list(self.generator.iter_rows(0, 20))
+        again = list(ProfileGenerator(Person, seed=42, timestamp=self.timestamp).iter_rows(0, 20))
+        other = list(ProfileGenerator(Person, seed=43, timestamp=self.timestamp).iter_rows(0, 20))
+        self.assertEqual(first, again)
+        self.assertNotEqual(first, other)
+
+    def test_shards_build_the_same_dataset(self):
+        rows = []
+        for shard in range(3):
+            rows += list(self.generator.iter_rows(*shard_range(20, shard, 3)))
+        self.assertEqual(rows, list(self.generator.iter_rows(0, 20)))
+
+    def test_valid_values(self):
+        relations = {value for value, label in FamilyRelation.CHOICES.value}
+        for model, values in self.generator.iter_values(0, 50):
+            if model is Family:
+                self.assertIn(values['relation'], relations)
+            if model is Skill:
+                self.assertTrue(0 <= values['level'] <= 10)
+
+    def test_load(self):
+        total = self.generator.load(10, batch_size=4)
+        self.assertEqual(Person.objects.count(), 10)
+        self.assertEqual(PersonContact.objects.count(), 10)
+        self.assertGreater(total, 20)
+        for person in Person.objects.all():
+            self.assertEqual(person.skills_count, person.skills.count())
+            self.assertEqual(person.addresses_count, person.addresses.count())
+        self.assertTrue(Person.objects.filter(skills_count__gt=0).exists())
+        scores = dict(Person.objects.values_list('pk', 'completeness'))
+        rebuild_completeness(Person)
+        self.assertEqual(dict(Person.objects.values_list('pk', 'completeness')), scores)
+
+    def test_command(self):
+        call_command('generate_personals', 'tests.Person', 6, shards=2, stdout=StringIO())
+        self.assertEqual(Person.objects.count(), 6)
+
+    @skipUnless(Fernet, 'cryptography is not installed')
+    @override_settings(PERSONALS_ENCRYPTION_KEYS=[Fernet.generate_key()] if Fernet else [])
+    def test_copy_data_of_encrypted_fields(self):
+        generator = ProfileGenerator(Member, seed=42)
+        fields = generator.columns[MemberContact]
+        values = [values for model, values in generator.iter_values(0, 1) if model is MemberContact][0]
+        row = [model_row for model, model_row in generator.iter_rows(0, 1) if model is MemberContact][0]
+        data = get_copy_data(fields, [row], connection).read()
+        columns = dict(zip([field.attname for field in fields], data.rstrip('\n').split('\t')))
+        self.assertNotIn(values['email'], columns['email'])
+        self.assertEqual(columns['email_index'], blind_index(values['email'], normalize_email))
+        self.assertEqual(columns['email_lookup'], '\\N')
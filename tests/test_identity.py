@@ -0,0 +1,79 @@
+from django.db.models import Count
+from django.test import RequestFactory, TestCase
+
+from django_personals.identity import IdentityMapMiddleware, identity_map, is_active
+from django_personals.tenancy import tenant_scope
+from .models import Member, Person, Skill
+
+
+class TestIdentityMap(TestCase):
+
+    def setUp(self):
+        self.person = Person.objects.create(nickname='budi')
+        self.skill = Skill.objects.create(person=self.person, name='python', level=5)
+
+    def test_get_by_pk(self):
+        with identity_map():
+            with self.assertNumQueries(1):
+                person = Person.objects.get(pk=self.person.pk)
+                self.assertIs(Person.objects.get(pk=str(self.person.pk)), person)
+                self.assertIs(Person.objects.get(id=self.person.pk), person)
+            with self.assertNumQueries(1):
+                Person.objects.get(pk=self.person.pk, nickname='budi')
+        with self.assertNumQueries(1):
+            Person.objects.get(pk=self.person.pk)
+
+    def test_prefetched_rows(self):
+        with identity_map():
+            person = Person.objects.prefetch_related('skills').get(pk=self.person.pk)
+            with self.assertNumQueries(0):
+                self.assertIs(Skill.objects.get(pk=self.skill.pk), person.skills.all()[0])
+
+    def test_invalidation(self):
+        with identity_map():
+            person = Person.objects.get(pk=self.person.pk)
+            person.nickname = 'sari'
+            person.save()
+            with self.assertNumQueries(1):
+                self.assertIsNot(Person.objects.get(pk=self.person.pk), person)
+            Person.objects.get(pk=self.person.pk).delete(paranoid=True)
+            with self.assertRaises(Person.DoesNotExist):
+                Person.objects.get(pk=self.person.pk)
+            Person.all_objects.filter(pk=self.person.pk).restore()
+            self.assertFalse(Person.objects.get(pk=self.person.pk).is_trash)
+            Skill.objects.get(pk=self.skill.pk)
+            Skill.objects.filter(pk=self.skill.pk).update(level=9)
+            self.assertEqual(Skill.objects.get(pk=self.skill.pk).level, 9)
+
+    def test_set_based_and_bookkeeping_updates(self):
+        with identity_map():
+            Person.objects.get(pk=self.person.pk)
+            Person.objects.filter(pk=self.person.pk).trash()
+            with self.assertRaises(Person.DoesNotExist):
+                Person.objects.get(pk=self.person.pk)
+            self.assertTrue(Person.all_objects.get(pk=self.person.pk).is_trash)
+            Person.all_objects.filter(pk=self.person.pk).restore()
+            self.assertEqual(Person.objects.get(pk=self.person.pk).skills_count, 1)
+            Skill.objects.create(person=self.person, name='sql', level=5)
+            self.assertEqual(Person.objects.get(pk=self.person.pk).skills_count, 2)
+
+    def test_partial_instances_are_not_mapped(self):
+        with identity_map():
+            list(Person.objects.only('pk'))
+            list(Person.objects.defer('nickname'))
+            list(Person.objects.annotate(skills_total=Count('skills')))
+            person = Person.objects.get(pk=self.person.pk)
+            self.assertEqual(person.get_deferred_fields(), set())
+            self.assertFalse(hasattr(person, 'skills_total'))
+
+    def test_tenant_scope(self):
+        member = Member.objects.create(tenant_id='acme')
+        with identity_map():
+            Member.objects.get(pk=member.pk)
+            with tenant_scope('other'), self.assertRaises(Member.DoesNotExist):
+                Member.objects.get(pk=member.pk)
+
+    def test_middleware(self):
+        response = IdentityMapMiddleware(lambda request: is_active())(RequestFactory().get('/'))
+        self.assertTrue(response)
+        self.assertFalse(is_active())
@@ -0,0 +1,51 @@
+from django.test import TestCase, override_settings
+
+from django_personals.instrumentation import MemorySink, PrometheusSink, add_sink
+from django_personals.testing import QueryBudgetExceeded, QueryBudgetMixin
+from .models import Person, PersonContact, Skill, Working
+
+
+@override_settings(PERSONALS_INSTRUMENTATION_SINKS=[])
+class TestInstrumentation(TestCase):
+
+    def setUp(self):
+        self.sink = add_sink(MemorySink())
+
+    def test_fetch_is_recorded(self):
+        Person.objects.create()
+        Person.objects.create()
+        list(Person.objects.all())
+        model, operation, queries, rows, duration = self.sink.records[-1]
+        self.assertEqual((model, operation, queries, rows), (Person, 'fetch', 1, 2))
+
+    def test_trash_and_restore_are_recorded(self):
+        person = Person.objects.create()
+        person.delete(paranoid=True)
+        person.restore()
+        operations = [record[1] for record in self.sink.records]
+        self.assertEqual(operations, ['trash', 'restore'])
+
+    def test_prometheus_render(self):
+        sink = add_sink(PrometheusSink())
+        list(Person.objects.all())
+        self.assertIn(
+            'django_personals_queries_total{model="tests.person",operation="fetch"} 1.0',
+            sink.render())
+
+
+class TestQueryBudget(QueryBudgetMixin, TestCase):
+
+    def test_profile_load_is_constant(self):
+        for i in range(3):
+            person = Person.objects.create()
+            PersonContact.objects.create(person=person)
+            Skill.objects.create(person=person, name='python', level=i)
+            Working.objects.create(
+                person=person, institution='ACME', department='IT', position='dev')
+        people = self.assertProfileLoadBudget(Person.objects.all())
+        self.assertEqual(len(people), 3)
+
+    def test_budget_exceeded(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            with self.assertQueryBudget(0):
+                list(Person.objects.all())
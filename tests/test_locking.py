@@ -0,0 +1,44 @@
+from django.db import transaction
+from django.test import TestCase
+
+from django_personals.models import StaleObjectError
+from .models import Person, Skill
+
+
+class TestOptimisticLocking(TestCase):
+
+    def setUp(self):
+        self.person = Person.objects.create(nickname='budi')
+
+    def test_stale_save(self):
+        first = Person.objects.get(pk=self.person.pk)
+        second = Person.objects.get(pk=self.person.pk)
+        first.nickname = 'sari'
+        first.save()
+        self.assertEqual(first.version, 1)
+        second.nickname = 'andi'
+        with self.assertRaises(StaleObjectError), transaction.atomic():
+            second.save(update_fields=['nickname'])
+        self.assertEqual(Person.objects.get(pk=self.person.pk).nickname, 'sari')
+
+    def test_concurrent_trash_and_restore(self):
+        first = Person.objects.get(pk=self.person.pk)
+        second = Person.objects.get(pk=self.person.pk)
+        self.assertTrue(first.delete(paranoid=True))
+        self.assertFalse(second.delete(paranoid=True))
+        self.assertTrue(first.is_trash)
+        self.assertFalse(second.is_trash)
+        self.assertTrue(first.restore())
+        self.assertFalse(first.restore())
+        self.assertEqual(Person.objects.get(pk=self.person.pk).version, 2)
+        with self.assertRaises(StaleObjectError), transaction.atomic():
+            second.save()
+
+    def test_queryset_update(self):
+        skill = Skill.objects.create(person=self.person, name='python', level=5)
+        Skill.objects.filter(pk=skill.pk).update(level=7)
+        Skill.objects.filter(pk=skill.pk).trash()
+        self.assertEqual(Skill.all_objects.get(pk=skill.pk).version, 2)
+        skill.level = 9
+        with self.assertRaises(StaleObjectError), transaction.atomic():
+            skill.save()
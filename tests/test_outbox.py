@@ -0,0 +1,115 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from django_personals import outbox
+from django_personals.models import OutboxEvent
+from .models import Person, Skill
+
+
+class Boom(outbox.Sink):
+
+    def send(self, events):
+        raise RuntimeError('sink down')
+
+
+class BadEventSink(outbox.MemorySink):
+
+    def __init__(self, bad_pk):
+        super().__init__()
+        self.bad_pk = bad_pk
+
+    def send(self, events):
+        if any(event.pk == self.bad_pk for event in events):
+            raise RuntimeError('bad event')
+        super().send(events)
+
+
+@override_settings(PERSONALS_OUTBOX_MODELS=['tests.person'])
+class TestOutbox(TestCase):
+
+    def actions(self):
+        return list(OutboxEvent.objects.order_by('id').values_list('object_pk', 'action'))
+
+    def test_writes_record_events(self):
+        person = Person.objects.create()
+        person.nickname = 'x'
+        person.save()
+        person.delete(paranoid=True)
+        person.restore()
+        Person.objects.filter(pk=person.pk).trash()
+        Person.all_objects.filter(pk=person.pk).restore()
+        pk = str(person.pk)
+        self.assertEqual(self.actions(), [
+            (pk, 'created'), (pk, 'updated'), (pk, 'trashed'),
+            (pk, 'restored'), (pk, 'trashed'), (pk, 'restored')])
+        Skill.objects.create(person=person, level=1)
+        person.delete()
+        self.assertEqual(self.actions()[-1], (pk, 'deleted'))
+        self.assertEqual(len(self.actions()), 7)
+
+    def test_dispatch_in_batches(self):
+        for i in range(5):
+            Person.objects.create()
+        sink = outbox.MemorySink()
+        self.assertEqual(outbox.dispatch(batch_size=3, sink=sink), 3)
+        self.assertEqual(outbox.run_worker(batch_size=3, interval=None, sink=sink), 2)
+        self.assertEqual(outbox.dispatch(sink=sink), 0)
+        self.assertEqual([event.pk for event in sink.events], sorted(event.pk for event in sink.events))
+        self.assertFalse(OutboxEvent.objects.filter(dispatched_at__isnull=True).exists())
+
+    @override_settings(PERSONALS_OUTBOX_RETRY_SECONDS=0)
+    def test_failed_batch_is_retried(self):
+        Person.objects.create()
+        with self.assertLogs('django_personals.outbox', 'ERROR'):
+            self.assertEqual(outbox.dispatch(sink=Boom()), 0)
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.attempts, 1)
+        self.assertIn('sink down', event.last_error)
+        self.assertEqual(outbox.dispatch(sink=outbox.MemorySink()), 1)
+
+    @override_settings(PERSONALS_OUTBOX_MAX_ATTEMPTS=2)
+    def test_bad_event_does_not_block_others(self):
+        people = [Person.objects.create() for i in range(3)]
+        bad = OutboxEvent.objects.get(object_pk=str(people[1].pk))
+        sink = BadEventSink(bad.pk)
+        with self.assertLogs('django_personals.outbox', 'ERROR'):
+            self.assertEqual(outbox.dispatch(sink=sink), 2)
+        bad.refresh_from_db()
+        self.assertEqual(bad.attempts, 1)
+        # held back until its retry
+        self.assertEqual(outbox.dispatch(sink=sink), 0)
+        OutboxEvent.objects.filter(pk=bad.pk).update(claimed_until=None)
+        with self.assertLogs('django_personals.outbox', 'ERROR'):
+            self.assertEqual(outbox.dispatch(sink=sink), 0)
+        OutboxEvent.objects.filter(pk=bad.pk).update(claimed_until=None)
+        self.assertEqual(outbox.dispatch(sink=sink), 0)
+        self.assertEqual(list(outbox.get_dead_letters()), [bad])
+        self.assertEqual(len(sink.events), 2)
+
+    @override_settings(PERSONALS_OUTBOX_SINK='django_personals.outbox.MemorySink')
+    def test_command(self):
+        Person.objects.create()
+        out = StringIO()
+        call_command('dispatch_personals_outbox', once=True, stdout=out)
+        self.assertIn('1 events delivered.', out.getvalue())
+        self.assertEqual(len(outbox.get_sink().events), 1)
+
+    @override_settings(PERSONALS_OUTBOX_MODELS=[])
+    def test_disabled_by_default(self):
+        Person.objects.create()
+        self.assertFalse(OutboxEvent.objects.exists())
+
+
+@override_settings(PERSONALS_OUTBOX_MODELS='__all__')
+class TestOutboxRollback(TransactionTestCase):
+
+    def test_rolled_back_write_leaves_no_event(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            Person.objects.create()
+            raise RuntimeError
+        self.assertFalse(OutboxEvent.objects.exists())
+        Person.objects.create()
+        self.assertEqual(OutboxEvent.objects.count(), 1)
@@ -0,0 +1,52 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from django_personals.indexes import KeysetIndex
+from django_personals.pagination import InvalidCursor, KeysetPaginator
+from .models import Person
+
+
+class TestKeysetPagination(TestCase):
+
+    def setUp(self):
+        names = ['b', None, 'a', 'c', 'a', None, 'd']
+        self.people = [Person.objects.create(nickname=name) for name in names]
+
+    def collect(self, paginator):
+        return [person.pk for page in paginator.iterate() for person in page]
+
+    def test_pages_cover_every_row_once(self):
+        for ordering in (['nickname'], ['-nickname'], ['pk'], ['-date_of_birth', 'nickname']):
+            paginator = KeysetPaginator(Person.objects.all(), 2, ordering=ordering)
+            pks = self.collect(paginator)
+            self.assertEqual(len(pks), len(self.people), ordering)
+            self.assertEqual(set(pks), {person.pk for person in self.people}, ordering)
+
+    def test_ordering(self):
+        paginator = KeysetPaginator(Person.objects.all(), 3, ordering=['nickname'])
+        names = [Person.objects.get(pk=pk).nickname for pk in self.collect(paginator)]
+        self.assertEqual(names, ['a', 'a', 'b', 'c', 'd', None, None])
+
+    def test_no_offset(self):
+        page = Person.objects.keyset(2, ordering=['nickname'])
+        with CaptureQueriesContext(connection) as context:
+            Person.objects.keyset(2, cursor=page.next_cursor, ordering=['nickname'])
+        self.assertNotIn('OFFSET', context.captured_queries[0]['sql'])
+
+    def test_skips_trash(self):
+        self.people[0].delete(paranoid=True)
+        self.assertEqual(len(self.collect(KeysetPaginator(Person.objects.all(), 2))), 6)
+
+    def test_invalid_cursor(self):
+        page = Person.objects.keyset(2, ordering=['nickname'])
+        with self.assertRaises(InvalidCursor):
+            Person.objects.keyset(2, cursor=page.next_cursor, ordering=['-nickname'])
+        with self.assertRaises(InvalidCursor):
+            Person.objects.keyset(2, cursor=page.next_cursor[:-2])
+
+    def test_keyset_index(self):
+        index = KeysetIndex(fields=['-date_of_birth'], name='test_idx')
+        self.assertEqual(index.fields, ['-date_of_birth', '-id'])
+        path, args, kwargs = index.deconstruct()
+        self.assertEqual(KeysetIndex(**kwargs).fields, index.fields)
@@ -0,0 +1,48 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from django_personals.purge import get_plan, purge
+from .models import Person, PersonContact, Skill
+
+
+class TestPurge(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create(username='admin')
+        self.people = [Person.objects.create(nickname=name) for name in ('budi', 'sari', 'andi')]
+        for person in self.people:
+            PersonContact.objects.create(person=person, email='%s@example.com' % person.nickname)
+            Skill.objects.create(person=person, name='python', level=5)
+            Skill.objects.create(person=person, name='sql', level=5).delete(paranoid=True)
+        Person.objects.filter(pk__in=[person.pk for person in self.people[:2]]).trash(user=self.user)
+        self.before = timezone.now() + timedelta(seconds=1)
+
+    def test_purge(self):
+        counts = purge(Person, self.before, batch_size=1)
+        self.assertEqual((counts[Person], counts[Skill], counts[PersonContact]), (2, 4, 2))
+        self.assertEqual(list(Person.all_objects.all()), [self.people[2]])
+        self.assertEqual(Skill.all_objects.count(), 2)
+        self.assertEqual(purge(Person, self.before), {})
+
+    def test_recently_trashed_rows_stay(self):
+        self.assertEqual(purge(Person, timezone.now() - timedelta(days=1)), {})
+        self.assertEqual(Person.all_objects.count(), 3)
+
+    def test_user_plan_clears_trashed_by(self):
+        steps = {(step.model, step.value is None) for step in get_plan(get_user_model())}
+        self.assertIn((Person, True), steps)
+        self.assertNotIn((Person, False), steps)
+        purge(Skill, self.before)
+        self.assertEqual(Person.all_objects.filter(trashed_by=self.user).count(), 2)
+
+    def test_command(self):
+        out = StringIO()
+        call_command('purge_personals_trash', 'tests.Person', days=-1, stdout=out)
+        self.assertIn('tests.Person: 2 tests.Person rows erased.', out.getvalue())
+        call_command('purge_personals_trash', 'tests.Person', plan=True, stdout=out)
+        self.assertIn('<Step delete tests.Skill>', out.getvalue())
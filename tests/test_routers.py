@@ -0,0 +1,51 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from django_personals.routers import (
+    ReplicaRouter, pinning_scope, routing_stats
+)
+from .models import Person
+
+
+@override_settings(
+    PERSONALS_REPLICA_DATABASES=['replica'],
+    PERSONALS_REPLICA_PIN_SECONDS=60)
+class TestReplicaRouter(TestCase):
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+        routing_stats.reset()
+
+    def test_reads_go_to_replica(self):
+        with pinning_scope():
+            self.assertEqual(self.router.db_for_read(Person), 'replica')
+        self.assertEqual(routing_stats.replica_ratio, 1.0)
+
+    def test_non_personal_models_are_ignored(self):
+        self.assertIsNone(self.router.db_for_read(User))
+        self.assertIsNone(self.router.db_for_write(User))
+
+    def test_write_pins_reads_to_primary(self):
+        with pinning_scope():
+            self.assertEqual(self.router.db_for_write(Person), 'default')
+            self.assertEqual(self.router.db_for_read(Person), 'default')
+        self.assertEqual(routing_stats.counts['pinned'], 1)
+
+    @override_settings(
+        DATABASE_ROUTERS=['django_personals.routers.ReplicaRouter'])
+    def test_paranoid_delete_and_restore_pin_reads(self):
+        person = Person.objects.create()
+        with pinning_scope():
+            person.delete(paranoid=True)
+            self.assertEqual(self.router.db_for_read(Person), 'default')
+        with pinning_scope():
+            person.restore()
+            self.assertEqual(self.router.db_for_read(Person), 'default')
+
+    def test_pin_follows_user_across_scopes(self):
+        with pinning_scope(user_id=1):
+            self.router.db_for_write(Person)
+        with pinning_scope(user_id=1):
+            self.assertEqual(self.router.db_for_read(Person), 'default')
+        with pinning_scope(user_id=2):
+            self.assertEqual(self.router.db_for_read(Person), 'replica')
@@ -0,0 +1,31 @@
+from django.test import TestCase
+
+from .models import Person, PersonAddress, Skill, Working
+
+
+class TestRows(TestCase):
+
+    def setUp(self):
+        self.person = Person.objects.create(nickname='budi')
+        self.skill = Skill.objects.create(person=self.person, name='python', level=7)
+        Skill.objects.create(person=self.person, name='cobol', level=1).delete(paranoid=True)
+
+    def test_skill_rows(self):
+        rows = list(Skill.objects.rows('name', 'level', 'privacy'))
+        self.assertEqual(len(rows), 1)
+        row = rows[0]
+        self.assertEqual((row.pk, str(row), row.percent), (self.skill.pk, 'python', 70))
+        self.assertEqual(row.get_privacy_display(), self.skill.get_privacy_display())
+        self.assertFalse(hasattr(row, '__dict__'))
+        with self.assertRaises(AttributeError):
+            row.name = 'sql'
+        self.assertIs(type(row), type(Skill.objects.rows('name', 'level', 'privacy').get()))
+
+    def test_default_fields(self):
+        Working.objects.create(
+            person=self.person, institution='ACME', department='it', position='engineer')
+        address = PersonAddress.objects.create(person=self.person, street='Jl. Merdeka', city='Bandung')
+        row = Working.objects.rows().get()
+        self.assertEqual((str(row), row.person_id), ('ACME, engineer', self.person.pk))
+        row = PersonAddress.objects.filter(person=self.person).rows().first()
+        self.assertEqual(row.fulladdress, address.fulladdress)
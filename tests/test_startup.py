@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+# Cumulative import time budget of "import django_personals", in microseconds.
+IMPORT_BUDGET_US = 20000
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(*args):
+    return subprocess.run(
+        [sys.executable] + list(args), cwd=ROOT,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True, check=True)
+
+
+class TestStartup(TestCase):
+
+    def get_import_times(self):
+        stderr = run_python('-X', 'importtime', '-c', 'import django_personals').stderr
+        times = {}
+        for line in stderr.splitlines():
+            if not line.startswith('import time:') or '|' not in line:
+                continue
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            if cumulative_us.strip().isdigit():
+                times[name.strip()] = int(cumulative_us)
+        return times
+
+    def test_import_budget(self):
+        times = self.get_import_times()
+        self.assertLess(times['django_personals'], IMPORT_BUDGET_US)
+
+    def test_no_heavy_or_optional_imports(self):
+        times = self.get_import_times()
+        self.assertNotIn('django', times)
+        self.assertNotIn('wagtail', times)
+
+    def test_version_without_django(self):
+        stdout = run_python('-c', (
+            'import sys, django_personals; '
+            'print(django_personals.__version__, "django" in sys.modules)')).stdout
+        self.assertEqual(stdout.split(), ['0.0.1', 'False'])
+
+    def test_submodules_resolve_on_access(self):
+        stdout = run_python('-c', (
+            'import os, pkgutil, django; '
+            'os.environ["DJANGO_SETTINGS_MODULE"] = "tests.settings"; django.setup(); '
+            'import django_personals; '
+            'names = [module.name for module in pkgutil.iter_modules(django_personals.__path__)]; '
+            'print(all(getattr(django_personals, name).__name__.endswith(name) for name in names), '
+            'callable(django_personals.views.metrics_view), "views" in dir(django_personals))')).stdout
+        self.assertEqual(stdout.split(), ['True', 'True', 'True'])
@@ -0,0 +1,68 @@
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+
+from django_personals.tenancy import (
+    PartitionByTenant, TenantMiddleware, TenantRequired, get_current_tenant,
+    get_partition_sql, tenant_scope
+)
+from .models import Member
+
+
+class TestTenantScope(TestCase):
+
+    def setUp(self):
+        with tenant_scope('acme'):
+            self.acme = [Member.objects.create() for i in range(2)]
+        self.other = Member.objects.create(tenant_id='other')
+
+    def test_manager_is_scoped(self):
+        self.assertEqual([member.tenant_id for member in self.acme], ['acme', 'acme'])
+        with tenant_scope('acme'):
+            self.assertEqual(Member.objects.count(), 2)
+            self.acme[0].delete(paranoid=True)
+            self.assertEqual(list(Member.objects.all()), [self.acme[1]])
+            with self.assertRaises(Member.DoesNotExist):
+                Member.objects.get(pk=self.other.pk)
+            self.assertEqual(Member.all_objects.for_tenant('acme').count(), 2)
+        self.assertEqual(Member.objects.count(), 2)
+
+    @override_settings(PERSONALS_TENANT_STRICT=True)
+    def test_strict(self):
+        with self.assertRaises(TenantRequired):
+            Member.objects.count()
+        with self.assertRaises(TenantRequired):
+            Member().save()
+        with tenant_scope('other'):
+            self.assertEqual(Member.objects.get(), self.other)
+
+    def test_middleware(self):
+        def view(request):
+            return get_current_tenant()
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        self.assertIsNone(TenantMiddleware(view)(request))
+        request.user = type('User', (), {'is_authenticated': True, 'tenant_id': 'acme'})()
+        self.assertEqual(TenantMiddleware(view)(request), 'acme')
+
+
+class TestPartitioning(TestCase):
+
+    def test_index_leads_with_tenant(self):
+        self.assertEqual(Member._meta.indexes[0].fields, ['tenant_id', 'gender'])
+
+    def test_partition_sql(self):
+        editor = connection.schema_editor(collect_sql=True)
+        statements = get_partition_sql(editor, Member, partitions=4)
+        listed = get_partition_sql(editor, Member, method='list', tenants=['acme'])
+        self.assertIn('PARTITION BY HASH', statements[1])
+        self.assertIn('PRIMARY KEY ("tenant_id", "id")', statements[1])
+        self.assertEqual(sum('MODULUS 4' in statement for statement in statements), 4)
+        self.assertTrue(any("FOR VALUES IN ('acme')" in statement for statement in listed))
+        self.assertTrue(any('DEFAULT' in statement for statement in listed))
+        self.assertTrue(any('tests_member_tenant_idx' in statement for statement in statements))
+
+    def test_operation_is_noop_elsewhere(self):
+        operation = PartitionByTenant('Member', partitions=4)
+        self.assertEqual(operation.deconstruct(), (
+            'PartitionByTenant', [], {'model_name': 'Member', 'method': 'hash', 'partitions': 4}))
@@ -0,0 +1,63 @@
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from django_personals.trash import release_trashed_by
+from .models import Person, Skill
+
+
+class TestTrashedByPolicy(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username='staff')
+        self.other = User.objects.create(username='admin')
+        self.person = Person.objects.create()
+        Skill.objects.create(person=self.person, name='python', level=5)
+        Person.objects.filter(pk=self.person.pk).trash(user=self.user)
+        Skill.objects.all().trash(user=self.user)
+
+    def test_set_null(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.user.delete()
+        # one UPDATE per table in the delete transaction, no batch savepoints
+        self.assertFalse([query for query in queries if 'SAVEPOINT' in query['sql']])
+        self.assertEqual(Person.all_objects.filter(is_trash=True, trashed_by=None).count(), 1)
+        self.assertEqual(Skill.all_objects.filter(is_trash=True, trashed_by=None).count(), 1)
+
+    def test_reassign(self):
+        with override_settings(
+                PERSONALS_TRASHED_BY_ON_DELETE='REASSIGN', PERSONALS_TRASHED_BY_REASSIGN_TO=self.other.pk):
+            self.assertEqual(release_trashed_by(self.user.pk, batch_size=1), 2)
+            self.user.delete()
+        self.assertEqual(Person.all_objects.get().trashed_by, self.other)
+        self.assertEqual(Skill.all_objects.get().trashed_by, self.other)
+
+    @override_settings(PERSONALS_TRASHED_BY_ON_DELETE='REASSIGN')
+    def test_misconfigured(self):
+        with self.assertRaises(ImproperlyConfigured):
+            release_trashed_by(self.user.pk)
+
+
+@override_settings(
+    PERSONALS_TASK_RUNNER='django_personals.tasks.run_now', PERSONALS_TRASHED_BY_RELEASE_ON_DEACTIVATE=True)
+class TestTrashedByRelease(TransactionTestCase):
+
+    def test_deactivation_runs_in_background(self):
+        user = User.objects.create(username='staff')
+        Person.objects.create().delete(paranoid=True, user=user)
+        user.is_active = False
+        user.save()
+        self.assertIsNone(Person.all_objects.get().trashed_by)
+
+    def test_only_deactivation_queues_release(self):
+        user = User.objects.create(username='staff', is_active=False)
+        Person.objects.create().delete(paranoid=True, user=user)
+        user.save()
+        self.assertEqual(Person.all_objects.get().trashed_by, user)
+        user.is_active = True
+        user.save()
+        user.is_active = False
+        user.save()
+        self.assertIsNone(Person.all_objects.get().trashed_by)
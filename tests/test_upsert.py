@@ -0,0 +1,70 @@
+from datetime import date
+
+from django.test import TestCase
+
+from .models import Person, Skill, Working
+
+
+def job(person, institution, start, position='staff'):
+    return Working(
+        person=person, institution=institution, date_start=start, date_end=start,
+        department='it', position=position)
+
+
+class TestBulkUpsert(TestCase):
+
+    def setUp(self):
+        self.person = Person.objects.create()
+        self.other = Person.objects.create()
+        self.first = Working.objects.bulk_upsert([
+            job(self.person, 'ACME', date(2015, 1, 1)),
+            job(self.person, 'Initech', date(2018, 1, 1)),
+            job(self.other, 'ACME', date(2016, 1, 1)),
+        ])
+
+    def test_initial_load(self):
+        self.assertEqual(len(self.first.created), 3)
+        self.assertEqual(Working.objects.count(), 3)
+
+    def test_sync(self):
+        acme = Working.objects.get(person=self.person, institution='ACME')
+        with self.assertNumQueries(7):
+            result = Working.objects.bulk_upsert([
+                job(self.person, 'ACME', date(2015, 1, 1)),
+                job(self.person, 'Initech', date(2018, 1, 1), position='lead'),
+                job(self.person, 'Globex', date(2020, 1, 1)),
+            ])
+        self.assertEqual((len(result.created), len(result.updated), len(result.unchanged)), (1, 1, 1))
+        self.assertEqual(result.unchanged, [acme.pk])
+        self.assertEqual(Working.objects.get(pk=result.updated[0]).position, 'lead')
+        self.assertEqual(Working.objects.filter(person=self.person).count(), 3)
+        # rows of people outside the feed are left alone
+        self.assertTrue(Working.objects.filter(person=self.other).exists())
+
+        result = Working.objects.bulk_upsert([job(self.person, 'ACME', date(2015, 1, 1))])
+        self.assertEqual(len(result.trashed), 2)
+        self.assertEqual(Working.objects.filter(person=self.person).count(), 1)
+
+        result = Working.objects.bulk_upsert([
+            job(self.person, 'ACME', date(2015, 1, 1)),
+            job(self.person, 'Initech', date(2018, 1, 1), position='lead'),
+        ], delete_missing=False)
+        self.assertEqual(len(result.restored), 1)
+        self.assertIn(result.restored[0], result.unchanged)
+        self.assertEqual(Working.objects.filter(person=self.person).count(), 2)
+
+    def test_counters_follow(self):
+        Skill.objects.bulk_upsert([
+            Skill(person=self.person, name='python', level=5),
+            Skill(person=self.person, name='sql', level=5),
+        ])
+        self.person.refresh_from_db()
+        self.assertEqual(self.person.skills_count, 2)
+        Skill.objects.bulk_upsert([Skill(person=self.person, name='python', level=7)])
+        self.person.refresh_from_db()
+        self.assertEqual(self.person.skills_count, 1)
+        self.assertEqual(Skill.objects.get().level, 7)
+
+    def test_duplicate_keys(self):
+        with self.assertRaises(ValueError):
+            Working.objects.bulk_upsert([job(self.person, 'ACME', date(2015, 1, 1))] * 2)
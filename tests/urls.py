@@ -1,3 +1,6 @@
-from django.conf.urls import url
+from django.contrib import admin
+from django.urls import path
 
-urlpatterns = []
\ No newline at end of file
+urlpatterns = [
+    path('admin/', admin.site.urls),
+]